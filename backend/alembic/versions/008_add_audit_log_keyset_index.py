@@ -0,0 +1,26 @@
+"""add_audit_log_keyset_index
+
+Revision ID: 008_audit_keyset_index
+Revises: 8ea00ab4174f
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '008_audit_keyset_index'
+down_revision = '8ea00ab4174f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Composite (timestamp, id) index backing keyset pagination of audit logs
+    """
+    op.create_index('ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_timestamp_id', table_name='audit_logs')
@@ -0,0 +1,139 @@
+"""partition_audit_logs
+
+Revision ID: 009_partition_audit_logs
+Revises: 008_audit_keyset_index
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009_partition_audit_logs'
+down_revision = '008_audit_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def upgrade() -> None:
+    """
+    Add the audit archive manifest and, on PostgreSQL, turn audit_logs into
+    a table range-partitioned by month on timestamp.
+    
+    SQLite has no native partitioning; audit_logs stays a single table there
+    and the retention job (app/core/audit_archive.py) moves whole months out.
+    """
+    op.create_table(
+        'audit_log_archives',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('period_start', sa.DateTime(), nullable=False),
+        sa.Column('period_end', sa.DateTime(), nullable=False),
+        sa.Column('file_path', sa.String(length=500), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('min_id', sa.Integer(), nullable=True),
+        sa.Column('max_id', sa.Integer(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.Column('purged_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('period_start'),
+    )
+    op.create_index('ix_audit_log_archives_id', 'audit_log_archives', ['id'])
+    op.create_index('ix_audit_log_archives_period_start', 'audit_log_archives', ['period_start'])
+    
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    
+    # Partitioned tables need the partition key in the primary key
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER INDEX audit_logs_pkey RENAME TO audit_logs_unpartitioned_pkey")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            user_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+            username VARCHAR(100) NOT NULL,
+            action VARCHAR(100) NOT NULL,
+            entity_type VARCHAR(50) NOT NULL,
+            entity_id INTEGER,
+            description TEXT NOT NULL,
+            details JSON,
+            ip_address VARCHAR(45),
+            user_agent VARCHAR(500),
+            timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+    
+    # One partition per month from the oldest row through next month
+    oldest = bind.execute(sa.text("SELECT min(timestamp) FROM audit_logs_unpartitioned")).scalar()
+    current = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    period = (oldest or current).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    while period <= _add_months(current, 1):
+        op.execute(
+            f"CREATE TABLE audit_logs_y{period.year}m{period.month:02d} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{period.isoformat()}') TO ('{_add_months(period, 1).isoformat()}')"
+        )
+        period = _add_months(period, 1)
+    
+    op.execute("INSERT INTO audit_logs SELECT id, user_id, username, action, entity_type, entity_id, "
+               "description, details, ip_address, user_agent, timestamp FROM audit_logs_unpartitioned")
+    op.execute("DROP TABLE audit_logs_unpartitioned")
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'])
+    op.create_index('ix_audit_logs_user_id', 'audit_logs', ['user_id'])
+    op.create_index('ix_audit_logs_action', 'audit_logs', ['action'])
+    op.create_index('ix_audit_logs_entity_type', 'audit_logs', ['entity_type'])
+    op.create_index('ix_audit_logs_entity_id', 'audit_logs', ['entity_id'])
+    op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp'])
+    op.create_index('ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY NONE")
+        op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+        op.execute("ALTER INDEX audit_logs_pkey RENAME TO audit_logs_partitioned_pkey")
+        for name in ('id', 'user_id', 'action', 'entity_type', 'entity_id', 'timestamp', 'timestamp_id'):
+            op.execute(f"DROP INDEX ix_audit_logs_{name}")
+        op.execute("""
+            CREATE TABLE audit_logs (
+                id INTEGER PRIMARY KEY DEFAULT nextval('audit_logs_id_seq'),
+                user_id INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                username VARCHAR(100) NOT NULL,
+                action VARCHAR(100) NOT NULL,
+                entity_type VARCHAR(50) NOT NULL,
+                entity_id INTEGER,
+                description TEXT NOT NULL,
+                details JSON,
+                ip_address VARCHAR(45),
+                user_agent VARCHAR(500),
+                timestamp TIMESTAMP WITHOUT TIME ZONE NOT NULL
+            )
+        """)
+        op.execute("INSERT INTO audit_logs SELECT * FROM audit_logs_partitioned")
+        op.execute("DROP TABLE audit_logs_partitioned CASCADE")
+        op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+        op.create_index('ix_audit_logs_id', 'audit_logs', ['id'])
+        op.create_index('ix_audit_logs_user_id', 'audit_logs', ['user_id'])
+        op.create_index('ix_audit_logs_action', 'audit_logs', ['action'])
+        op.create_index('ix_audit_logs_entity_type', 'audit_logs', ['entity_type'])
+        op.create_index('ix_audit_logs_entity_id', 'audit_logs', ['entity_id'])
+        op.create_index('ix_audit_logs_timestamp', 'audit_logs', ['timestamp'])
+        op.create_index('ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'])
+    
+    op.drop_index('ix_audit_log_archives_period_start', table_name='audit_log_archives')
+    op.drop_index('ix_audit_log_archives_id', table_name='audit_log_archives')
+    op.drop_table('audit_log_archives')
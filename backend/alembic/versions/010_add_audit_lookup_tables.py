@@ -0,0 +1,58 @@
+"""add_audit_lookup_tables
+
+Revision ID: 010_audit_lookup_tables
+Revises: 009_partition_audit_logs
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010_audit_lookup_tables'
+down_revision = '009_partition_audit_logs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Lookup tables for audit action codes and entity types, backfilled once
+    from the existing audit log and maintained by AuditLogger.log afterwards
+    """
+    op.create_table(
+        'audit_actions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('first_seen_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_index('ix_audit_actions_id', 'audit_actions', ['id'])
+    
+    op.create_table(
+        'audit_entity_types',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('first_seen_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+    )
+    op.create_index('ix_audit_entity_types_id', 'audit_entity_types', ['id'])
+    
+    op.execute(
+        "INSERT INTO audit_actions (name, first_seen_at) "
+        "SELECT action, min(timestamp) FROM audit_logs GROUP BY action"
+    )
+    op.execute(
+        "INSERT INTO audit_entity_types (name, first_seen_at) "
+        "SELECT entity_type, min(timestamp) FROM audit_logs GROUP BY entity_type"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_entity_types_id', table_name='audit_entity_types')
+    op.drop_table('audit_entity_types')
+    op.drop_index('ix_audit_actions_id', table_name='audit_actions')
+    op.drop_table('audit_actions')
@@ -0,0 +1,50 @@
+"""add_audit_hash_chain
+
+Revision ID: 011_audit_hash_chain
+Revises: 010_audit_lookup_tables
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011_audit_hash_chain'
+down_revision = '010_audit_lookup_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Hash chain columns on audit_logs and signed chain checkpoints
+    Existing rows are sealed by the audit writer / verify_audit_chain.py
+    """
+    op.add_column('audit_logs', sa.Column('chain_seq', sa.BigInteger(), nullable=True))
+    op.add_column('audit_logs', sa.Column('prev_hash', sa.String(length=64), nullable=True))
+    op.add_column('audit_logs', sa.Column('row_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_audit_logs_chain_seq', 'audit_logs', ['chain_seq'])
+    
+    op.create_table(
+        'audit_chain_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('chain_seq', sa.BigInteger(), nullable=False),
+        sa.Column('row_hash', sa.String(length=64), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('signature', sa.String(length=64), nullable=False),
+        sa.Column('verified_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_audit_chain_checkpoints_id', 'audit_chain_checkpoints', ['id'])
+    op.create_index('ix_audit_chain_checkpoints_chain_seq', 'audit_chain_checkpoints', ['chain_seq'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_chain_checkpoints_chain_seq', table_name='audit_chain_checkpoints')
+    op.drop_index('ix_audit_chain_checkpoints_id', table_name='audit_chain_checkpoints')
+    op.drop_table('audit_chain_checkpoints')
+    op.drop_index('ix_audit_logs_chain_seq', table_name='audit_logs')
+    op.drop_column('audit_logs', 'row_hash')
+    op.drop_column('audit_logs', 'prev_hash')
+    op.drop_column('audit_logs', 'chain_seq')
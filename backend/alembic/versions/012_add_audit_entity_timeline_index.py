@@ -0,0 +1,34 @@
+"""add_audit_entity_timeline_index
+
+Revision ID: 012_audit_entity_index
+Revises: 011_audit_hash_chain
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '012_audit_entity_index'
+down_revision = '011_audit_hash_chain'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Composite (entity_type, entity_id, timestamp) index for per-entity
+    timelines; it also covers entity_type-only filters, so the single
+    column entity_type index is dropped
+    """
+    op.create_index(
+        'ix_audit_logs_entity_timestamp',
+        'audit_logs',
+        ['entity_type', 'entity_id', 'timestamp'],
+    )
+    op.drop_index('ix_audit_logs_entity_type', table_name='audit_logs')
+
+
+def downgrade() -> None:
+    op.create_index('ix_audit_logs_entity_type', 'audit_logs', ['entity_type'])
+    op.drop_index('ix_audit_logs_entity_timestamp', table_name='audit_logs')
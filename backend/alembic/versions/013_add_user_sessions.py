@@ -0,0 +1,56 @@
+"""add_user_sessions
+
+Revision ID: 013_user_sessions
+Revises: 012_audit_entity_index
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013_user_sessions'
+down_revision = '012_audit_entity_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Session registry table keyed by the token's jti; replaces the full JWT
+    stored in users.active_session_token. Existing tokens carry no jti, so
+    everyone signs in again after this migration.
+    """
+    op.create_table(
+        'user_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=64), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(), nullable=True),
+        sa.Column('revoked_reason', sa.String(length=50), nullable=True),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(length=500), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_user_sessions_id'), 'user_sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_user_sessions_jti'), 'user_sessions', ['jti'], unique=True)
+    op.create_index('ix_user_sessions_user_revoked', 'user_sessions', ['user_id', 'revoked_at'], unique=False)
+
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('session_created_at')
+        batch_op.drop_column('active_session_token')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('active_session_token', sa.String(500), nullable=True))
+        batch_op.add_column(sa.Column('session_created_at', sa.DateTime(), nullable=True))
+
+    op.drop_index('ix_user_sessions_user_revoked', table_name='user_sessions')
+    op.drop_index(op.f('ix_user_sessions_jti'), table_name='user_sessions')
+    op.drop_index(op.f('ix_user_sessions_id'), table_name='user_sessions')
+    op.drop_table('user_sessions')
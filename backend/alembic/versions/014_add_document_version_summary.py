@@ -0,0 +1,56 @@
+"""add_document_version_summary
+
+Revision ID: 014_document_version_summary
+Revises: 013_user_sessions
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '014_document_version_summary'
+down_revision = '013_user_sessions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Denormalized version_count / latest_version_id / latest_version_status
+    on documents, backfilled from document_versions (latest = highest
+    version_number)
+    """
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.add_column(sa.Column('version_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('latest_version_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('latest_version_status', sa.String(length=50), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_documents_latest_version_id', 'document_versions', ['latest_version_id'], ['id']
+        )
+        batch_op.create_index('ix_documents_latest_version_status', ['latest_version_status'])
+
+    op.execute("""
+        UPDATE documents SET
+            version_count = (
+                SELECT COUNT(*) FROM document_versions v WHERE v.document_id = documents.id
+            ),
+            latest_version_id = (
+                SELECT v.id FROM document_versions v WHERE v.document_id = documents.id
+                ORDER BY v.version_number DESC LIMIT 1
+            ),
+            latest_version_status = (
+                SELECT CAST(v.status AS VARCHAR(50)) FROM document_versions v WHERE v.document_id = documents.id
+                ORDER BY v.version_number DESC LIMIT 1
+            )
+    """)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.drop_index('ix_documents_latest_version_status')
+        batch_op.drop_constraint('fk_documents_latest_version_id', type_='foreignkey')
+        batch_op.drop_column('latest_version_status')
+        batch_op.drop_column('latest_version_id')
+        batch_op.drop_column('version_count')
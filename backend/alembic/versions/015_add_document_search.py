@@ -0,0 +1,93 @@
+"""add_document_search
+
+Revision ID: 015_document_search
+Revises: 014_document_version_summary
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '015_document_search'
+down_revision = '014_document_version_summary'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    document_search table plus its full-text index: an external-content
+    FTS5 table with sync triggers on SQLite, a generated weighted tsvector
+    with a GIN index on PostgreSQL. Rows are seeded from document metadata;
+    run scripts/rebuild_search_index.py afterwards to index version content.
+    """
+    op.create_table(
+        'document_search',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('version_id', sa.Integer(), nullable=True),
+        sa.Column('document_number', sa.String(length=100), nullable=False),
+        sa.Column('title', sa.String(length=500), nullable=False),
+        sa.Column('department', sa.String(length=100), nullable=True),
+        sa.Column('tags', sa.Text(), nullable=True),
+        sa.Column('body', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['version_id'], ['document_versions.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('document_id'),
+    )
+
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("""
+            ALTER TABLE document_search ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(document_number, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(department, '') || ' ' || coalesce(tags, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(body, '')), 'C')
+            ) STORED
+        """)
+        op.execute("CREATE INDEX ix_document_search_vector ON document_search USING GIN (search_vector)")
+    elif bind.dialect.name == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE document_search_fts USING fts5(
+                document_number, title, department, tags, body,
+                content='document_search', content_rowid='document_id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER document_search_ai AFTER INSERT ON document_search BEGIN
+                INSERT INTO document_search_fts(rowid, document_number, title, department, tags, body)
+                VALUES (new.document_id, new.document_number, new.title, new.department, new.tags, new.body);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER document_search_ad AFTER DELETE ON document_search BEGIN
+                INSERT INTO document_search_fts(document_search_fts, rowid, document_number, title, department, tags, body)
+                VALUES ('delete', old.document_id, old.document_number, old.title, old.department, old.tags, old.body);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER document_search_au AFTER UPDATE ON document_search BEGIN
+                INSERT INTO document_search_fts(document_search_fts, rowid, document_number, title, department, tags, body)
+                VALUES ('delete', old.document_id, old.document_number, old.title, old.department, old.tags, old.body);
+                INSERT INTO document_search_fts(rowid, document_number, title, department, tags, body)
+                VALUES (new.document_id, new.document_number, new.title, new.department, new.tags, new.body);
+            END
+        """)
+
+    op.execute("""
+        INSERT INTO document_search (document_id, document_number, title, department, updated_at)
+        SELECT id, document_number, title, department, updated_at FROM documents
+    """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        for trigger in ('document_search_ai', 'document_search_ad', 'document_search_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS document_search_fts")
+    op.drop_table('document_search')
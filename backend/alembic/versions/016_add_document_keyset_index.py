@@ -0,0 +1,28 @@
+"""add_document_keyset_index
+
+Revision ID: 016_document_keyset_index
+Revises: 015_document_search
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '016_document_keyset_index'
+down_revision = '015_document_search'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Composite (updated_at, id) index so document lists page by keyset
+    (WHERE (updated_at, id) < cursor ORDER BY updated_at DESC, id DESC)
+    without sorting the table
+    """
+    op.create_index('ix_documents_updated_at_id', 'documents', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_updated_at_id', table_name='documents')
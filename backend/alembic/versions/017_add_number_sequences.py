@@ -0,0 +1,35 @@
+"""add_number_sequences
+
+Revision ID: 017_number_sequences
+Revises: 016_document_keyset_index
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '017_number_sequences'
+down_revision = '016_document_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Named counters for document numbers and template codes. Rows are
+    created lazily on first use, seeded from the highest number already
+    issued for that key.
+    """
+    op.create_table(
+        'number_sequences',
+        sa.Column('key', sa.String(length=200), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('number_sequences')
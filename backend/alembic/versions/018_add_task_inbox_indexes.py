@@ -0,0 +1,35 @@
+"""add_task_inbox_indexes
+
+Revision ID: 018_task_inbox_indexes
+Revises: 017_number_sequences
+Create Date: 2026-10-16 19:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '018_task_inbox_indexes'
+down_revision = '017_number_sequences'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Indexes behind GET /me/tasks: latest versions by workflow status in
+    updated_at order, and unresolved comment counts per version
+    """
+    op.create_index(
+        'ix_document_versions_latest_status_updated', 'document_versions',
+        ['is_latest', 'status', 'updated_at'], unique=False,
+    )
+    op.create_index(
+        'ix_document_comments_version_resolved', 'document_comments',
+        ['document_version_id', 'is_resolved'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_comments_version_resolved', table_name='document_comments')
+    op.drop_index('ix_document_versions_latest_status_updated', table_name='document_versions')
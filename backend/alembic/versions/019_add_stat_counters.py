@@ -0,0 +1,51 @@
+"""add_stat_counters
+
+Revision ID: 019_stat_counters
+Revises: 018_task_inbox_indexes
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '019_stat_counters'
+down_revision = '018_task_inbox_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Dashboard counters maintained by the transactions that change
+    documents and users, seeded here from the current rows
+    """
+    op.create_table(
+        'stat_counters',
+        sa.Column('scope', sa.String(length=50), nullable=False),
+        sa.Column('key', sa.String(length=200), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('scope', 'key'),
+    )
+    live = "FROM documents WHERE NOT is_deleted"
+    op.execute(f"INSERT INTO stat_counters (scope, key, value, updated_at) SELECT 'documents', 'total', count(*), CURRENT_TIMESTAMP {live}")
+    op.execute(
+        "INSERT INTO stat_counters (scope, key, value, updated_at) "
+        f"SELECT 'document_status', upper(status), count(*), CURRENT_TIMESTAMP {live} AND status <> '' GROUP BY upper(status)"
+    )
+    op.execute(
+        "INSERT INTO stat_counters (scope, key, value, updated_at) "
+        f"SELECT 'document_department', department, count(*), CURRENT_TIMESTAMP {live} AND department IS NOT NULL AND department <> '' GROUP BY department"
+    )
+    op.execute(
+        "INSERT INTO stat_counters (scope, key, value, updated_at) "
+        f"SELECT 'version_status', latest_version_status, count(*), CURRENT_TIMESTAMP {live} AND latest_version_status IS NOT NULL AND latest_version_status <> '' GROUP BY latest_version_status"
+    )
+    op.execute("INSERT INTO stat_counters (scope, key, value, updated_at) SELECT 'users', 'total', count(*), CURRENT_TIMESTAMP FROM users")
+    op.execute("INSERT INTO stat_counters (scope, key, value, updated_at) SELECT 'users', 'active', count(*), CURRENT_TIMESTAMP FROM users WHERE is_active")
+
+
+def downgrade() -> None:
+    op.drop_table('stat_counters')
@@ -0,0 +1,61 @@
+"""add_notification_outbox
+
+Revision ID: 020_notification_outbox
+Revises: 019_stat_counters
+Create Date: 2026-10-16 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '020_notification_outbox'
+down_revision = '019_stat_counters'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Notification events written by workflow transitions and delivered
+    by the background outbox dispatcher
+    """
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(length=50), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('version_id', sa.Integer(), nullable=True),
+        sa.Column('actor_user_id', sa.Integer(), nullable=True),
+        sa.Column('payload', sa.JSON(), nullable=True),
+        sa.Column('event_id', sa.Integer(), nullable=True),
+        sa.Column('recipient_user_id', sa.Integer(), nullable=True),
+        sa.Column('recipient_email', sa.String(length=255), nullable=True),
+        sa.Column('subject', sa.String(length=500), nullable=True),
+        sa.Column('body_html', sa.Text(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['version_id'], ['document_versions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['actor_user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['event_id'], ['notification_outbox.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recipient_user_id'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_notification_outbox_id', 'notification_outbox', ['id'])
+    op.create_index('ix_notification_outbox_document_id', 'notification_outbox', ['document_id'])
+    op.create_index('ix_notification_outbox_event_id', 'notification_outbox', ['event_id'])
+    op.create_index('ix_notification_outbox_status_due', 'notification_outbox', ['status', 'next_attempt_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_outbox_status_due', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_event_id', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_document_id', table_name='notification_outbox')
+    op.drop_index('ix_notification_outbox_id', table_name='notification_outbox')
+    op.drop_table('notification_outbox')
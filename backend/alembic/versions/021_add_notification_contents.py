@@ -0,0 +1,82 @@
+"""add_notification_contents
+
+Revision ID: 021_notification_contents
+Revises: 020_notification_outbox
+Create Date: 2026-10-16 22:00:00.000000
+
+"""
+import hashlib
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '021_notification_contents'
+down_revision = '020_notification_outbox'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Rendered notification bodies stored once by hash; log and outbox rows
+    reference them and keep only the recipient's name
+    """
+    op.create_table(
+        'notification_contents',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('subject', sa.String(length=500), nullable=False),
+        sa.Column('body_html', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('hash'),
+    )
+
+    with op.batch_alter_table('notification_logs') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('recipient_name', sa.String(length=255), nullable=True))
+        batch_op.create_foreign_key('fk_notification_logs_content_hash', 'notification_contents', ['content_hash'], ['hash'])
+        batch_op.create_index('ix_notification_logs_content_hash', ['content_hash'])
+
+    with op.batch_alter_table('notification_outbox') as batch_op:
+        batch_op.add_column(sa.Column('recipient_name', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_foreign_key('fk_notification_outbox_content_hash', 'notification_contents', ['content_hash'], ['hash'])
+
+    # Move the bodies of not yet sent recipient rows into notification_contents
+    conn = op.get_bind()
+    pending = conn.execute(sa.text(
+        "SELECT id, subject, body_html FROM notification_outbox WHERE event_id IS NOT NULL AND status = 'PENDING'"
+    )).fetchall()
+    stored = set()
+    for row_id, subject, body_html in pending:
+        digest = hashlib.sha256(f"{subject}\0{body_html}".encode("utf-8")).hexdigest()
+        if digest not in stored:
+            conn.execute(
+                sa.text("INSERT INTO notification_contents (hash, subject, body_html, created_at) VALUES (:hash, :subject, :body, :now)"),
+                {"hash": digest, "subject": subject, "body": body_html, "now": datetime.utcnow()}
+            )
+            stored.add(digest)
+        conn.execute(sa.text("UPDATE notification_outbox SET content_hash = :hash WHERE id = :id"), {"hash": digest, "id": row_id})
+
+    with op.batch_alter_table('notification_outbox') as batch_op:
+        batch_op.drop_column('body_html')
+        batch_op.drop_column('subject')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('notification_outbox') as batch_op:
+        batch_op.drop_constraint('fk_notification_outbox_content_hash', type_='foreignkey')
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('recipient_name')
+        batch_op.add_column(sa.Column('subject', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('body_html', sa.Text(), nullable=True))
+
+    with op.batch_alter_table('notification_logs') as batch_op:
+        batch_op.drop_index('ix_notification_logs_content_hash')
+        batch_op.drop_constraint('fk_notification_logs_content_hash', type_='foreignkey')
+        batch_op.drop_column('recipient_name')
+        batch_op.drop_column('content_hash')
+
+    op.drop_table('notification_contents')
@@ -0,0 +1,48 @@
+"""add_notification_digests
+
+Revision ID: 022_notification_digests
+Revises: 021_notification_contents
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '022_notification_digests'
+down_revision = '021_notification_contents'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Per-recipient digest rows have no document and are referenced by the
+    outbox rows they fold together
+    """
+    with op.batch_alter_table('notification_outbox') as batch_op:
+        batch_op.alter_column('document_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.add_column(sa.Column('digest_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_notification_outbox_digest_id', 'notification_outbox', ['digest_id'], ['id'], ondelete='SET NULL'
+        )
+        batch_op.create_index('ix_notification_outbox_digest_id', ['digest_id'])
+
+
+def downgrade() -> None:
+    # Parked notifications, and those folded into a digest not sent yet, go
+    # out individually again; digest rows go away
+    op.execute("UPDATE notification_outbox SET status = 'PENDING' WHERE status = 'DIGEST'")
+    op.execute(
+        "UPDATE notification_outbox SET status = 'PENDING', processed_at = NULL "
+        "WHERE status = 'DIGESTED' AND digest_id IN ("
+        "SELECT id FROM notification_outbox WHERE document_id IS NULL AND status <> 'SENT')"
+    )
+    op.execute("DELETE FROM notification_outbox WHERE document_id IS NULL")
+
+    with op.batch_alter_table('notification_outbox') as batch_op:
+        batch_op.drop_index('ix_notification_outbox_digest_id')
+        batch_op.drop_constraint('fk_notification_outbox_digest_id', type_='foreignkey')
+        batch_op.drop_column('digest_id')
+        batch_op.alter_column('document_id', existing_type=sa.Integer(), nullable=False)
@@ -0,0 +1,29 @@
+"""add_audit_archive_entity_ranges
+
+Revision ID: 023_audit_archive_entity_ranges
+Revises: 022_notification_digests
+Create Date: 2026-10-16 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '023_audit_archive_entity_ranges'
+down_revision = '022_notification_digests'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Per-archive entity id ranges, {entity_type: [min_id, max_id]}, so
+    entity lookups skip archives that cannot contain the entity. Existing
+    archives keep NULL and are always searched.
+    """
+    op.add_column('audit_log_archives', sa.Column('entity_ranges', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('audit_log_archives', 'entity_ranges')
@@ -0,0 +1,32 @@
+"""add_audit_archive_chain_range
+
+Revision ID: 024_audit_archive_chain_range
+Revises: 023_audit_archive_entity_ranges
+Create Date: 2026-10-16 23:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '024_audit_archive_chain_range'
+down_revision = '023_audit_archive_entity_ranges'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """
+    Hash chain span of each archive, so verification can tell archived rows
+    from deleted ones and sealing resumes after the last archived link
+    """
+    op.add_column('audit_log_archives', sa.Column('first_chain_seq', sa.BigInteger(), nullable=True))
+    op.add_column('audit_log_archives', sa.Column('last_chain_seq', sa.BigInteger(), nullable=True))
+    op.add_column('audit_log_archives', sa.Column('last_row_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('audit_log_archives', 'last_row_hash')
+    op.drop_column('audit_log_archives', 'last_chain_seq')
+    op.drop_column('audit_log_archives', 'first_chain_seq')
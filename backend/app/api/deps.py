@@ -9,7 +9,9 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.core.security import decode_access_token
-from app.core.rbac import is_admin, has_permission
+from app.core.rbac import RoleEnum, mask_has_permission, mask_has_role
+from app.core.principal_cache import Principal, principal_cache, load_principal
+from app.core.session_registry import session_registry
 from app.models.user import User
 from app.schemas.auth import TokenData
 
@@ -17,12 +19,13 @@ from app.schemas.auth import TokenData
 security = HTTPBearer()
 
 
-def get_current_user(
+def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
     """
-    Get current authenticated user from JWT token
+    Get the authenticated principal (active flag, roles, permissions) from
+    the JWT token, served from the principal cache when possible
     
     Raises:
         HTTPException: If token is invalid or user not found
@@ -46,18 +49,49 @@ def get_current_user(
     if username is None or user_id is None:
         raise credentials_exception
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id, User.username == username).first()
+    # Single-session enforcement: the token's session must still be live
+    jti = payload.get("jti")
+    session_state = session_registry.check(db, jti) if jti else None
+    if session_state is None or session_state.user_id != user_id or not session_state.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session is no longer active",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    principal = principal_cache.get(user_id, lambda uid: load_principal(db, uid))
     
-    if user is None:
+    if principal is None or principal.username != username:
         raise credentials_exception
+    principal = principal.with_token_claims(payload)
     
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive",
         )
     
+    return principal
+
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Get current authenticated user from JWT token
+    
+    The cached snapshot is attached to the request session without a query.
+    Its roles are already loaded and its role mask is taken from the token,
+    so User.has_role/is_admin need neither a lazy load (blocking I/O from
+    async handlers) nor a scan of the roles list.
+    
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user = db.merge(principal.user, load=False)
+    user.role_mask = principal.role_mask
+    user.permission_mask = principal.permission_mask
     return user
 
 
@@ -79,6 +113,7 @@ def get_current_active_user(
 
 
 def require_admin(
+    principal: Principal = Depends(get_current_principal),
     current_user: User = Depends(get_current_active_user),
 ) -> User:
     """
@@ -87,9 +122,7 @@ def require_admin(
     Raises:
         HTTPException: If user is not an admin
     """
-    user_roles = [role.name for role in current_user.roles]
-    
-    if not is_admin(user_roles):
+    if not mask_has_role(principal.role_mask, RoleEnum.DMS_ADMIN.value):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required for this operation",
@@ -108,10 +141,11 @@ def require_permission(permission: str):
     Returns:
         Dependency function that checks for the permission
     """
-    def permission_checker(current_user: User = Depends(get_current_active_user)) -> User:
-        user_roles = [role.name for role in current_user.roles]
-        
-        if not has_permission(user_roles, permission):
+    def permission_checker(
+        principal: Principal = Depends(get_current_principal),
+        current_user: User = Depends(get_current_active_user),
+    ) -> User:
+        if not mask_has_permission(principal.permission_mask, permission):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Permission '{permission}' required for this operation",
@@ -2,7 +2,7 @@
 API v1 Routes
 """
 from fastapi import APIRouter
-from app.api.v1 import auth, users, audit_logs, documents, document_versions, edit_locks, attachments, comments, templates
+from app.api.v1 import auth, users, audit_logs, documents, document_versions, edit_locks, attachments, comments, templates, tasks, stats
 try:
     from app.api.v1 import export
     has_export = True
@@ -35,6 +35,12 @@ if has_export:
 # Comments
 api_router.include_router(comments.router, prefix="/documents", tags=["Comments"])
 
+# Task inbox of the current user
+api_router.include_router(tasks.router, prefix="/me", tags=["Tasks"])
+
+# Dashboard statistics
+api_router.include_router(stats.router, prefix="/stats", tags=["Statistics"])
+
 # Templates
 api_router.include_router(templates.router, prefix="/templates", tags=["Templates"])
 
@@ -4,7 +4,9 @@ Handles file uploads, downloads, and metadata (URS-DVM-007)
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from fastapi.responses import FileResponse, StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import Optional
 import os
 import hashlib
@@ -13,7 +15,8 @@ from pathlib import Path
 from datetime import datetime
 import mimetypes
 
-from app.api.deps import get_db, get_current_user
+from app.database import get_async_db
+from app.api.deps import get_current_user
 from app.models import Attachment, Document, DocumentVersion, User
 from app.schemas.attachment import AttachmentUpload, AttachmentResponse, AttachmentListResponse
 from app.core.audit import AuditLogger
@@ -58,7 +61,7 @@ async def save_upload_file(upload_file: UploadFile, dest_path: Path) -> tuple[in
 @router.post("", response_model=AttachmentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_attachment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     file: UploadFile = File(...),
     description: Optional[str] = Form(None),
@@ -74,10 +77,12 @@ async def upload_attachment(
     """
     # Validate document/version exists if provided
     if document_id:
-        document = db.query(Document).filter(
-            Document.id == document_id,
-            Document.is_deleted == False
-        ).first()
+        document = (await db.execute(
+            select(Document).filter(
+                Document.id == document_id,
+                Document.is_deleted == False
+            )
+        )).scalars().first()
         if not document:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -85,9 +90,11 @@ async def upload_attachment(
             )
     
     if document_version_id:
-        version = db.query(DocumentVersion).filter(
-            DocumentVersion.id == document_version_id
-        ).first()
+        version = (await db.execute(
+            select(DocumentVersion.id).filter(
+                DocumentVersion.id == document_version_id
+            )
+        )).scalars().first()
         if not version:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -144,11 +151,11 @@ async def upload_attachment(
         )
         
         db.add(attachment)
-        db.commit()
-        db.refresh(attachment)
+        await db.flush()
+        await db.refresh(attachment)
         
         # Audit log
-        AuditLogger.log(
+        await AuditLogger.log_async(
             db=db,
             user_id=current_user.id,
             username=current_user.username,
@@ -190,17 +197,19 @@ async def upload_attachment(
 @router.get("/{attachment_id}", response_model=AttachmentResponse)
 async def get_attachment_metadata(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     attachment_id: int
 ):
     """
     Get attachment metadata
     """
-    attachment = db.query(Attachment).filter(
-        Attachment.id == attachment_id,
-        Attachment.is_deleted == False
-    ).first()
+    attachment = (await db.execute(
+        select(Attachment).options(joinedload(Attachment.uploaded_by)).filter(
+            Attachment.id == attachment_id,
+            Attachment.is_deleted == False
+        )
+    )).scalars().first()
     
     if not attachment:
         raise HTTPException(
@@ -221,7 +230,7 @@ async def get_attachment_metadata(
 @router.get("/{attachment_id}/download")
 async def download_attachment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     attachment_id: int
 ):
@@ -230,10 +239,12 @@ async def download_attachment(
     
     Returns file as streaming response with original filename
     """
-    attachment = db.query(Attachment).filter(
-        Attachment.id == attachment_id,
-        Attachment.is_deleted == False
-    ).first()
+    attachment = (await db.execute(
+        select(Attachment).filter(
+            Attachment.id == attachment_id,
+            Attachment.is_deleted == False
+        )
+    )).scalars().first()
     
     if not attachment:
         raise HTTPException(
@@ -250,7 +261,7 @@ async def download_attachment(
         )
     
     # Audit log (optional - might be too verbose)
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -275,7 +286,7 @@ async def download_attachment(
 @router.delete("/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_attachment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     attachment_id: int
 ):
@@ -284,10 +295,12 @@ async def delete_attachment(
     
     File remains on disk for audit/recovery purposes
     """
-    attachment = db.query(Attachment).filter(
-        Attachment.id == attachment_id,
-        Attachment.is_deleted == False
-    ).first()
+    attachment = (await db.execute(
+        select(Attachment).filter(
+            Attachment.id == attachment_id,
+            Attachment.is_deleted == False
+        )
+    )).scalars().first()
     
     if not attachment:
         raise HTTPException(
@@ -307,10 +320,10 @@ async def delete_attachment(
     attachment.deleted_at = datetime.utcnow()
     attachment.deleted_by_id = current_user.id
     
-    db.commit()
+    await db.flush()
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -327,7 +340,7 @@ async def delete_attachment(
 @router.get("/document/{document_id}/list", response_model=AttachmentListResponse)
 async def list_document_attachments(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int
 ):
@@ -335,10 +348,12 @@ async def list_document_attachments(
     List all attachments for a document (across all versions)
     """
     # Verify document exists
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -347,10 +362,12 @@ async def list_document_attachments(
         )
     
     # Get attachments
-    attachments = db.query(Attachment).filter(
-        Attachment.document_id == document_id,
-        Attachment.is_deleted == False
-    ).order_by(Attachment.uploaded_at.desc()).all()
+    attachments = (await db.execute(
+        select(Attachment).options(joinedload(Attachment.uploaded_by)).filter(
+            Attachment.document_id == document_id,
+            Attachment.is_deleted == False
+        ).order_by(Attachment.uploaded_at.desc())
+    )).scalars().all()
     
     # Prepare responses
     attachment_responses = []
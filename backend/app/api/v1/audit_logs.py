@@ -4,28 +4,155 @@ Provides read-only access to audit logs for compliance officers and admins
 """
 from typing import Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, Query
+from itertools import islice
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.schemas.audit_log import AuditLogListResponse
-from app.models.audit_log import AuditLog
+from app.models.audit_log import AuditLog, AuditAction, AuditEntityType
 from app.models.user import User
-from app.api.deps import require_admin
+from app.models.document import Document
+from app.models.document_version import DocumentVersion
+from app.models.attachment import Attachment
+from app.models.comment import DocumentComment
+from app.api.deps import require_admin, get_client_ip, get_user_agent
+from app.core.audit import AuditLogger
+from app.core.audit_archive import (
+    ArchiveIntegrityError,
+    AuditLogFilters,
+    active_archives,
+    archived_rows,
+    check_archive,
+    count_archived_rows,
+)
+from app.core.audit_chain import verify_chain
+from app.utils.pagination import encode_cursor, decode_cursor, estimate_count
+from app.utils.audit_export import EXPORT_COLUMNS, iter_audit_export
 
 router = APIRouter()
 
 
-@router.get("", response_model=AuditLogListResponse, summary="Get Audit Logs")
-def get_audit_logs(
-    page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(50, ge=1, le=100, description="Items per page"),
+def get_audit_log_filters(
     action: Optional[str] = Query(None, description="Filter by action type"),
     entity_type: Optional[str] = Query(None, description="Filter by entity type"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     username: Optional[str] = Query(None, description="Filter by username"),
     start_date: Optional[datetime] = Query(None, description="Filter by start date"),
     end_date: Optional[datetime] = Query(None, description="Filter by end date"),
+) -> AuditLogFilters:
+    """Audit log filter query parameters"""
+    return AuditLogFilters(
+        action=action,
+        entity_type=entity_type,
+        user_id=user_id,
+        username=username,
+        start_date=start_date,
+        end_date=end_date,
+    )
+
+
+def _paginate_audit_logs(
+    db: Session,
+    filters: AuditLogFilters,
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    include_total: Optional[bool],
+    include_archived: bool = False,
+) -> AuditLogListResponse:
+    """
+    Page or keyset-paginate filtered audit logs, newest first
+
+    Archive files are only opened with `include_archived`, and then only the
+    ones the page can reach; otherwise the response just flags that older
+    matching history is archived.
+    """
+    # Base query with filters
+    query = filters.apply(db.query(AuditLog))
+    
+    if include_total is None:
+        include_total = cursor is None
+    
+    # Get total count (on the filtered query, before the cursor position)
+    total = query.count() if include_total else estimate_count(db, query)
+    total_is_estimate = not include_total
+    
+    # Archived rows are counted from the manifest, never from the files
+    older_history_archived = False
+    if include_archived:
+        archived_total, exact = count_archived_rows(db, filters)
+        total += archived_total
+        total_is_estimate = total_is_estimate or not exact
+    else:
+        older_history_archived = bool(active_archives(db, filters))
+    
+    # Order by timestamp descending (most recent first), id breaks ties
+    ordered = query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+    
+    # Apply pagination
+    position = None
+    if cursor:
+        try:
+            decoded = decode_cursor(cursor)
+            position = (decoded["ts"], decoded["id"])
+        except (ValueError, KeyError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor",
+            )
+        ordered = ordered.filter(
+            or_(
+                AuditLog.timestamp < position[0],
+                and_(AuditLog.timestamp == position[0], AuditLog.id < position[1]),
+            )
+        )
+    else:
+        ordered = ordered.offset((page - 1) * page_size)
+    
+    # Fetch one extra row to know whether there is a next page
+    logs = ordered.limit(page_size + 1).all()
+    
+    # Continue into the archive tier (always older than anything in the database)
+    if include_archived and len(logs) <= page_size:
+        skip = 0
+        if not cursor and not logs:
+            skip = max(0, (page - 1) * page_size - query.count())
+        archived = archived_rows(db, filters, before=position, skip=skip)
+        try:
+            logs.extend(AuditLog(**row) for row in islice(archived, page_size + 1 - len(logs)))
+        except ArchiveIntegrityError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Audit archive integrity check failed: {e}",
+            )
+    
+    next_cursor = None
+    if len(logs) > page_size:
+        logs = logs[:page_size]
+        next_cursor = encode_cursor({"ts": logs[-1].timestamp, "id": logs[-1].id})
+    
+    return AuditLogListResponse(
+        logs=logs,
+        total=total,
+        page=None if cursor else page,
+        page_size=page_size,
+        total_is_estimate=total_is_estimate,
+        next_cursor=next_cursor,
+        older_history_archived=older_history_archived,
+    )
+
+
+@router.get("", response_model=AuditLogListResponse, summary="Get Audit Logs")
+def get_audit_logs(
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor; replaces page"),
+    include_total: Optional[bool] = Query(None, description="Exact total count (default: true in page mode, false in cursor mode)"),
+    include_archived: bool = Query(False, description="Also search months moved to the archive tier"),
+    filters: AuditLogFilters = Depends(get_audit_log_filters),
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin),
 ):
@@ -40,45 +167,176 @@ def get_audit_logs(
     As an Admin, I want changes I make to be logged so that we maintain regulatory compliance.
     
     This endpoint provides comprehensive audit trail for FDA 21 CFR Part 11 compliance.
+    
+    **Pagination:** pass `cursor` (the previous response's `next_cursor`) for
+    keyset pagination on (timestamp, id), which stays fast on deep pages.
+    `page` is still supported. Without `include_total` the total is a cheap
+    estimate and `total_is_estimate` is true.
+    
+    Months moved to the archive tier are only searched with
+    `include_archived`, once the database rows matching the filters are
+    exhausted; archived rows are counted from the archive manifest, so the
+    total is an estimate unless the filters are date-only. Without it,
+    `older_history_archived` tells whether matching months were archived.
     """
-    # Base query
-    query = db.query(AuditLog)
+    return _paginate_audit_logs(db, filters, page, page_size, cursor, include_total, include_archived)
+
+
+@router.get("/documents/{document_id}", response_model=AuditLogListResponse, summary="Get Document Timeline")
+def get_document_timeline(
+    document_id: int,
+    page_size: int = Query(50, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor"),
+    include_total: bool = Query(False, description="Exact total count"),
+    include_archived: bool = Query(False, description="Also search months moved to the archive tier"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """
+    Get the full audit history of one document (Admin only)
     
-    # Apply filters
-    if action:
-        query = query.filter(AuditLog.action == action)
+    Events for the document, all of its versions, attachments and comments
+    in one stream, newest first, keyset-paginated. Each entity is read with
+    a range scan on the (entity_type, entity_id, timestamp) index.
     
-    if entity_type:
-        query = query.filter(AuditLog.entity_type == entity_type)
+    Only the database tier is read unless `include_archived` is set; then
+    only archives whose manifest entity ranges can contain the document's
+    entities are opened. `older_history_archived` flags that such archives
+    exist when they were not searched.
+    """
+    document = db.query(Document.id).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
     
-    if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
+    version_ids = [v for (v,) in db.query(DocumentVersion.id).filter(DocumentVersion.document_id == document_id)]
+    attachment_ids = [a for (a,) in db.query(Attachment.id).filter(
+        or_(Attachment.document_id == document_id, Attachment.document_version_id.in_(version_ids))
+    )]
+    comment_ids = [c for (c,) in db.query(DocumentComment.id).filter(
+        DocumentComment.document_version_id.in_(version_ids)
+    )]
     
-    if username:
-        query = query.filter(AuditLog.username.ilike(f"%{username}%"))
+    filters = AuditLogFilters(entities={
+        "Document": [document_id],
+        "DocumentVersion": version_ids,
+        "Attachment": attachment_ids,
+        "DocumentComment": comment_ids,
+    })
+    return _paginate_audit_logs(db, filters, 1, page_size, cursor, include_total, include_archived)
+
+
+@router.get("/export", summary="Export Audit Trail")
+def export_audit_logs(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format: csv or ndjson"),
+    compress: bool = Query(True, description="Gzip the export"),
+    include_archived: bool = Query(False, description="Also export months moved to the archive tier"),
+    filters: AuditLogFilters = Depends(get_audit_log_filters),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """
+    Stream the full audit trail matching the filters (Admin only)
     
-    if start_date:
-        query = query.filter(AuditLog.timestamp >= start_date)
+    Accepts the same filters as the audit log list. Rows are read through a
+    server-side cursor and encoded chunk by chunk, so memory stays flat for
+    multi-million-row exports. Archived months are included with
+    `include_archived`, once every archive involved matches its manifest
+    SHA-256.
+    """
+    # Refuse to export from archives that no longer match the manifest
+    if include_archived:
+        try:
+            for archive in active_archives(db, filters):
+                check_archive(archive)
+        except ArchiveIntegrityError as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Audit archive integrity check failed: {e}",
+            )
     
-    if end_date:
-        query = query.filter(AuditLog.timestamp <= end_date)
+    # The export itself is part of the audit trail
+    AuditLogger.log(
+        db=db,
+        user_id=admin.id,
+        username=admin.username,
+        action="AUDIT_TRAIL_EXPORTED",
+        entity_type="AuditLog",
+        entity_id=None,
+        description=f"Exported audit trail as {format}",
+        details={
+            "format": format,
+            "include_archived": include_archived,
+            "filters": {k: str(v) for k, v in vars(filters).items() if v is not None},
+        },
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+    )
     
-    # Order by timestamp descending (most recent first)
-    query = query.order_by(AuditLog.timestamp.desc())
+    # The request session is closed before the body streams, so the
+    # generator reads through its own session on the same engine
+    bind = db.get_bind()
     
-    # Get total count
-    total = query.count()
+    def rows():
+        export_db = Session(bind=bind)
+        try:
+            query = filters.apply(export_db.query(AuditLog)).order_by(
+                AuditLog.timestamp.desc(), AuditLog.id.desc()
+            )
+            for log in query.yield_per(1000):
+                yield {column: getattr(log, column) for column in EXPORT_COLUMNS}
+            if include_archived:
+                yield from archived_rows(export_db, filters)
+        finally:
+            export_db.close()
     
-    # Apply pagination
-    offset = (page - 1) * page_size
-    logs = query.offset(offset).limit(page_size).all()
+    filename = f"audit_trail_{datetime.utcnow():%Y%m%d_%H%M%S}.{format}"
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
     
-    return AuditLogListResponse(
-        logs=logs,
-        total=total,
-        page=page,
-        page_size=page_size,
+    return StreamingResponse(
+        iter_audit_export(rows(), export_format=format, compress=compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=\"{filename}\""},
+    )
+
+
+@router.post("/verify", summary="Verify Audit Log Integrity")
+def verify_audit_logs(
+    request: Request,
+    full: bool = Query(False, description="Re-verify from the start instead of the last good checkpoint"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """
+    Verify the tamper-evident hash chain over the audit log (Admin only)
+    
+    Incremental by default: resumes from the newest checkpoint that already
+    verified good. Returns the outcome, the first broken position if any,
+    and throughput.
+    """
+    report = verify_chain(db, full=full)
+    
+    AuditLogger.log(
+        db=db,
+        user_id=admin.id,
+        username=admin.username,
+        action="AUDIT_CHAIN_VERIFIED" if report["ok"] else "AUDIT_CHAIN_VERIFICATION_FAILED",
+        entity_type="AuditLog",
+        entity_id=None,
+        description=f"Audit chain verification {'passed' if report['ok'] else 'FAILED'}: {report['rows_verified']} rows checked",
+        details=report,
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+        synchronous=True,
     )
+    
+    return report
 
 
 @router.get("/actions", summary="Get Available Actions")
@@ -89,8 +347,11 @@ def get_available_actions(
     """
     Get list of all unique action types in the audit log
     Useful for building filters in the UI
+    
+    Read from the audit_actions lookup table maintained by AuditLogger.log,
+    so the cost does not grow with the audit log.
     """
-    actions = db.query(AuditLog.action).distinct().all()
+    actions = db.query(AuditAction.name).order_by(AuditAction.name).all()
     return {"actions": [action[0] for action in actions]}
 
 
@@ -102,8 +363,10 @@ def get_available_entity_types(
     """
     Get list of all unique entity types in the audit log
     Useful for building filters in the UI
+    
+    Read from the audit_entity_types lookup table maintained by AuditLogger.log.
     """
-    entity_types = db.query(AuditLog.entity_type).distinct().all()
+    entity_types = db.query(AuditEntityType.name).order_by(AuditEntityType.name).all()
     return {"entity_types": [entity_type[0] for entity_type in entity_types]}
 
 
@@ -2,22 +2,45 @@
 Authentication API Endpoints
 Handles login, logout, token management, and single session enforcement
 """
+import asyncio
+import json
 from datetime import datetime, timedelta
-from typing import Union
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
-from fastapi.responses import JSONResponse
+from typing import Any, Dict, Optional, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Header, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.schemas.auth import LoginRequest, Token, UserInfo, SessionConflictResponse
+from app.schemas.auth import LoginRequest, Token, UserInfo, SessionConflictResponse, SessionEventsTicket
 from app.models.user import User
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_and_update_password, create_access_token, decode_access_token
+from app.core import rbac
 from app.core.audit import AuditLogger
-from app.api.deps import get_current_active_user, get_current_user, get_client_ip, get_user_agent
+from app.core.principal_cache import Principal, invalidate_principal, principal_cache, load_principal
+from app.core.session_registry import (
+    SessionState,
+    session_registry,
+    create_session,
+    active_sessions,
+    revoke_user_sessions,
+)
+from app.api.deps import (
+    get_current_active_user,
+    get_current_principal,
+    get_client_ip,
+    get_user_agent,
+    security,
+)
 from app.config import settings
 
 router = APIRouter()
 
+# `typ` claim of session event stream tickets. They carry neither `sub`,
+# `user_id` nor `jti`, so they are never accepted as access tokens.
+_SESSION_EVENTS_TICKET = "session_events"
+
 
 @router.post("/login", response_model=Union[Token, SessionConflictResponse], summary="User Login")
 def login(
@@ -53,13 +76,16 @@ def login(
             ip_address=ip_address,
             user_agent=user_agent,
         )
+        # Failed attempts must be recorded even though the request errors out
+        db.commit()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
     
-    # Verify password
-    if not verify_password(login_data.password, user.hashed_password):
+    # Verify password (rehashing it if the configured hash cost changed)
+    password_ok, new_hash = verify_and_update_password(login_data.password, user.hashed_password)
+    if not password_ok:
         # Log failed login attempt
         AuditLogger.log_login_failed(
             db=db,
@@ -68,6 +94,8 @@ def login(
             ip_address=ip_address,
             user_agent=user_agent,
         )
+        # Failed attempts must be recorded even though the request errors out
+        db.commit()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -82,26 +110,30 @@ def login(
             ip_address=ip_address,
             user_agent=user_agent,
         )
+        # Failed attempts must be recorded even though the request errors out
+        db.commit()
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive",
         )
     
     # Check for existing active session (single session enforcement)
-    if user.active_session_token and not login_data.force_login:
+    existing_sessions = active_sessions(db, user.id)
+    if existing_sessions and not login_data.force_login:
         # There's an existing session - return conflict response
         return JSONResponse(
             status_code=status.HTTP_409_CONFLICT,
             content={
                 "session_conflict": True,
                 "message": "Another session is already active",
-                "existing_session_created_at": user.session_created_at.isoformat() if user.session_created_at else None,
+                "existing_session_created_at": existing_sessions[0].created_at.isoformat(),
                 "detail": "You are already logged in from another device/tab. Do you want to end that session and continue here?"
             }
         )
     
-    # If force_login, log the session override
-    if login_data.force_login and user.active_session_token:
+    # If force_login, end the other sessions and log the override
+    if login_data.force_login and existing_sessions:
+        revoke_user_sessions(db, user.id, reason="superseded")
         AuditLogger.log(
             db=db,
             user_id=user.id,
@@ -111,7 +143,7 @@ def login(
             entity_id=user.id,
             description=f"User {user.username} overrode existing session from new device/tab",
             details={
-                "previous_session_created_at": user.session_created_at.isoformat() if user.session_created_at else None,
+                "previous_session_created_at": existing_sessions[0].created_at.isoformat(),
                 "new_ip_address": ip_address,
                 "new_user_agent": user_agent
             },
@@ -119,24 +151,30 @@ def login(
             user_agent=user_agent,
         )
     
+    if new_hash:
+        user.hashed_password = new_hash
+    
     # Update last login timestamp
     user.last_login = datetime.utcnow()
     
-    # Create access token
+    invalidate_principal(db, user.id)
+    
+    # Register the session and bind the token to it
+    user_session = create_session(db, user.id, ip_address=ip_address, user_agent=user_agent)
     role_names = [role.name for role in user.roles]
     access_token = create_access_token(
         data={
             "sub": user.username,
             "user_id": user.id,
             "roles": role_names,
+            "jti": user_session.jti,
+            # Signed RBAC bitsets checked by require_permission/require_admin
+            "rmask": rbac.role_mask(role_names),
+            "perm": rbac.permission_mask(role_names),
+            "rbac": rbac.RBAC_VERSION,
         }
     )
     
-    # Store active session token
-    user.active_session_token = access_token
-    user.session_created_at = datetime.utcnow()
-    db.commit()
-    
     # Log successful login
     AuditLogger.log_login(
         db=db,
@@ -192,12 +230,9 @@ def logout(
     """
     User logout endpoint
     
-    Clears the active session token from the database.
+    Revokes the user's session in the session registry.
     """
-    # Clear the active session
-    current_user.active_session_token = None
-    current_user.session_created_at = None
-    db.commit()
+    revoke_user_sessions(db, current_user.id, reason="logout")
     
     # Log logout
     ip_address = get_client_ip(request)
@@ -219,15 +254,15 @@ def logout(
 
 @router.get("/validate-session", summary="Validate Current Session")
 def validate_session(
-    request: Request,
     authorization: str = Header(None),
     db: Session = Depends(get_db),
 ):
     """
     Validate if the current session token is still active.
     
-    Used by frontend to detect when session has been invalidated
-    (e.g., user logged in from another device).
+    Answered from the session registry (and the principal cache for the
+    account status) without reading `users`. Prefer /session-events, which
+    pushes the revocation instead of being polled.
     
     Returns:
     - valid: true if session is still active
@@ -236,42 +271,120 @@ def validate_session(
     if not authorization or not authorization.startswith("Bearer "):
         return {"valid": False, "reason": "No token provided"}
     
-    token = authorization.replace("Bearer ", "")
+    return _session_validity(db, authorization.replace("Bearer ", ""))[0]
+
+
+@router.post("/session-events/ticket", response_model=SessionEventsTicket, summary="Session Event Stream Ticket")
+def session_events_ticket(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    principal: Principal = Depends(get_current_principal),
+):
+    """
+    Issue a ticket for opening /session-events
+    
+    EventSource cannot send an Authorization header, and the access token
+    must not end up in URLs (access logs, proxy logs, browser history). The
+    ticket only names this token's session and expires after
+    SESSION_EVENTS_TICKET_SECONDS; a reconnecting client asks for a new one.
+    """
+    payload = decode_access_token(credentials.credentials)
+    ticket = create_access_token(
+        {"typ": _SESSION_EVENTS_TICKET, "uid": principal.user_id, "sid": payload["jti"]},
+        expires_delta=timedelta(seconds=settings.SESSION_EVENTS_TICKET_SECONDS),
+    )
+    return {"ticket": ticket, "expires_in": int(settings.SESSION_EVENTS_TICKET_SECONDS)}
+
+
+@router.get("/session-events", summary="Session Event Stream")
+async def session_events(
+    ticket: str = Query(..., description="Ticket from POST /session-events/ticket (EventSource cannot send headers)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Server-Sent Events stream that ends with a `session_revoked` event as
+    soon as the ticket's session is revoked (logout, forced login elsewhere)
+    or expires.
     
-    # Try to get the current user from the token
-    try:
-        from app.core.security import decode_access_token
-        payload = decode_access_token(token)
-        if not payload:
-            return {"valid": False, "reason": "Invalid token"}
-        
-        username = payload.get("sub")
-        user_id = payload.get("user_id")
-        
-        if not username or not user_id:
-            return {"valid": False, "reason": "Invalid token data"}
-        
-        # Get user and check if token matches active session
-        user = db.query(User).filter(
-            User.id == user_id,
-            User.username == username
-        ).first()
-        
-        if not user:
-            return {"valid": False, "reason": "User not found"}
-        
-        if not user.is_active:
-            return {"valid": False, "reason": "Account inactive"}
-        
-        # Check if this token matches the active session
-        if user.active_session_token != token:
-            return {
-                "valid": False, 
-                "reason": "Session invalidated",
-                "message": "Your session has been ended because you logged in from another device/tab."
-            }
-        
-        return {"valid": True}
-        
-    except Exception as e:
-        return {"valid": False, "reason": str(e)}
+    Keepalive comments are sent every SESSION_EVENTS_KEEPALIVE_SECONDS; each
+    one also re-reads the session row, so revocations made by other worker
+    processes arrive within that interval.
+    """
+    payload = decode_access_token(ticket)
+    if not payload or payload.get("typ") != _SESSION_EVENTS_TICKET or not payload.get("uid") or not payload.get("sid"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired session events ticket",
+        )
+    validity, state = await run_in_threadpool(_session_state_validity, db, payload["uid"], payload["sid"])
+    jti = state.jti if state else None
+    bind = db.get_bind()
+    
+    async def events():
+        queue = session_registry.subscribe(jti) if jti else None
+        try:
+            reason = None
+            if not validity["valid"]:
+                reason = state.revoked_reason if state and state.revoked_reason else validity["reason"]
+            while reason is None:
+                try:
+                    reason = await asyncio.wait_for(queue.get(), timeout=settings.SESSION_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    current = await run_in_threadpool(_reload_session_state, bind, jti)
+                    if current is None or not current.is_active:
+                        reason = current.revoked_reason if current and current.revoked_reason else "expired"
+                    else:
+                        yield ": keepalive\n\n"
+            yield f"event: session_revoked\ndata: {json.dumps({'reason': reason})}\n\n"
+        finally:
+            if queue is not None:
+                session_registry.unsubscribe(jti, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _session_validity(db: Session, token: str) -> Tuple[Dict[str, Any], Optional[SessionState]]:
+    """Validation response for a token, plus its registry state when it has one"""
+    payload = decode_access_token(token)
+    if not payload:
+        return {"valid": False, "reason": "Invalid token"}, None
+    
+    user_id = payload.get("user_id")
+    jti = payload.get("jti")
+    if not payload.get("sub") or not user_id or not jti:
+        return {"valid": False, "reason": "Invalid token data"}, None
+    return _session_state_validity(db, user_id, jti)
+
+
+def _session_state_validity(db: Session, user_id: int, jti: str) -> Tuple[Dict[str, Any], Optional[SessionState]]:
+    """Validation response for a session, plus its registry state when it has one"""
+    state = session_registry.check(db, jti)
+    if state is None or state.user_id != user_id:
+        return {"valid": False, "reason": "Session not found"}, None
+    
+    if state.revoked_reason == "superseded":
+        return {
+            "valid": False,
+            "reason": "Session invalidated",
+            "message": "Your session has been ended because you logged in from another device/tab."
+        }, state
+    if not state.is_active:
+        return {"valid": False, "reason": "Session ended" if state.revoked_reason else "Session expired"}, state
+    
+    principal = principal_cache.get(user_id, lambda uid: load_principal(db, uid))
+    if principal is None:
+        return {"valid": False, "reason": "User not found"}, state
+    if not principal.is_active:
+        return {"valid": False, "reason": "Account inactive"}, state
+    
+    return {"valid": True}, state
+
+
+def _reload_session_state(bind, jti: str) -> Optional[SessionState]:
+    """Re-read a session row, bypassing the front cache"""
+    session_registry.forget(jti)
+    with Session(bind=bind) as db:
+        return session_registry.check(db, jti)
@@ -3,11 +3,14 @@ Document Comment API Endpoints
 Handles inline comments and annotations
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 from typing import Optional
 
-from app.api.deps import get_db, get_current_user
+from app.database import get_async_db
+from app.api.deps import get_current_user
 from app.models import DocumentComment, DocumentVersion, Document, User
 from app.schemas.comment import CommentCreate, CommentUpdate, CommentResponse, CommentListResponse
 from app.core.audit import AuditLogger
@@ -18,7 +21,7 @@ router = APIRouter()
 @router.post("/{document_id}/versions/{version_id}/comments", response_model=CommentResponse)
 async def create_comment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int,
     version_id: int,
@@ -30,10 +33,12 @@ async def create_comment(
     All authenticated users can comment
     """
     # Verify document and version exist
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -41,10 +46,12 @@ async def create_comment(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
-        DocumentVersion.id == version_id,
-        DocumentVersion.document_id == document_id
-    ).first()
+    version = (await db.execute(
+        select(DocumentVersion).filter(
+            DocumentVersion.id == version_id,
+            DocumentVersion.document_id == document_id
+        )
+    )).scalars().first()
     
     if not version:
         raise HTTPException(
@@ -66,11 +73,12 @@ async def create_comment(
     )
     
     db.add(comment)
-    db.commit()
-    db.refresh(comment)
+    await db.flush()
+    await db.refresh(comment)
+    await db.refresh(comment, attribute_names=["author", "resolver"])
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -80,13 +88,13 @@ async def create_comment(
         description=f"Added comment to version {version.version_number} of document {document.document_number}"
     )
     
-    return _prepare_comment_response(db, comment)
+    return _prepare_comment_response(comment)
 
 
 @router.get("/{document_id}/versions/{version_id}/comments", response_model=CommentListResponse)
 async def list_comments(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int,
     version_id: int,
@@ -98,10 +106,12 @@ async def list_comments(
     All authenticated users can view comments
     """
     # Verify document and version exist
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -109,10 +119,12 @@ async def list_comments(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
-        DocumentVersion.id == version_id,
-        DocumentVersion.document_id == document_id
-    ).first()
+    version = (await db.execute(
+        select(DocumentVersion).filter(
+            DocumentVersion.id == version_id,
+            DocumentVersion.document_id == document_id
+        )
+    )).scalars().first()
     
     if not version:
         raise HTTPException(
@@ -121,16 +133,21 @@ async def list_comments(
         )
     
     # Query comments
-    query = db.query(DocumentComment).filter(
+    query = select(DocumentComment).options(
+        joinedload(DocumentComment.author),
+        joinedload(DocumentComment.resolver)
+    ).filter(
         DocumentComment.document_version_id == version_id
     )
     
     if not include_resolved:
         query = query.filter(DocumentComment.is_resolved == False)
     
-    comments = query.order_by(DocumentComment.created_at.desc()).all()
+    comments = (await db.execute(
+        query.order_by(DocumentComment.created_at.desc())
+    )).scalars().all()
     
-    comment_responses = [_prepare_comment_response(db, c) for c in comments]
+    comment_responses = [_prepare_comment_response(c) for c in comments]
     
     return CommentListResponse(
         comments=comment_responses,
@@ -141,7 +158,7 @@ async def list_comments(
 @router.patch("/{document_id}/versions/{version_id}/comments/{comment_id}", response_model=CommentResponse)
 async def update_comment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int,
     version_id: int,
@@ -154,10 +171,15 @@ async def update_comment(
     Comment text: Only comment author or admin can update
     Resolve: Comment author, document author/owner, or admin can resolve
     """
-    comment = db.query(DocumentComment).filter(
-        DocumentComment.id == comment_id,
-        DocumentComment.document_version_id == version_id
-    ).first()
+    comment = (await db.execute(
+        select(DocumentComment).options(
+            joinedload(DocumentComment.author),
+            joinedload(DocumentComment.resolver)
+        ).filter(
+            DocumentComment.id == comment_id,
+            DocumentComment.document_version_id == version_id
+        )
+    )).scalars().first()
     
     if not comment:
         raise HTTPException(
@@ -166,10 +188,12 @@ async def update_comment(
         )
     
     # Get the document to check ownership
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -223,11 +247,11 @@ async def update_comment(
     
     comment.updated_at = datetime.utcnow()
     
-    db.commit()
-    db.refresh(comment)
+    await db.flush()
+    await db.refresh(comment, attribute_names=["author", "resolver"])
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -237,13 +261,13 @@ async def update_comment(
         description=f"Updated comment on version {version_id}"
     )
     
-    return _prepare_comment_response(db, comment)
+    return _prepare_comment_response(comment)
 
 
 @router.delete("/{document_id}/versions/{version_id}/comments/{comment_id}")
 async def delete_comment(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int,
     version_id: int,
@@ -254,10 +278,12 @@ async def delete_comment(
     
     Only comment author or admin can delete
     """
-    comment = db.query(DocumentComment).filter(
-        DocumentComment.id == comment_id,
-        DocumentComment.document_version_id == version_id
-    ).first()
+    comment = (await db.execute(
+        select(DocumentComment).filter(
+            DocumentComment.id == comment_id,
+            DocumentComment.document_version_id == version_id
+        )
+    )).scalars().first()
     
     if not comment:
         raise HTTPException(
@@ -272,11 +298,11 @@ async def delete_comment(
             detail="Only comment author or admin can delete this comment"
         )
     
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.flush()
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -289,7 +315,7 @@ async def delete_comment(
     return {"message": "Comment deleted successfully"}
 
 
-def _prepare_comment_response(db: Session, comment: DocumentComment) -> CommentResponse:
+def _prepare_comment_response(comment: DocumentComment) -> CommentResponse:
     """Helper to prepare comment response with user info"""
     response = CommentResponse.from_orm(comment)
     
@@ -3,7 +3,7 @@ Document Version Management API Endpoints
 Handles version creation, editing, workflow, and content management
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, undefer
 from typing import Optional, List
 from datetime import datetime
 
@@ -22,9 +22,16 @@ from app.schemas.document_version import (
     PublishRequest,
     CreateNewVersionRequest,
 )
-from app.core.document_utils import get_next_version_number, compute_content_hash
+from app.core.document_utils import (
+    get_next_version_number,
+    compute_content_hash,
+    record_new_version,
+    set_latest_version,
+    sync_latest_version_status,
+)
 from app.core.audit import AuditLogger
-from app.core.security import verify_password
+from app.core.document_search import index_document
+from app.core.security import verify_user_password
 from app.utils.template_tokens import replace_tokens, TOKEN_PATTERN
 import re
 
@@ -265,13 +272,13 @@ def update_all_signatory_tokens(
     return updated_content
 
 
-def verify_esignature(user: User, password: str) -> bool:
+def verify_esignature(db: Session, user: User, password: str) -> bool:
     """
     Verify user password for e-signature compliance (21 CFR Part 11)
     
     Returns True if password is valid, raises HTTPException if not
     """
-    if not verify_password(password, user.hashed_password):
+    if not verify_user_password(db, user.id, password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid password. E-signature authentication failed."
@@ -345,7 +352,7 @@ def mark_content_as_viewed(db: Session, user_id: int, document_id: int, version_
         )
         db.add(view_record)
     
-    db.commit()
+    db.flush()
     db.refresh(view_record)
     return view_record
 
@@ -379,7 +386,7 @@ def requires_content_view(user: User, version: DocumentVersion) -> bool:
 
 
 @router.post("/{document_id}/versions", response_model=DocumentVersionResponse, status_code=status.HTTP_201_CREATED)
-async def create_version(
+def create_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -444,8 +451,10 @@ async def create_version(
     document.current_version_id = version.id
     document.status = VersionStatus.DRAFT.value
     document.updated_at = datetime.utcnow()
+    record_new_version(document, version)
     
-    db.commit()
+    index_document(db, document, version)
+    db.flush()
     db.refresh(version)
     
     # Audit log
@@ -470,7 +479,7 @@ async def create_version(
 
 
 @router.get("/{document_id}/versions", response_model=DocumentVersionListResponse)
-async def list_versions(
+def list_versions(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -545,8 +554,67 @@ async def list_versions(
     )
 
 
+@router.get("/{document_id}/versions/history", response_model=List[DocumentVersionListItem])
+def get_version_history_tree(
+    *,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    document_id: int
+):
+    """
+    Get full version history tree for a document
+    
+    Returns all versions including obsolete ones, ordered by version number descending.
+    Useful for displaying complete version history with parent-child relationships.
+    """
+    # Check document exists
+    document = db.query(Document).filter(
+        Document.id == document_id,
+        Document.is_deleted == False
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    # Get all versions
+    versions = db.query(DocumentVersion).filter(
+        DocumentVersion.document_id == document_id
+    ).options(
+        joinedload(DocumentVersion.created_by),
+        joinedload(DocumentVersion.approved_by)
+    ).order_by(DocumentVersion.version_number.desc()).all()
+    
+    # Prepare response
+    version_items = [
+        DocumentVersionListItem(
+            id=v.id,
+            document_id=v.document_id,
+            version_number=v.version_number,
+            version_string=v.version_string,
+            status=v.status,
+            change_summary=v.change_summary,
+            change_reason=v.change_reason,
+            change_type=v.change_type,
+            is_latest=v.is_latest,
+            effective_date=v.effective_date,
+            obsolete_date=v.obsolete_date,
+            created_by_id=v.created_by_id,
+            created_by_username=v.created_by.username if v.created_by else None,
+            approved_by_username=v.approved_by.username if v.approved_by else None,
+            created_at=v.created_at,
+            updated_at=v.updated_at
+        )
+        for v in versions
+    ]
+    
+    return version_items
+
+
 @router.get("/{document_id}/versions/{version_id}", response_model=DocumentVersionResponse)
-async def get_version(
+def get_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -568,7 +636,7 @@ async def get_version(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -590,7 +658,7 @@ async def get_version(
 
 
 @router.patch("/{document_id}/versions/{version_id}", response_model=DocumentVersionResponse)
-async def update_version(
+def update_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -616,7 +684,7 @@ async def update_version(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -646,7 +714,7 @@ async def update_version(
         version.attachments_metadata = version_in.attachments_metadata
     
     version.updated_at = datetime.utcnow()
-    db.commit()
+    db.flush()
     db.refresh(version)
     
     # Audit log
@@ -665,7 +733,7 @@ async def update_version(
 
 
 @router.post("/{document_id}/versions/{version_id}/save", response_model=DocumentVersionResponse)
-async def save_version_content(
+def save_version_content(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -692,7 +760,7 @@ async def save_version_content(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -761,7 +829,8 @@ async def save_version_content(
     version.updated_at = datetime.utcnow()
     version.lock_version += 1
     
-    db.commit()
+    index_document(db, document, version)
+    db.flush()
     db.refresh(version)
     
     # Audit log (conditional based on autosave policy)
@@ -866,67 +935,8 @@ def _compute_next_version_string(parent_version_string: str, change_type: Change
         return f"v{major}.{minor + 1}"
 
 
-@router.get("/{document_id}/versions/history", response_model=List[DocumentVersionListItem])
-async def get_version_history_tree(
-    *,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-    document_id: int
-):
-    """
-    Get full version history tree for a document
-    
-    Returns all versions including obsolete ones, ordered by version number descending.
-    Useful for displaying complete version history with parent-child relationships.
-    """
-    # Check document exists
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
-    
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
-        )
-    
-    # Get all versions
-    versions = db.query(DocumentVersion).filter(
-        DocumentVersion.document_id == document_id
-    ).options(
-        joinedload(DocumentVersion.created_by),
-        joinedload(DocumentVersion.approved_by)
-    ).order_by(DocumentVersion.version_number.desc()).all()
-    
-    # Prepare response
-    version_items = [
-        DocumentVersionListItem(
-            id=v.id,
-            document_id=v.document_id,
-            version_number=v.version_number,
-            version_string=v.version_string,
-            status=v.status,
-            change_summary=v.change_summary,
-            change_reason=v.change_reason,
-            change_type=v.change_type,
-            is_latest=v.is_latest,
-            effective_date=v.effective_date,
-            obsolete_date=v.obsolete_date,
-            created_by_id=v.created_by_id,
-            created_by_username=v.created_by.username if v.created_by else None,
-            approved_by_username=v.approved_by.username if v.approved_by else None,
-            created_at=v.created_at,
-            updated_at=v.updated_at
-        )
-        for v in versions
-    ]
-    
-    return version_items
-
-
 @router.post("/{document_id}/versions/{version_id}/create-new", response_model=DocumentVersionResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_version_from_existing(
+def create_new_version_from_existing(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -965,7 +975,7 @@ async def create_new_version_from_existing(
         )
     
     # Get parent version (must be Effective)
-    parent_version = db.query(DocumentVersion).filter(
+    parent_version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -1069,8 +1079,9 @@ async def create_new_version_from_existing(
     document.current_version_id = new_version.id
     document.status = VersionStatus.DRAFT.value
     document.updated_at = datetime.utcnow()
+    record_new_version(document, new_version)
     
-    db.commit()
+    db.flush()
     db.refresh(new_version)
     
     # Audit log
@@ -1099,7 +1110,7 @@ async def create_new_version_from_existing(
 # ==================== WORKFLOW ENDPOINTS ====================
 
 @router.post("/{document_id}/versions/{version_id}/submit", response_model=DocumentVersionResponse)
-async def submit_for_review(
+def submit_for_review(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -1113,7 +1124,7 @@ async def submit_for_review(
     Requires: Author or Admin + Password for E-Signature
     """
     # Verify e-signature (password)
-    verify_esignature(current_user, request_data.password)
+    verify_esignature(db, current_user, request_data.password)
     # Get document and version
     document = db.query(Document).filter(
         Document.id == document_id,
@@ -1126,7 +1137,7 @@ async def submit_for_review(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -1155,6 +1166,7 @@ async def submit_for_review(
     version.status = VersionStatus.UNDER_REVIEW
     version.submitted_at = datetime.utcnow()
     version.submitted_by_id = current_user.id
+    sync_latest_version_status(document, version)
     
     # Update signatory tokens - fill "Prepared By" section
     if version.content_html:
@@ -1175,7 +1187,8 @@ async def submit_for_review(
         version.content_hash = compute_content_hash(updated_content)
         version.updated_at = datetime.utcnow()
     
-    db.commit()
+    index_document(db, document, version)
+    db.flush()
     db.refresh(version)
     
     # Audit log with e-signature
@@ -1189,20 +1202,15 @@ async def submit_for_review(
         description=f"E-Signature: {current_user.username} submitted version {version.version_number} of document {document.document_number} for review. Action authenticated with password (21 CFR Part 11 compliant)."
     )
     
-    # Send email notification to reviewers
+    # Queue email notification to reviewers (sent after commit by the outbox dispatcher)
     from app.core.notification_dispatcher import notify_review_assigned
-    try:
-        await notify_review_assigned(db, document, version, current_user)
-    except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Failed to send review assignment notification: {str(e)}", exc_info=True)
+    notify_review_assigned(db, document, version, current_user)
     
     return _prepare_version_response(db, version, current_user)
 
 
 @router.post("/{document_id}/versions/{version_id}/approve", response_model=DocumentVersionResponse)
-async def approve_version(
+def approve_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -1219,7 +1227,7 @@ async def approve_version(
     Requires: Reviewer (for Under Review) or Approver (for Pending Approval) or Admin + Password for E-Signature
     """
     # Verify e-signature (password)
-    verify_esignature(current_user, request_data.password)
+    verify_esignature(db, current_user, request_data.password)
     
     comments = request_data.comments
     # Get document and version
@@ -1234,7 +1242,7 @@ async def approve_version(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -1265,6 +1273,7 @@ async def approve_version(
         version.status = VersionStatus.PENDING_APPROVAL
         version.reviewed_at = datetime.utcnow()
         version.reviewed_by_id = current_user.id
+        sync_latest_version_status(document, version)
         action_desc = "approved review"
         
         # Update signatory tokens - fill "Checked By" section while preserving "Prepared By"
@@ -1303,6 +1312,7 @@ async def approve_version(
         version.status = VersionStatus.APPROVED
         version.approved_at = datetime.utcnow()
         version.approved_by_id = current_user.id
+        sync_latest_version_status(document, version)
         action_desc = "approved document"
         
         # Update ALL signatory tokens when document is fully approved
@@ -1345,7 +1355,8 @@ async def approve_version(
             detail=f"Cannot approve version with status: {version.status.value}"
         )
     
-    db.commit()
+    index_document(db, document, version)
+    db.flush()
     db.refresh(version)
     
     # Audit log with e-signature
@@ -1359,26 +1370,21 @@ async def approve_version(
         description=f"E-Signature: {current_user.username} {action_desc} for version {version.version_number} of document {document.document_number}. Comments: {comments or 'None'}. Action authenticated with password (21 CFR Part 11 compliant)."
     )
     
-    # Send email notifications based on workflow state
+    # Queue email notifications based on workflow state
     from app.core.notification_dispatcher import notify_review_approved
-    try:
-        if version.status == VersionStatus.PENDING_APPROVAL:
-            # Review was approved, notify approvers
-            await notify_review_approved(db, document, version, current_user)
-        elif version.status == VersionStatus.APPROVED:
-            # Document was approved - no notification needed here
-            # Publication notification will be sent when document is published
-            pass
-    except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Failed to send approval notification: {str(e)}", exc_info=True)
+    if version.status == VersionStatus.PENDING_APPROVAL:
+        # Review was approved, notify approvers
+        notify_review_approved(db, document, version, current_user)
+    elif version.status == VersionStatus.APPROVED:
+        # Document was approved - no notification needed here
+        # Publication notification will be sent when document is published
+        pass
     
     return _prepare_version_response(db, version, current_user)
 
 
 @router.post("/{document_id}/versions/{version_id}/reject", response_model=DocumentVersionResponse)
-async def reject_version(
+def reject_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -1392,7 +1398,7 @@ async def reject_version(
     Requires: Reviewer, Approver, or Admin + Password for E-Signature
     """
     # Verify e-signature (password)
-    verify_esignature(current_user, request_data.password)
+    verify_esignature(db, current_user, request_data.password)
     
     reason = request_data.comments or "No reason provided"
     # Get document and version
@@ -1407,7 +1413,7 @@ async def reject_version(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -1445,8 +1451,9 @@ async def reject_version(
     version.status = VersionStatus.DRAFT
     version.rejected_at = datetime.utcnow()
     version.rejected_by_id = current_user.id
+    sync_latest_version_status(document, version)
     
-    db.commit()
+    db.flush()
     db.refresh(version)
     
     # Audit log with e-signature
@@ -1461,25 +1468,20 @@ async def reject_version(
         description=f"E-Signature: {current_user.username} rejected version {version.version_number} of document {document.document_number}. Previous status: {old_status}. Reason: {reason}. Action authenticated with password (21 CFR Part 11 compliant)."
     )
     
-    # Send email notification based on rejection type
+    # Queue email notification based on rejection type
     from app.core.notification_dispatcher import notify_review_rejected, notify_approval_rejected
-    try:
-        if old_status == "UNDER_REVIEW":
-            # Review was rejected, notify author
-            await notify_review_rejected(db, document, version, current_user, reason)
-        elif old_status == "PENDING_APPROVAL":
-            # Approval was rejected, notify author
-            await notify_approval_rejected(db, document, version, current_user, reason)
-    except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Failed to send rejection notification: {str(e)}", exc_info=True)
+    if old_status == "UNDER_REVIEW":
+        # Review was rejected, notify author
+        notify_review_rejected(db, document, version, current_user, reason)
+    elif old_status == "PENDING_APPROVAL":
+        # Approval was rejected, notify author
+        notify_approval_rejected(db, document, version, current_user, reason)
     
     return _prepare_version_response(db, version, current_user)
 
 
 @router.post("/{document_id}/versions/{version_id}/publish", response_model=DocumentVersionResponse)
-async def publish_version(
+def publish_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -1500,7 +1502,7 @@ async def publish_version(
     Requires: DMS_Admin only + Password for E-Signature
     """
     # Verify e-signature (password)
-    verify_esignature(current_user, request_data.password)
+    verify_esignature(db, current_user, request_data.password)
     
     # Check permissions - Admin only
     if not current_user.is_admin():
@@ -1521,7 +1523,7 @@ async def publish_version(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -1582,8 +1584,10 @@ async def publish_version(
     document.current_version_id = version.id
     document.status = "EFFECTIVE"
     document.updated_at = now
+    set_latest_version(document, version)
     
-    db.commit()
+    index_document(db, document, version)
+    db.flush()
     db.refresh(version)
     db.refresh(document)
     
@@ -1603,25 +1607,21 @@ async def publish_version(
         }
     )
     
-    # Send email notifications
+    # Queue email notifications; recipients are resolved and mailed by the
+    # outbox dispatcher after commit, so publishing does not wait on SMTP
     from app.core.notification_dispatcher import notify_document_effective, notify_version_obsoleted
-    try:
-        # Notify all users that document is now effective
-        await notify_document_effective(db, document, version)
-        
-        # Notify users about obsoleted versions
-        for prev_version in previous_effective_versions:
-            await notify_version_obsoleted(db, document, prev_version, version)
-    except Exception as e:
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.error(f"Failed to send publication notification: {str(e)}", exc_info=True)
+    # Notify all users that document is now effective
+    notify_document_effective(db, document, version)
+    
+    # Notify users about obsoleted versions
+    for prev_version in previous_effective_versions:
+        notify_version_obsoleted(db, document, prev_version, version)
     
     return _prepare_version_response(db, version, current_user)
 
 
 @router.post("/{document_id}/versions/{version_id}/mark-viewed", status_code=status.HTTP_200_OK)
-async def mark_version_as_viewed(
+def mark_version_as_viewed(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -1682,7 +1682,7 @@ async def mark_version_as_viewed(
 
 
 @router.post("/{document_id}/versions/{version_id}/archive", response_model=DocumentVersionResponse)
-async def archive_version(
+def archive_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -1696,7 +1696,7 @@ async def archive_version(
     Requires: DMS_Admin only + Password for E-Signature
     """
     # Verify e-signature (password)
-    verify_esignature(current_user, request_data.password)
+    verify_esignature(db, current_user, request_data.password)
     
     # Check permissions - Admin only
     if not current_user.is_admin():
@@ -1717,7 +1717,7 @@ async def archive_version(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -1733,12 +1733,14 @@ async def archive_version(
     version.status = VersionStatus.ARCHIVED
     version.archived_at = datetime.utcnow()
     version.archived_by_id = current_user.id
+    sync_latest_version_status(document, version)
     
     # Update document status if this is current version
     if document.current_version_id == version.id:
         document.status = "ARCHIVED"
     
-    db.commit()
+    index_document(db, document, version)
+    db.flush()
     db.refresh(version)
     db.refresh(document)
     
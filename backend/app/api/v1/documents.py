@@ -3,11 +3,14 @@ Document Management API Endpoints
 Handles CRUD operations for documents with RBAC enforcement
 """
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from typing import List, Optional
 from datetime import datetime
 
-from app.api.deps import get_db, get_current_user
+from app.database import get_async_db
+from app.api.deps import get_current_user
 from app.models import Document, DocumentVersion, User, VersionStatus
 from app.schemas.document import (
     DocumentCreate,
@@ -16,8 +19,12 @@ from app.schemas.document import (
     DocumentListResponse,
     DocumentDetailResponse,
     DocumentSearchFilters,
+    DocumentSearchHit,
+    DocumentSearchResponse,
 )
-from app.core.document_utils import generate_document_number, normalize_document_number
+from app.core.document_utils import generate_document_number, normalize_document_number, document_count_cache
+from app.core.document_search import index_document, search_documents
+from app.utils.pagination import encode_cursor, decode_cursor, estimate_count
 from app.core.audit import AuditLogger
 
 router = APIRouter()
@@ -46,7 +53,7 @@ def can_view_document(user: User, document: Document) -> bool:
 @router.post("", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
 async def create_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_in: DocumentCreate
 ):
@@ -66,15 +73,17 @@ async def create_document(
     if document_in.document_number:
         doc_number = normalize_document_number(document_in.document_number)
         # Check uniqueness
-        existing = db.query(Document).filter(Document.document_number == doc_number).first()
+        existing = (await db.execute(
+            select(Document.id).filter(Document.document_number == doc_number)
+        )).scalars().first()
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Document number {doc_number} already exists"
             )
     else:
-        doc_number = generate_document_number(
-            db, 
+        doc_number = await db.run_sync(
+            generate_document_number,
             prefix="SOP", 
             department=document_in.department
         )
@@ -102,11 +111,13 @@ async def create_document(
     )
     
     db.add(document)
-    db.commit()
-    db.refresh(document)
+    await db.flush()
+    await db.refresh(document)
+    await db.refresh(document, attribute_names=["owner"])
+    await db.run_sync(index_document, document)
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -126,7 +137,6 @@ async def create_document(
     response = DocumentResponse.from_orm(document)
     response.owner_username = document.owner.username if document.owner else None
     response.owner_full_name = document.owner.full_name if document.owner else None
-    response.version_count = 0
     
     return response
 
@@ -134,7 +144,7 @@ async def create_document(
 @router.get("", response_model=DocumentListResponse)
 async def list_documents(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     title: Optional[str] = Query(None, description="Filter by title (partial match)"),
     document_number: Optional[str] = Query(None, description="Filter by document number"),
@@ -143,7 +153,9 @@ async def list_documents(
     owner_id: Optional[int] = Query(None, description="Filter by owner ID"),
     show_all_statuses: bool = Query(False, description="Show all document statuses including obsolete"),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100)
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor; replaces page"),
+    include_total: Optional[bool] = Query(None, description="Exact total count (default: true in page mode, false in cursor mode)")
 ):
     """
     List and search documents with filters (URS-DVM-011)
@@ -151,13 +163,20 @@ async def list_documents(
     By default, shows only Effective documents (controlled versioning).
     Set show_all_statuses=true to see all documents including drafts and obsolete.
     
+    **Pagination:** pass `cursor` (the previous response's `next_cursor`) to
+    continue after the last row on (updated_at, id) instead of using OFFSET.
+    Exact totals are cached briefly per filter set; with include_total=false
+    the total is a cheap estimate (`total_is_estimate=true`), which suits
+    type-ahead searches.
+    
     All authenticated users can list documents
     """
     # Build query
-    query = db.query(Document).filter(Document.is_deleted == False)
+    query = select(Document).filter(Document.is_deleted == False)
     
-    # Workflow statuses that are stored on DocumentVersion, not Document
-    # These include all version workflow states except EFFECTIVE, OBSOLETE, ARCHIVED
+    # Workflow statuses that are tracked per version (Document.latest_version_status),
+    # not in Document.status. These include all version workflow states except
+    # EFFECTIVE, OBSOLETE, ARCHIVED
     workflow_statuses = {
         VersionStatus.DRAFT,
         VersionStatus.UNDER_REVIEW, 
@@ -183,21 +202,7 @@ async def list_documents(
     if status:
         if is_workflow_status:
             # Filter by latest version's status for workflow statuses
-            # Use a subquery to find documents with latest versions matching the status
-            # Convert string status to VersionStatus enum
-            try:
-                status_enum = VersionStatus(status.upper())
-            except ValueError:
-                # Invalid status, skip this filter
-                pass
-            else:
-                # Subquery to get document IDs with latest versions matching the status
-                from sqlalchemy import select
-                subquery = select(DocumentVersion.document_id).filter(
-                    DocumentVersion.is_latest == True,
-                    DocumentVersion.status == status_enum
-                )
-                query = query.filter(Document.id.in_(subquery))
+            query = query.filter(Document.latest_version_status == status.upper())
         else:
             # Filter by document status for non-workflow statuses (case-insensitive)
             # Document.status might be stored as "Draft" or "EFFECTIVE" etc.
@@ -205,14 +210,51 @@ async def list_documents(
     if owner_id:
         query = query.filter(Document.owner_id == owner_id)
     
-    # Count total
-    total = query.count()
+    if include_total is None:
+        include_total = cursor is None
+    
+    # Count total (on the filtered query, before the cursor position)
+    if include_total:
+        count_key = (title, document_number, department, status, owner_id, show_all_statuses)
+        total = document_count_cache.get(count_key)
+        if total is None:
+            total = (await db.execute(
+                select(func.count()).select_from(query.subquery())
+            )).scalar_one()
+            document_count_cache.set(count_key, total)
+    else:
+        total = await db.run_sync(estimate_count, query)
+    
+    # Newest first; id breaks ties so the keyset order is total
+    ordered = query.options(
+        joinedload(Document.owner)
+    ).order_by(Document.updated_at.desc(), Document.id.desc())
+    
+    if cursor:
+        try:
+            decoded = decode_cursor(cursor)
+            position = (decoded["ts"], decoded["id"])
+        except (ValueError, KeyError):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid pagination cursor",
+            )
+        ordered = ordered.filter(
+            or_(
+                Document.updated_at < position[0],
+                and_(Document.updated_at == position[0], Document.id < position[1]),
+            )
+        )
+    else:
+        ordered = ordered.offset((page - 1) * page_size)
+    
+    # Fetch one extra row to know whether there is a next page
+    documents = (await db.execute(ordered.limit(page_size + 1))).scalars().all()
     
-    # Paginate
-    documents = query.options(
-        joinedload(Document.owner),
-        joinedload(Document.versions)
-    ).order_by(Document.updated_at.desc()).offset((page - 1) * page_size).limit(page_size).all()
+    next_cursor = None
+    if len(documents) > page_size:
+        documents = documents[:page_size]
+        next_cursor = encode_cursor({"ts": documents[-1].updated_at, "id": documents[-1].id})
     
     # Prepare responses
     doc_responses = []
@@ -220,7 +262,6 @@ async def list_documents(
         response = DocumentResponse.from_orm(doc)
         response.owner_username = doc.owner.username if doc.owner else None
         response.owner_full_name = doc.owner.full_name if doc.owner else None
-        response.version_count = len(doc.versions)
         doc_responses.append(response)
     
     # Calculate total pages
@@ -229,16 +270,81 @@ async def list_documents(
     return DocumentListResponse(
         items=doc_responses,
         total=total,
-        page=page,
+        page=None if cursor else page,
         size=page_size,
-        pages=total_pages
+        pages=total_pages,
+        total_is_estimate=not include_total,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/search", response_model=DocumentSearchResponse)
+async def search_documents_endpoint(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in number, title, department, tags and content"),
+    department: Optional[str] = Query(None, description="Filter by department"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by document status"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor"),
+    page_size: int = Query(20, ge=1, le=100)
+):
+    """
+    Full-text search over documents, best match first
+    
+    Matches every word of `q` (the last one as a prefix) against the document
+    number, title, department, tags and the text of the effective version
+    (or the latest version if none is effective yet). Titles and content
+    snippets come back HTML-escaped with matches wrapped in <mark>.
+    
+    All authenticated users can search documents
+    """
+    after = None
+    if cursor:
+        try:
+            decoded = decode_cursor(cursor)
+            after = (float(decoded["score"]), int(decoded["id"]))
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor",
+            )
+    
+    # Fetch one extra hit to know whether there is a next page
+    hits = await db.run_sync(
+        search_documents, q, page_size + 1, after=after, department=department, status=status_filter
+    )
+    
+    next_cursor = None
+    if len(hits) > page_size:
+        hits = hits[:page_size]
+        next_cursor = encode_cursor({"score": hits[-1].score, "id": hits[-1].document_id})
+    
+    return DocumentSearchResponse(
+        items=[
+            DocumentSearchHit(
+                id=hit.document_id,
+                document_number=hit.document_number,
+                title=hit.title,
+                department=hit.department,
+                status=hit.status,
+                latest_version_status=hit.latest_version_status,
+                updated_at=hit.updated_at,
+                score=hit.score,
+                title_highlight=hit.title_highlight,
+                snippet=hit.snippet,
+            )
+            for hit in hits
+        ],
+        page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
 @router.get("/{document_id}", response_model=DocumentDetailResponse)
 async def get_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int
 ):
@@ -247,13 +353,15 @@ async def get_document(
     
     Returns document metadata and list of all versions
     """
-    document = db.query(Document).options(
-        joinedload(Document.owner),
-        joinedload(Document.versions).joinedload(DocumentVersion.created_by)
-    ).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).options(
+            joinedload(Document.owner),
+            selectinload(Document.versions).joinedload(DocumentVersion.created_by)
+        ).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -274,7 +382,6 @@ async def get_document(
     response = DocumentDetailResponse.from_orm(document)
     response.owner_username = document.owner.username if document.owner else None
     response.owner_full_name = document.owner.full_name if document.owner else None
-    response.version_count = len(document.versions)
     
     # Add version list
     response.versions = [
@@ -298,7 +405,7 @@ async def get_document(
 @router.patch("/{document_id}", response_model=DocumentResponse)
 async def update_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int,
     document_in: DocumentUpdate
@@ -308,10 +415,12 @@ async def update_document(
     
     Requires: Owner (Author) or Admin
     """
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -352,11 +461,13 @@ async def update_document(
         document.owner_id = document_in.owner_id
     
     document.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(document)
+    await db.flush()
+    await db.refresh(document, attribute_names=["owner"])
+    if changes.keys() & {"title", "department", "tags"}:
+        await db.run_sync(index_document, document, metadata_only=True)
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -371,7 +482,6 @@ async def update_document(
     response = DocumentResponse.from_orm(document)
     response.owner_username = document.owner.username if document.owner else None
     response.owner_full_name = document.owner.full_name if document.owner else None
-    response.version_count = len(document.versions)
     
     return response
 
@@ -379,7 +489,7 @@ async def update_document(
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int
 ):
@@ -389,10 +499,12 @@ async def delete_document(
     Requires: Owner (Author) or Admin
     Only drafts can be deleted
     """
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -408,7 +520,7 @@ async def delete_document(
         )
     
     # Check if document can be deleted (only drafts)
-    if document.status not in ["Draft", "Rejected"]:
+    if document.status not in (VersionStatus.DRAFT.value, VersionStatus.REJECTED.value):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Cannot delete document with status: {document.status}"
@@ -419,10 +531,10 @@ async def delete_document(
     document.deleted_at = datetime.utcnow()
     document.deleted_by_id = current_user.id
     
-    db.commit()
+    await db.flush()
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
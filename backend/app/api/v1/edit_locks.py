@@ -3,11 +3,14 @@ Edit Lock Management API Endpoints
 Handles concurrent editing locks with heartbeat and expiry (URS-DVM-006)
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 
-from app.api.deps import get_db, get_current_user
+from app.database import get_async_db
+from app.api.deps import get_current_user
 from app.models import Document, DocumentVersion, User, EditLock, VersionStatus
 from app.schemas.edit_lock import (
     EditLockAcquireRequest,
@@ -36,7 +39,7 @@ def can_acquire_lock(user: User, document: Document, version: DocumentVersion) -
 @router.post("/{document_id}/versions/{version_id}/lock", response_model=EditLockResponse)
 async def acquire_lock(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     request: Request,
     document_id: int,
@@ -50,10 +53,12 @@ async def acquire_lock(
     Locks expire after timeout_minutes (default 30)
     """
     # Get document and version
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -61,10 +66,12 @@ async def acquire_lock(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
-        DocumentVersion.id == version_id,
-        DocumentVersion.document_id == document_id
-    ).first()
+    version = (await db.execute(
+        select(DocumentVersion).filter(
+            DocumentVersion.id == version_id,
+            DocumentVersion.document_id == document_id
+        )
+    )).scalars().first()
     
     if not version:
         raise HTTPException(
@@ -80,9 +87,11 @@ async def acquire_lock(
         )
     
     # Check for existing lock
-    existing_lock = db.query(EditLock).filter(
-        EditLock.document_version_id == version_id
-    ).first()
+    existing_lock = (await db.execute(
+        select(EditLock).options(joinedload(EditLock.user)).filter(
+            EditLock.document_version_id == version_id
+        )
+    )).scalars().first()
     
     if existing_lock:
         # Check if lock is expired
@@ -100,13 +109,12 @@ async def acquire_lock(
             else:
                 # User already owns the lock, refresh it
                 existing_lock.refresh(extend_minutes=lock_request.timeout_minutes)
-                db.commit()
-                db.refresh(existing_lock)
+                await db.flush()
                 return _prepare_lock_response(existing_lock)
         else:
             # Lock expired, remove it
-            db.delete(existing_lock)
-            db.commit()
+            await db.delete(existing_lock)
+            await db.flush()
     
     # Create new lock
     lock_token = EditLock.generate_token()
@@ -124,17 +132,17 @@ async def acquire_lock(
     
     try:
         db.add(new_lock)
-        db.commit()
-        db.refresh(new_lock)
+        await db.flush()
+        await db.refresh(new_lock, attribute_names=["user"])
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_423_LOCKED,
             detail="Lock was just acquired by another user"
         )
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -156,7 +164,7 @@ async def acquire_lock(
 @router.get("/{document_id}/versions/{version_id}/lock", response_model=EditLockStatus)
 async def check_lock_status(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int,
     version_id: int
@@ -167,10 +175,12 @@ async def check_lock_status(
     Returns lock information if locked, or can_acquire if available
     """
     # Verify document and version exist
-    document = db.query(Document).filter(
-        Document.id == document_id,
-        Document.is_deleted == False
-    ).first()
+    document = (await db.execute(
+        select(Document).filter(
+            Document.id == document_id,
+            Document.is_deleted == False
+        )
+    )).scalars().first()
     
     if not document:
         raise HTTPException(
@@ -178,10 +188,12 @@ async def check_lock_status(
             detail="Document not found"
         )
     
-    version = db.query(DocumentVersion).filter(
-        DocumentVersion.id == version_id,
-        DocumentVersion.document_id == document_id
-    ).first()
+    version = (await db.execute(
+        select(DocumentVersion).filter(
+            DocumentVersion.id == version_id,
+            DocumentVersion.document_id == document_id
+        )
+    )).scalars().first()
     
     if not version:
         raise HTTPException(
@@ -190,9 +202,11 @@ async def check_lock_status(
         )
     
     # Get lock
-    lock = db.query(EditLock).filter(
-        EditLock.document_version_id == version_id
-    ).first()
+    lock = (await db.execute(
+        select(EditLock).options(joinedload(EditLock.user)).filter(
+            EditLock.document_version_id == version_id
+        )
+    )).scalars().first()
     
     if not lock or lock.is_expired():
         # No active lock
@@ -216,7 +230,7 @@ async def check_lock_status(
 @router.post("/{document_id}/versions/{version_id}/lock/heartbeat", response_model=EditLockResponse)
 async def refresh_lock(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int,
     version_id: int,
@@ -228,10 +242,12 @@ async def refresh_lock(
     Frontend should call this every 10-15 seconds while editing
     """
     # Get lock
-    lock = db.query(EditLock).filter(
-        EditLock.document_version_id == version_id,
-        EditLock.lock_token == heartbeat.lock_token
-    ).first()
+    lock = (await db.execute(
+        select(EditLock).options(joinedload(EditLock.user)).filter(
+            EditLock.document_version_id == version_id,
+            EditLock.lock_token == heartbeat.lock_token
+        )
+    )).scalars().first()
     
     if not lock:
         raise HTTPException(
@@ -248,8 +264,7 @@ async def refresh_lock(
     
     # Refresh lock
     lock.refresh(extend_minutes=heartbeat.extend_minutes)
-    db.commit()
-    db.refresh(lock)
+    await db.flush()
     
     return _prepare_lock_response(lock)
 
@@ -257,7 +272,7 @@ async def refresh_lock(
 @router.delete("/{document_id}/versions/{version_id}/lock", status_code=status.HTTP_204_NO_CONTENT)
 async def release_lock(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     document_id: int,
     version_id: int,
@@ -269,10 +284,12 @@ async def release_lock(
     Called when user closes editor or cancels editing
     """
     # Get lock
-    lock = db.query(EditLock).filter(
-        EditLock.document_version_id == version_id,
-        EditLock.lock_token == release_request.lock_token
-    ).first()
+    lock = (await db.execute(
+        select(EditLock).filter(
+            EditLock.document_version_id == version_id,
+            EditLock.lock_token == release_request.lock_token
+        )
+    )).scalars().first()
     
     if not lock:
         # Lock doesn't exist or already released
@@ -286,11 +303,11 @@ async def release_lock(
         )
     
     # Delete lock
-    db.delete(lock)
-    db.commit()
+    await db.delete(lock)
+    await db.flush()
     
     # Audit log
-    AuditLogger.log(
+    await AuditLogger.log_async(
         db=db,
         user_id=current_user.id,
         username=current_user.username,
@@ -4,7 +4,7 @@ Handles DOCX export and import with e-signature verification
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from datetime import datetime
 from io import BytesIO
 from pydantic import BaseModel
@@ -14,7 +14,8 @@ from app.api.deps import get_db, get_current_user
 from app.models import Document, DocumentVersion, User
 from app.utils.docx_export import html_to_docx, docx_to_html
 from app.core.audit import AuditLogger
-from app.core.security import verify_password
+from app.core.document_search import index_document
+from app.core.security import verify_user_password
 
 router = APIRouter()
 
@@ -26,7 +27,7 @@ class ExportRequest(BaseModel):
 
 
 @router.post("/{document_id}/versions/{version_id}/export/docx")
-async def export_version_to_docx(
+def export_version_to_docx(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -41,7 +42,7 @@ async def export_version_to_docx(
     All authenticated users can export
     """
     # Verify password for e-signature
-    if not verify_password(export_request.password, current_user.hashed_password):
+    if not verify_user_password(db, current_user.id, export_request.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid password. E-signature verification failed."
@@ -60,7 +61,7 @@ async def export_version_to_docx(
         )
     
     # Get version
-    version = db.query(DocumentVersion).filter(
+    version = db.query(DocumentVersion).options(undefer(DocumentVersion.content_html)).filter(
         DocumentVersion.id == version_id,
         DocumentVersion.document_id == document_id
     ).first()
@@ -132,7 +133,7 @@ async def export_version_to_docx(
 
 
 @router.post("/{document_id}/versions/{version_id}/import/docx")
-async def import_docx_to_version(
+def import_docx_to_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -192,7 +193,7 @@ async def import_docx_to_version(
     
     # Read file
     try:
-        content = await file.read()
+        content = file.file.read()
         docx_buffer = BytesIO(content)
         
         # Convert to HTML
@@ -202,7 +203,8 @@ async def import_docx_to_version(
         version.content_html = html_content
         version.updated_at = datetime.utcnow()
         
-        db.commit()
+        index_document(db, document, version)
+        db.flush()
         db.refresh(version)
         
         # Audit log
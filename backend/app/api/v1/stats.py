@@ -0,0 +1,43 @@
+"""
+Dashboard Statistics API Endpoints
+Document and user counts served from precomputed counters
+"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.api.deps import get_current_user
+from app.models import User
+from app.schemas.stats import DocumentStats, StatsResponse, UserStats
+from app.core.stats import read_stats
+
+router = APIRouter()
+
+
+@router.get("", response_model=StatsResponse)
+async def get_stats(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Dashboard counts in one call
+
+    Documents by status, department and latest version workflow state,
+    plus user totals (admins only). Read from `stat_counters`, which every
+    document/user change updates in its own transaction, so the cost does
+    not grow with the number of documents.
+
+    All authenticated users
+    """
+    stats = await db.run_sync(read_stats)
+    users = stats.get("users", {})
+    return StatsResponse(
+        documents=DocumentStats(
+            total=stats.get("documents", {}).get("total", 0),
+            by_status=stats.get("document_status", {}),
+            by_department=stats.get("document_department", {}),
+            by_version_status=stats.get("version_status", {}),
+        ),
+        users=UserStats(total=users.get("total", 0), active=users.get("active", 0)) if current_user.is_admin() else None,
+    )
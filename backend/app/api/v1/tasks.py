@@ -0,0 +1,116 @@
+"""
+Task Inbox API Endpoints
+The current user's actionable documents (drafts, reviews, approvals, publishing)
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+
+from app.database import get_async_db
+from app.api.deps import get_current_user
+from app.models import User
+from app.schemas.task import TaskItem, TaskListResponse
+from app.core.task_inbox import PRIORITIES, task_inbox_cache, task_query, task_roles, task_type
+from app.utils.pagination import encode_cursor, decode_cursor
+
+router = APIRouter()
+
+
+@router.get("/tasks", response_model=TaskListResponse)
+async def list_my_tasks(
+    *,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    priority: Optional[str] = Query(None, pattern="^(high|medium|low)$", description="Only tasks of this priority"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor"),
+    page_size: int = Query(50, ge=1, le=100)
+):
+    """
+    Documents waiting for the current user's action
+
+    One row per latest version the user can act on: drafts they may edit
+    (with unresolved comment counts), reviews for Reviewers, approvals for
+    Approvers, and approved versions to publish for Admins. Most recently
+    updated first, keyset paged; the first page also carries per-priority
+    counts. Pages are cached per user until documents, versions or
+    comments change.
+
+    All authenticated users (users without workflow roles get no tasks)
+    """
+    after = None
+    if cursor:
+        try:
+            decoded = decode_cursor(cursor)
+            after = (decoded["ts"], int(decoded["id"]))
+        except (ValueError, KeyError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid pagination cursor",
+            )
+
+    cache_key = (current_user.id, task_roles(current_user), priority, cursor, page_size)
+    cached = task_inbox_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    tasks = task_query(current_user)
+    if tasks is None:
+        return TaskListResponse(
+            items=[],
+            counts={"all": 0, **{name: 0 for name in PRIORITIES}} if cursor is None else None,
+            page_size=page_size,
+        )
+
+    query = select(tasks)
+    if priority:
+        query = query.where(tasks.c.priority == priority)
+    if after:
+        query = query.where(or_(
+            tasks.c.updated_at < after[0],
+            and_(tasks.c.updated_at == after[0], tasks.c.version_id < after[1]),
+        ))
+
+    # Fetch one extra row to know whether there is a next page
+    rows = (await db.execute(
+        query.order_by(tasks.c.updated_at.desc(), tasks.c.version_id.desc()).limit(page_size + 1)
+    )).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor({"ts": rows[-1].updated_at, "id": rows[-1].version_id})
+
+    counts = None
+    if cursor is None:
+        counts = {name: 0 for name in PRIORITIES}
+        for row in (await db.execute(
+            select(tasks.c.priority, func.count()).group_by(tasks.c.priority)
+        )).all():
+            counts[row[0]] = row[1]
+        counts["all"] = sum(counts.values())
+
+    response = TaskListResponse(
+        items=[
+            TaskItem(
+                document_id=row.document_id,
+                document_number=row.document_number,
+                title=row.title,
+                department=row.department,
+                version_id=row.version_id,
+                version_number=row.version_number,
+                version_string=row.version_string,
+                status=row.status.value,
+                task_type=task_type(row.status.value, row.unresolved_comments),
+                priority=row.priority,
+                unresolved_comments=row.unresolved_comments,
+                updated_at=row.updated_at,
+            )
+            for row in rows
+        ],
+        counts=counts,
+        page_size=page_size,
+        next_cursor=next_cursor,
+    )
+    task_inbox_cache.set(cache_key, response)
+    return response
@@ -4,7 +4,7 @@ Handles block-based template creation, editing, preview, and generation
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer
 from typing import Optional
 from datetime import datetime
 import os
@@ -28,7 +28,7 @@ from app.utils.template_tokens import (
     replace_tokens,
 )
 from app.utils.template_docx_generator import generate_docx_from_template
-from app.utils.template_code_generator import generate_template_code
+from app.utils.template_code_generator import generate_builder_template_code
 from app.core.audit import AuditLogger
 
 router = APIRouter()
@@ -72,32 +72,7 @@ async def create_template(
         
         # Generate a unique template code for the template itself (not for documents)
         # This will be used as a placeholder
-        base_code = f"TEMPLATE-{category}-{datetime.now().strftime('%Y%m%d')}"
-        template_code = base_code
-        
-        # Check if code exists and append sequence number if needed
-        existing_template = db.query(Template).filter(
-            Template.template_code == template_code,
-            Template.is_deleted == False
-        ).first()
-        
-        if existing_template:
-            # Find the highest sequence number for this base code
-            similar_templates = db.query(Template).filter(
-                Template.template_code.like(f"{base_code}-%"),
-                Template.is_deleted == False
-            ).all()
-            
-            max_seq = 0
-            for t in similar_templates:
-                if t.template_code and t.template_code.startswith(base_code + "-"):
-                    try:
-                        seq = int(t.template_code.split("-")[-1])
-                        max_seq = max(max_seq, seq)
-                    except ValueError:
-                        pass
-            
-            template_code = f"{base_code}-{max_seq + 1:03d}"
+        template_code = generate_builder_template_code(db, category)
         
         # Get template title
         template_title = None
@@ -238,7 +213,7 @@ async def create_template(
                 created_by_id=current_user.id,
             )
             db.add(template_version)
-            db.commit()
+            db.flush()
             db.refresh(template_version)
         except Exception as e:
             db.rollback()
@@ -326,7 +301,7 @@ async def get_template(
         )
     
     # Get latest version
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.template_id == template_id
     ).order_by(TemplateVersion.version_number.desc()).first()
     
@@ -389,7 +364,7 @@ async def update_template(
         )
     
     # Get current version
-    current_version = db.query(TemplateVersion).filter(
+    current_version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.template_id == template_id
     ).order_by(TemplateVersion.version_number.desc()).first()
     
@@ -541,11 +516,11 @@ async def update_template(
     if hasattr(template_in.template_data.metadata, 'confidentiality') and template_in.template_data.metadata.confidentiality:
         template.confidentiality = template_in.template_data.metadata.confidentiality
     
-    db.commit()
+    db.flush()
     db.refresh(template)
     
     # Get updated version
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.template_id == template_id
     ).order_by(TemplateVersion.version_number.desc()).first()
     
@@ -605,7 +580,7 @@ async def preview_template(
             detail="Template not found"
         )
     
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.template_id == template_id
     ).order_by(TemplateVersion.version_number.desc()).first()
     
@@ -663,7 +638,7 @@ async def generate_document(
             detail="Template not found"
         )
     
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.template_id == template_id
     ).order_by(TemplateVersion.version_number.desc()).first()
     
@@ -691,7 +666,7 @@ async def generate_document(
         
         # Update version with generated file path
         version.generated_docx_path = output_path
-        db.commit()
+        db.flush()
         
         # Audit log
         AuditLogger.log(
@@ -790,7 +765,7 @@ async def get_token_usage(
             detail="Template not found"
         )
     
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.template_id == template_id
     ).order_by(TemplateVersion.version_number.desc()).first()
     
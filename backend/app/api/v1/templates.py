@@ -4,7 +4,7 @@ Handles template upload, workflow, review, approval, and publishing
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
 from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, undefer
 from typing import List, Optional
 from datetime import datetime
 from pathlib import Path
@@ -38,7 +38,7 @@ from app.utils.template_converter import (
     get_template_storage_paths,
 )
 from app.core.audit import AuditLogger
-from app.core.security import verify_password
+from app.core.security import verify_user_password
 
 router = APIRouter()
 
@@ -59,7 +59,7 @@ def can_approve_template(user: User) -> bool:
 
 
 @router.post("/upload", response_model=TemplateVersionResponse, status_code=status.HTTP_201_CREATED)
-async def upload_template(
+def upload_template(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -154,7 +154,7 @@ async def upload_template(
         created_by_id=current_user.id,
     )
     db.add(template_version)
-    db.commit()
+    db.flush()
     db.refresh(template_version)
     
     # Audit log
@@ -184,7 +184,7 @@ async def upload_template(
 
 
 @router.get("", response_model=TemplateListResponse)
-async def list_templates(
+def list_templates(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -241,7 +241,7 @@ async def list_templates(
 
 
 @router.get("/published", response_model=List[TemplateResponse])
-async def list_published_templates(
+def list_published_templates(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -287,7 +287,7 @@ async def list_published_templates(
 
 
 @router.get("/{template_id}/versions", response_model=TemplateVersionListResponse)
-async def list_template_versions(
+def list_template_versions(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -309,7 +309,7 @@ async def list_template_versions(
             detail="Template not found"
         )
     
-    query = db.query(TemplateVersion).filter(
+    query = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.template_id == template_id
     )
     
@@ -337,7 +337,7 @@ async def list_template_versions(
 
 
 @router.get("/{template_id}/versions/{version_id}", response_model=TemplateVersionDetailResponse)
-async def get_template_version(
+def get_template_version(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -359,6 +359,7 @@ async def get_template_version(
         )
     
     version = db.query(TemplateVersion).options(
+        undefer(TemplateVersion.template_data),
         joinedload(TemplateVersion.created_by),
         joinedload(TemplateVersion.reviews).joinedload(TemplateReview.reviewer),
         joinedload(TemplateVersion.approvals).joinedload(TemplateApproval.approver)
@@ -412,7 +413,7 @@ async def get_template_version(
 
 
 @router.post("/{template_id}/versions/{version_id}/submit-for-review", response_model=TemplateVersionResponse)
-async def submit_for_review(
+def submit_for_review(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -438,7 +439,7 @@ async def submit_for_review(
             detail="Template not found"
         )
     
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.id == version_id,
         TemplateVersion.template_id == template_id
     ).first()
@@ -485,7 +486,7 @@ async def submit_for_review(
     version.status = TemplateStatus.UNDER_REVIEW
     version.submitted_for_review_at = datetime.utcnow()
     version.submitted_for_review_by_id = current_user.id
-    db.commit()
+    db.flush()
     db.refresh(version)
     
     # Audit log
@@ -512,7 +513,7 @@ async def submit_for_review(
 
 
 @router.post("/{template_id}/versions/{version_id}/reviews", response_model=TemplateReviewResponse, status_code=status.HTTP_201_CREATED)
-async def add_review_comment(
+def add_review_comment(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -569,7 +570,7 @@ async def add_review_comment(
         comment=review_in.comment,
     )
     db.add(review)
-    db.commit()
+    db.flush()
     db.refresh(review)
     
     # Audit log
@@ -598,7 +599,7 @@ async def add_review_comment(
 
 
 @router.post("/{template_id}/versions/{version_id}/submit-for-approval", response_model=TemplateVersionResponse)
-async def submit_for_approval(
+def submit_for_approval(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -624,7 +625,7 @@ async def submit_for_approval(
             detail="Template not found"
         )
     
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.id == version_id,
         TemplateVersion.template_id == template_id
     ).first()
@@ -671,7 +672,7 @@ async def submit_for_approval(
     version.status = TemplateStatus.PENDING_APPROVAL
     version.submitted_for_approval_at = datetime.utcnow()
     version.submitted_for_approval_by_id = current_user.id
-    db.commit()
+    db.flush()
     db.refresh(version)
     
     # Audit log
@@ -698,7 +699,7 @@ async def submit_for_approval(
 
 
 @router.post("/{template_id}/versions/{version_id}/approve", response_model=TemplateApprovalResponse)
-async def approve_template(
+def approve_template(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -750,7 +751,7 @@ async def approve_template(
         )
     
     # Verify password for e-signature
-    if not verify_password(approval_in.password, current_user.hashed_password):
+    if not verify_user_password(db, current_user.id, approval_in.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid password. E-signature authentication failed."
@@ -789,7 +790,7 @@ async def approve_template(
         version.rejected_by_id = current_user.id
         version.rejection_reason = approval_in.comment
     
-    db.commit()
+    db.flush()
     db.refresh(approval)
     
     # Audit log
@@ -819,7 +820,7 @@ async def approve_template(
 
 
 @router.post("/{template_id}/versions/{version_id}/publish", response_model=TemplateVersionResponse)
-async def publish_template(
+def publish_template(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -843,7 +844,7 @@ async def publish_template(
             detail="Template not found"
         )
     
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.id == version_id,
         TemplateVersion.template_id == template_id
     ).first()
@@ -882,7 +883,7 @@ async def publish_template(
     
     # Update template's current published version
     template.current_published_version_id = version_id
-    db.commit()
+    db.flush()
     db.refresh(version)
     
     # Audit log
@@ -909,7 +910,7 @@ async def publish_template(
 
 
 @router.get("/{template_id}/versions/{version_id}/html", response_model=TemplateUsageResponse)
-async def get_template_html(
+def get_template_html(
     *,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -932,7 +933,7 @@ async def get_template_html(
             detail="Template not found"
         )
     
-    version = db.query(TemplateVersion).filter(
+    version = db.query(TemplateVersion).options(undefer(TemplateVersion.template_data)).filter(
         TemplateVersion.id == version_id,
         TemplateVersion.template_id == template_id
     ).first()
@@ -1007,7 +1008,7 @@ async def get_template_html(
 
 
 @router.get("/{template_id}/images/{filename}")
-async def get_template_image(
+def get_template_image(
     template_id: int,
     filename: str,
     db: Session = Depends(get_db),
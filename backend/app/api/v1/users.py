@@ -19,6 +19,9 @@ from app.models.user import User
 from app.models.role import Role
 from app.core.security import get_password_hash
 from app.core.audit import AuditLogger
+from app.core.principal_cache import invalidate_principal
+from app.core.recipient_directory import invalidate_recipients
+from app.core.session_registry import revoke_user_sessions
 from app.api.deps import require_admin, get_current_active_user, get_client_ip, get_user_agent
 
 router = APIRouter()
@@ -88,7 +91,8 @@ def create_user(
     new_user.roles = roles
     
     db.add(new_user)
-    db.commit()
+    db.flush()
+    invalidate_recipients(db)
     db.refresh(new_user)
     
     # Audit log
@@ -248,6 +252,8 @@ def update_user(
     if user_data.is_active is not None:
         changes["is_active"] = {"old": user.is_active, "new": user_data.is_active}
         user.is_active = user_data.is_active
+        if not user.is_active:
+            revoke_user_sessions(db, user.id, reason="deactivated")
     
     # Update roles
     if user_data.role_ids is not None:
@@ -265,8 +271,12 @@ def update_user(
         if set(old_role_names) != set(new_role_names):
             changes["roles"] = {"old": old_role_names, "new": new_role_names}
             user.roles = new_roles
+            # Tokens carry the old permission masks; end those sessions
+            revoke_user_sessions(db, user.id, reason="roles_changed")
     
-    db.commit()
+    db.flush()
+    invalidate_recipients(db)
+    invalidate_principal(db, user.id)
     db.refresh(user)
     
     # Audit log
@@ -316,7 +326,9 @@ def activate_user(
         )
     
     user.is_active = True
-    db.commit()
+    db.flush()
+    invalidate_recipients(db)
+    invalidate_principal(db, user.id)
     db.refresh(user)
     
     # Audit log
@@ -371,7 +383,10 @@ def deactivate_user(
         )
     
     user.is_active = False
-    db.commit()
+    revoke_user_sessions(db, user.id, reason="deactivated")
+    db.flush()
+    invalidate_recipients(db)
+    invalidate_principal(db, user.id)
     db.refresh(user)
     
     # Audit log
@@ -423,7 +438,8 @@ def reset_user_password(
     user.hashed_password = get_password_hash(password_data.new_password)
     user.is_temp_password = password_data.force_change
     
-    db.commit()
+    db.flush()
+    invalidate_principal(db, user.id)
     
     # Audit log
     AuditLogger.log_password_reset(
@@ -489,7 +505,9 @@ def delete_user(
     )
     
     db.delete(user)
-    db.commit()
+    db.flush()
+    invalidate_recipients(db)
+    invalidate_principal(db, user_id)
     
     return None
 
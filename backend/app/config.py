@@ -24,11 +24,14 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./dms.db"
+    # Optional override for the asyncio engine; derived from DATABASE_URL when unset
+    # (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg)
+    ASYNC_DATABASE_URL: Optional[str] = None
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
     
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
+    @validator("BACKEND_CORS_ORIGINS", "NOTIFICATION_BCC_EVENTS", "NOTIFICATION_DIGEST_EVENTS", pre=True)
     def assemble_cors_origins(cls, v):
         if isinstance(v, str):
             return [i.strip() for i in v.split(",")]
@@ -40,11 +43,69 @@ class Settings(BaseSettings):
     FIRST_ADMIN_PASSWORD: str = "Admin@123456"
     
     # Password Policy
+    PASSWORD_HASH_ROUNDS: int = 29000  # pbkdf2_sha256 cost; hashes with other costs are redone at next login
+    PASSWORD_HASH_WORKERS: int = 4  # Threads dedicated to password hashing/verification
+    PASSWORD_HASH_QUEUE_MAX: int = 64  # Calls allowed to wait for a worker before answering 503
+    PASSWORD_HASH_TIMEOUT_SECONDS: float = 10.0
     MIN_PASSWORD_LENGTH: int = 8
     REQUIRE_PASSWORD_CHANGE_ON_RESET: bool = True
     
     # Audit
     AUDIT_LOG_RETENTION_DAYS: int = 2555  # ~7 years for pharma compliance
+    AUDIT_HOT_MONTHS: int = 3  # Months kept in the database before archiving
+    AUDIT_ARCHIVE_DIR: str = "storage/audit_archive"  # Compressed read-only monthly archives
+    AUDIT_CHECKPOINT_KEY: Optional[str] = None  # HMAC key for chain checkpoints; falls back to SECRET_KEY
+    AUDIT_CHECKPOINT_INTERVAL: int = 1000  # Sealed rows between signed checkpoints
+    AUDIT_VERIFY_BATCH_SIZE: int = 5000
+    AUDIT_VERIFY_WORKERS: int = 4  # Processes used by chain verification (1 = in-process)
+    AUDIT_BUFFERED_WRITES: bool = True  # Batch audit inserts in a background writer
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_FLUSH_BATCH_SIZE: int = 200
+    AUDIT_QUEUE_MAX_SIZE: int = 10000  # Flush synchronously beyond this backlog
+    
+    # Authentication
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0  # How long an authenticated user's roles/active flag are reused (0 disables)
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    SESSION_CACHE_TTL_SECONDS: float = 5.0  # Bound on how late other workers see a revoked session
+    SESSION_CACHE_MAX_SIZE: int = 50000
+    SESSION_EVENTS_KEEPALIVE_SECONDS: float = 25.0  # Comment lines keeping the session event stream open
+    SESSION_EVENTS_TICKET_SECONDS: float = 30.0  # Lifetime of the ticket that opens a session event stream
+    
+    # Pagination
+    COUNT_ESTIMATE_CAP: int = 10000  # Upper bound for capped count estimates on non-PostgreSQL databases
+    DOCUMENT_COUNT_CACHE_TTL_SECONDS: float = 30.0  # Reuse of exact document list totals (0 disables)
+    TASK_INBOX_CACHE_TTL_SECONDS: float = 30.0  # Reuse of per-user /me/tasks pages (0 disables)
+    
+    # Search
+    SEARCH_BODY_MAX_CHARS: int = 500000  # Stripped version text indexed per document
+    SEARCH_SNIPPET_WORDS: int = 24  # Approximate length of content snippets in search results
+    
+    # Dashboard statistics
+    STATS_RECONCILE_INTERVAL_SECONDS: float = 3600.0  # Rebuild of the stat counters from source rows (0 disables)
+    
+    # Notification outbox
+    NOTIFICATION_DISPATCH_INTERVAL_SECONDS: float = 2.0  # Poll interval; commits that queue notifications wake the dispatcher at once
+    NOTIFICATION_BATCH_SIZE: int = 200  # Outbox rows claimed per round
+    NOTIFICATION_MAX_CONCURRENCY: int = 10  # Messages in flight at once (SMTP_POOL_SIZE caps open connections)
+    NOTIFICATION_BCC_BATCH_SIZE: int = 50  # Recipients of identical messages sent as one BCC message (1 disables)
+    NOTIFICATION_BCC_EVENTS: List[str] = []  # Opt-in: sent unpersonalized so they can share a BCC message; must not be digest events
+    NOTIFICATION_MAX_ATTEMPTS: int = 5  # Then the row is marked FAILED
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 30.0  # Doubled after each failed attempt
+    NOTIFICATION_RETRY_MAX_SECONDS: float = 3600.0
+    NOTIFICATION_LEASE_SECONDS: float = 300.0  # Claimed rows are retried after this if the worker dies
+    NOTIFICATION_DIGEST_EVENTS: List[str] = ["DOCUMENT_EFFECTIVE", "VERSION_OBSOLETED"]  # Event types collected into per-user digests
+    NOTIFICATION_DIGEST_INTERVAL_SECONDS: float = 3600.0  # A user's digest is sent this long after its oldest entry
+    
+    @validator("NOTIFICATION_DIGEST_EVENTS")
+    def check_bcc_events_not_digested(cls, v, values):
+        # Digested rows are sent as per-recipient DIGEST rows, so they could
+        # never share a BCC message
+        both = set(v) & set(values.get("NOTIFICATION_BCC_EVENTS") or [])
+        if both:
+            raise ValueError(f"Event types cannot be both BCC and digest events: {', '.join(sorted(both))}")
+        return v
+    
+    RECIPIENT_DIRECTORY_TTL_SECONDS: float = 300.0  # Reuse of the active users/roles used to address notifications (0 disables)
     
     # Email/SMTP Configuration
     SMTP_HOST: Optional[str] = "smtp.gmail.com"
@@ -56,6 +117,10 @@ class Settings(BaseSettings):
     SMTP_USE_TLS: bool = True  # Use TLS for port 587
     SMTP_USE_SSL: bool = False  # Use SSL for port 465 (set to True if using port 465)
     EMAIL_ENABLED: bool = True  # Set to True to enable email notifications
+    SMTP_POOL_SIZE: int = 4  # Open SMTP connections per event loop
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100  # Then the connection is closed and reopened
+    SMTP_IDLE_TIMEOUT_SECONDS: float = 60.0  # Idle connections older than this are not reused
+    SMTP_TIMEOUT_SECONDS: float = 30.0
     
     class Config:
         env_file = ".env"
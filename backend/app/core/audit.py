@@ -1,11 +1,79 @@
 """
 Audit logging utilities for compliance tracking
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Set, Type
 from datetime import datetime
+from sqlalchemy import event, insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.audit_log import AuditLog
+from app.config import settings
+from app.models.audit_log import AuditLog, AuditAction, AuditEntityType
+from app.core.audit_writer import audit_writer
+
+# Actions authenticated with an e-signature (21 CFR Part 11). These are
+# always written inside the request transaction, never buffered.
+ESIGNATURE_ACTIONS = {
+    "VERSION_SUBMITTED",
+    "VERSION_APPROVED",
+    "VERSION_REJECTED",
+    "VERSION_PUBLISHED",
+    "VERSION_ARCHIVED",
+    "TEMPLATE_APPROVED",
+    "TEMPLATE_REJECTED",
+}
+
+# Session.info key holding buffered rows until the transaction commits
+_PENDING_AUDIT_KEY = "pending_audit_rows"
+
+
+# Session.info key holding lookup names inserted by the open transaction
+_PENDING_LOOKUP_KEY = "pending_audit_lookups"
+
+# In-process cache of committed lookup names (None until first loaded)
+_lookup_cache: Dict[Type, Optional[Set[str]]] = {AuditAction: None, AuditEntityType: None}
+
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_pending_audit_rows(session):
+    rows = session.info.pop(_PENDING_AUDIT_KEY, None)
+    if rows:
+        audit_writer.enqueue(rows)
+    for model, name in session.info.pop(_PENDING_LOOKUP_KEY, []):
+        if _lookup_cache[model] is not None:
+            _lookup_cache[model].add(name)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_audit_rows(session):
+    # The audited change never happened, so neither did its audit entry
+    session.info.pop(_PENDING_AUDIT_KEY, None)
+    session.info.pop(_PENDING_LOOKUP_KEY, None)
+
+
+def reset_audit_lookup_cache():
+    """Forget cached lookup names (reloaded from the tables on next use)"""
+    for model in _lookup_cache:
+        _lookup_cache[model] = None
+
+
+def _register_lookup(db: Session, model: Type, name: str):
+    """Insert `name` into a lookup table unless it is already known"""
+    known = _lookup_cache[model]
+    if known is None:
+        known = _lookup_cache[model] = {row[0] for row in db.query(model.name).all()}
+    if name in known:
+        return
+    
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.execute(postgresql.insert(model).values(name=name).on_conflict_do_nothing(index_elements=["name"]))
+    elif dialect == "sqlite":
+        db.execute(sqlite.insert(model).values(name=name).on_conflict_do_nothing(index_elements=["name"]))
+    elif not db.query(model.id).filter(model.name == name).first():
+        db.execute(insert(model).values(name=name))
+    db.info.setdefault(_PENDING_LOOKUP_KEY, []).append((model, name))
 
 
 class AuditLogger:
@@ -26,10 +94,16 @@ class AuditLogger:
         details: Optional[Dict[str, Any]] = None,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None,
+        synchronous: bool = False,
     ) -> AuditLog:
         """
         Create an audit log entry
         
+        When the buffered audit writer is running, the row is queued on the
+        session and handed to the writer once the request commits. E-signature
+        actions, `synchronous=True` calls and calls made while the writer is
+        not running (scripts, tests) are flushed in the caller's transaction.
+        
         Args:
             db: Database session
             user_id: ID of user performing action (None for system actions)
@@ -41,9 +115,10 @@ class AuditLogger:
             details: Additional structured data (JSON)
             ip_address: IP address of the user
             user_agent: User agent string
+            synchronous: Write inside the caller's transaction instead of buffering
             
         Returns:
-            Created AuditLog instance
+            Created AuditLog instance (flushed, or transient when buffered)
         """
         audit_log = AuditLog(
             user_id=user_id,
@@ -58,12 +133,37 @@ class AuditLogger:
             timestamp=datetime.utcnow(),
         )
         
-        db.add(audit_log)
-        db.commit()
-        db.refresh(audit_log)
+        _register_lookup(db, AuditAction, action)
+        _register_lookup(db, AuditEntityType, entity_type)
+        
+        buffered = (
+            settings.AUDIT_BUFFERED_WRITES
+            and audit_writer.running
+            and not synchronous
+            and action not in ESIGNATURE_ACTIONS
+        )
+        
+        if buffered:
+            row = {c.name: getattr(audit_log, c.name) for c in AuditLog.__table__.columns if c.name != "id"}
+            db.info.setdefault(_PENDING_AUDIT_KEY, []).append(row)
+        else:
+            # Flush only: the row is committed with the rest of the request's
+            # unit of work by get_db(), or rolled back together with it.
+            db.add(audit_log)
+            db.flush()
         
         return audit_log
     
+    @staticmethod
+    async def log_async(db: AsyncSession, **kwargs) -> AuditLog:
+        """
+        Create an audit log entry from an AsyncSession
+        
+        Accepts the same keyword arguments as log() and runs it on the
+        session's synchronous facade, so both paths write identical rows.
+        """
+        return await db.run_sync(lambda sync_db: AuditLogger.log(db=sync_db, **kwargs))
+    
     @staticmethod
     def log_user_created(
         db: Session,
@@ -0,0 +1,402 @@
+"""
+Audit log storage tiers and retention
+Hot months live in `audit_logs` (monthly partitions on PostgreSQL); aged
+months are moved to compressed, read-only archive files that stay queryable
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, false, or_, text
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+from app.models.audit_log import AuditLog, AuditLogArchive
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = [c.name for c in AuditLog.__table__.columns]
+
+# (path, sha256, size, mtime) of archive files already found intact in this process
+_checked_archives: Set[Tuple[str, str, int, int]] = set()
+
+
+class ArchiveIntegrityError(Exception):
+    """An archive file no longer matches its manifest entry"""
+
+
+@dataclass
+class AuditLogFilters:
+    """Audit log filters shared by the database and archive tiers"""
+    action: Optional[str] = None
+    entity_type: Optional[str] = None
+    user_id: Optional[int] = None
+    username: Optional[str] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    # Restrict to specific entities: {"DocumentVersion": [1, 2], ...}
+    entities: Optional[Dict[str, List[int]]] = None
+
+    def apply(self, query: Query) -> Query:
+        """Apply the filters to a query over AuditLog"""
+        if self.entities is not None:
+            # One (entity_type, entity_id) index range per entity type
+            query = query.filter(or_(false(), *(
+                and_(AuditLog.entity_type == entity_type, AuditLog.entity_id.in_(ids))
+                for entity_type, ids in self.entities.items() if ids
+            )))
+        if self.action:
+            query = query.filter(AuditLog.action == self.action)
+        if self.entity_type:
+            query = query.filter(AuditLog.entity_type == self.entity_type)
+        if self.user_id:
+            query = query.filter(AuditLog.user_id == self.user_id)
+        if self.username:
+            query = query.filter(AuditLog.username.ilike(f"%{self.username}%"))
+        if self.start_date:
+            query = query.filter(AuditLog.timestamp >= self.start_date)
+        if self.end_date:
+            query = query.filter(AuditLog.timestamp <= self.end_date)
+        return query
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        """Same filters evaluated against an archived row"""
+        if self.entities is not None and row["entity_id"] not in self.entities.get(row["entity_type"], ()):
+            return False
+        if self.action and row["action"] != self.action:
+            return False
+        if self.entity_type and row["entity_type"] != self.entity_type:
+            return False
+        if self.user_id and row["user_id"] != self.user_id:
+            return False
+        if self.username and self.username.lower() not in row["username"].lower():
+            return False
+        if self.start_date and row["timestamp"] < self.start_date:
+            return False
+        if self.end_date and row["timestamp"] > self.end_date:
+            return False
+        return True
+
+    def covers(self, period_start: datetime, period_end: datetime) -> bool:
+        """Whether every row in [period_start, period_end) matches the filters"""
+        if self.entities is not None or self.action or self.entity_type or self.user_id or self.username:
+            return False
+        if self.start_date and self.start_date > period_start:
+            return False
+        if self.end_date and self.end_date < period_end:
+            return False
+        return True
+
+    def overlaps(self, period_start: datetime, period_end: datetime) -> bool:
+        """Whether the date filters can match anything in [period_start, period_end)"""
+        if self.start_date and self.start_date >= period_end:
+            return False
+        if self.end_date and self.end_date < period_start:
+            return False
+        return True
+
+    def may_match(self, archive: AuditLogArchive) -> bool:
+        """Whether the archive can hold matching rows, judged from its manifest entry"""
+        if not self.overlaps(archive.period_start, archive.period_end):
+            return False
+        ranges = archive.entity_ranges
+        if ranges is None:
+            return True
+        if self.entity_type and self.entity_type not in ranges:
+            return False
+        if self.entities is not None:
+            for entity_type, ids in self.entities.items():
+                low, high = ranges.get(entity_type, (None, None))
+                if low is not None and any(low <= i <= high for i in ids):
+                    return True
+            return False
+        return True
+
+
+def month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def hot_boundary(now: Optional[datetime] = None) -> datetime:
+    """First day of the oldest month kept in the database"""
+    now = now or datetime.utcnow()
+    return add_months(month_start(now), -(settings.AUDIT_HOT_MONTHS - 1))
+
+
+def partition_name(period_start: datetime) -> str:
+    return f"audit_logs_y{period_start.year}m{period_start.month:02d}"
+
+
+def ensure_partitions(db: Session, months_ahead: int = 2, now: Optional[datetime] = None):
+    """
+    Create monthly partitions for the hot window and the next few months
+
+    PostgreSQL only: `audit_logs` is range-partitioned on timestamp there
+    (migration 009). Other databases keep a single table and this is a no-op.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+
+    period = hot_boundary(now)
+    last = add_months(month_start(now or datetime.utcnow()), months_ahead)
+    while period <= last:
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(period)} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{period.isoformat()}') TO ('{add_months(period, 1).isoformat()}')"
+        ))
+        period = add_months(period, 1)
+
+
+def _serialize(row: AuditLog) -> str:
+    data = {name: getattr(row, name) for name in ARCHIVE_COLUMNS}
+    data["timestamp"] = data["timestamp"].isoformat()
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def _deserialize(line: str) -> Dict[str, Any]:
+    row = json.loads(line)
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+def archive_month(db: Session, period_start: datetime) -> AuditLogArchive:
+    """
+    Move one month of audit logs from the database into an archive file
+
+    Rows are written newest first as gzip NDJSON, the file is made read-only
+    and its SHA-256 recorded in the manifest, then the month is removed from
+    `audit_logs` (partition dropped on PostgreSQL). Pending rows are sealed
+    first so the manifest can record the month's hash chain span. The caller
+    commits.
+    """
+    # audit_chain reads archives back through this module
+    from app.core.audit_chain import seal_pending
+    while seal_pending(db):
+        pass
+
+    period_end = add_months(period_start, 1)
+    archive_dir = Path(settings.AUDIT_ARCHIVE_DIR)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    final_path = archive_dir / f"{partition_name(period_start)}.ndjson.gz"
+    temp_path = final_path.with_suffix(".tmp")
+
+    rows = (
+        db.query(AuditLog)
+        .filter(AuditLog.timestamp >= period_start, AuditLog.timestamp < period_end)
+        .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())
+        .yield_per(1000)
+    )
+
+    row_count = 0
+    min_id = max_id = None
+    first_seq = last_seq = last_hash = None
+    entity_ranges: Dict[str, List[int]] = {}
+    with gzip.open(temp_path, "wt", encoding="utf-8") as archive_file:
+        for row in rows:
+            archive_file.write(_serialize(row) + "\n")
+            row_count += 1
+            min_id = row.id if min_id is None else min(min_id, row.id)
+            max_id = row.id if max_id is None else max(max_id, row.id)
+            if row.chain_seq is not None:
+                first_seq = row.chain_seq if first_seq is None else min(first_seq, row.chain_seq)
+                if last_seq is None or row.chain_seq > last_seq:
+                    last_seq, last_hash = row.chain_seq, row.row_hash
+            low, high = entity_ranges.setdefault(row.entity_type, [None, None])
+            if row.entity_id is not None:
+                entity_ranges[row.entity_type] = [
+                    row.entity_id if low is None else min(low, row.entity_id),
+                    row.entity_id if high is None else max(high, row.entity_id),
+                ]
+
+    sha256 = hashlib.sha256(temp_path.read_bytes()).hexdigest()
+    os.replace(temp_path, final_path)
+    os.chmod(final_path, 0o444)
+
+    if db.bind.dialect.name == "postgresql":
+        name = partition_name(period_start)
+        exists = db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+        if exists:
+            db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+            db.execute(text(f"DROP TABLE {name}"))
+    # Anything left (SQLite, or rows in the PostgreSQL default partition)
+    db.query(AuditLog).filter(
+        AuditLog.timestamp >= period_start, AuditLog.timestamp < period_end
+    ).delete(synchronize_session=False)
+
+    archive = AuditLogArchive(
+        period_start=period_start,
+        period_end=period_end,
+        file_path=str(final_path),
+        sha256=sha256,
+        row_count=row_count,
+        min_id=min_id,
+        max_id=max_id,
+        entity_ranges=entity_ranges,
+        first_chain_seq=first_seq,
+        last_chain_seq=last_seq,
+        last_row_hash=last_hash,
+    )
+    db.add(archive)
+    db.flush()
+
+    logger.info(f"Archived {row_count} audit rows for {period_start:%Y-%m} to {final_path}")
+    return archive
+
+
+def run_retention(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Retention/archival job
+
+    1. Archive every month older than the hot window (AUDIT_HOT_MONTHS)
+    2. Purge archives and rows older than AUDIT_LOG_RETENTION_DAYS
+    3. Make sure upcoming PostgreSQL partitions exist
+
+    Commits after each step so a crash never leaves a month half-moved.
+    """
+    now = now or datetime.utcnow()
+    boundary = hot_boundary(now)
+    retention_cutoff = now - timedelta(days=settings.AUDIT_LOG_RETENTION_DAYS)
+    summary = {"archived": [], "purged": [], "deleted_rows": 0}
+
+    oldest = db.query(AuditLog.timestamp).order_by(AuditLog.timestamp.asc()).limit(1).scalar()
+    period = month_start(oldest) if oldest else boundary
+    while period < boundary:
+        exists = db.query(AuditLogArchive).filter(AuditLogArchive.period_start == period).first()
+        if not exists:
+            archive = archive_month(db, period)
+            db.commit()
+            summary["archived"].append({"period": f"{period:%Y-%m}", "rows": archive.row_count})
+        period = add_months(period, 1)
+
+    expired = db.query(AuditLogArchive).filter(
+        AuditLogArchive.purged_at.is_(None),
+        AuditLogArchive.period_end <= retention_cutoff,
+    ).all()
+    for archive in expired:
+        path = Path(archive.file_path)
+        if path.exists():
+            os.chmod(path, 0o644)
+            path.unlink()
+        archive.purged_at = now
+        summary["purged"].append(f"{archive.period_start:%Y-%m}")
+
+    summary["deleted_rows"] = db.query(AuditLog).filter(
+        AuditLog.timestamp < retention_cutoff
+    ).delete(synchronize_session=False)
+
+    ensure_partitions(db, now=now)
+    db.commit()
+    return summary
+
+
+def active_archives(
+    db: Session,
+    filters: AuditLogFilters,
+    before: Optional[Tuple[datetime, int]] = None,
+) -> List[AuditLogArchive]:
+    """
+    Unpurged archives that can contain rows matching the filters (and older
+    than the keyset position `before`), newest first; reads only the manifest,
+    including its per-archive entity id ranges
+    """
+    query = db.query(AuditLogArchive).filter(AuditLogArchive.purged_at.is_(None))
+    if before:
+        query = query.filter(AuditLogArchive.period_start <= before[0])
+    archives = query.order_by(AuditLogArchive.period_start.desc()).all()
+    return [a for a in archives if filters.may_match(a)]
+
+
+def check_archive(archive: AuditLogArchive, cached: bool = True):
+    """
+    Raise ArchiveIntegrityError unless the archive file matches the SHA-256
+    recorded in the manifest
+
+    The compressed file is hashed in chunks, without decompressing. With
+    `cached`, a file already found intact in this process is not hashed
+    again while its size and mtime are unchanged; chain verification passes
+    cached=False.
+    """
+    try:
+        stat = os.stat(archive.file_path)
+    except FileNotFoundError:
+        raise ArchiveIntegrityError(f"Audit archive {archive.file_path} is missing")
+    key = (archive.file_path, archive.sha256, stat.st_size, stat.st_mtime_ns)
+    if cached and key in _checked_archives:
+        return
+
+    digest = hashlib.sha256()
+    with open(archive.file_path, "rb") as archive_file:
+        for chunk in iter(lambda: archive_file.read(1 << 20), b""):
+            digest.update(chunk)
+    if digest.hexdigest() != archive.sha256:
+        raise ArchiveIntegrityError(f"Audit archive {archive.file_path} does not match its manifest SHA-256")
+    _checked_archives.add(key)
+
+
+def archived_rows(
+    db: Session,
+    filters: AuditLogFilters,
+    before: Optional[Tuple[datetime, int]] = None,
+    skip: int = 0,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream archived rows matching the filters, ordered by (timestamp, id) desc
+
+    `before` is a keyset position; only rows strictly older are returned, and
+    archives starting after it are never opened. The first `skip` matching
+    rows are left out; archives the filters match entirely are skipped by
+    their manifest row count without being opened.
+
+    Every archive opened is checked against its manifest SHA-256 first, and
+    its row count once read to the end; a mismatch raises
+    ArchiveIntegrityError.
+    """
+    for archive in active_archives(db, filters, before):
+        whole = before is None or archive.period_end <= before[0]
+        if skip and whole and filters.covers(archive.period_start, archive.period_end) and skip >= archive.row_count:
+            skip -= archive.row_count
+            continue
+        check_archive(archive)
+        lines = 0
+        with gzip.open(archive.file_path, "rt", encoding="utf-8") as archive_file:
+            for line in archive_file:
+                lines += 1
+                row = _deserialize(line)
+                if before and (row["timestamp"], row["id"]) >= before:
+                    continue
+                if not filters.matches(row):
+                    continue
+                if skip:
+                    skip -= 1
+                    continue
+                yield row
+        if lines != archive.row_count:
+            raise ArchiveIntegrityError(
+                f"Audit archive {archive.file_path} holds {lines} rows, manifest records {archive.row_count}"
+            )
+
+
+def count_archived_rows(db: Session, filters: AuditLogFilters) -> Tuple[int, bool]:
+    """
+    Number of archived rows matching the filters, from the manifest alone
+
+    Returns (count, exact). The count sums the row counts of the archives the
+    filters can match; it is exact only when the filters match those
+    archives entirely, otherwise an upper bound. No archive file is opened.
+    """
+    archives = active_archives(db, filters)
+    return (
+        sum(a.row_count for a in archives),
+        all(filters.covers(a.period_start, a.period_end) for a in archives),
+    )
@@ -0,0 +1,379 @@
+"""
+Tamper-evident audit log hash chain
+Seals audit rows into a SHA-256 chain, signs periodic checkpoints and
+verifies the chain incrementally in parallel batches
+"""
+import hashlib
+import hmac
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.audit_archive import ArchiveIntegrityError, check_archive
+from app.models.audit_log import AuditLog, AuditLogArchive, AuditChainCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# Hash of the (virtual) row before the first one in the chain
+GENESIS_HASH = "0" * 64
+
+# Arbitrary constant for pg_advisory_xact_lock so only one sealer runs at a time
+_SEAL_LOCK_ID = 0x41554454
+
+# Row content covered by the hash, in order
+HASHED_COLUMNS = [
+    "chain_seq",
+    "id",
+    "timestamp",
+    "user_id",
+    "username",
+    "action",
+    "entity_type",
+    "entity_id",
+    "description",
+    "details",
+    "ip_address",
+    "user_agent",
+]
+
+
+def row_content(log: AuditLog) -> Tuple:
+    """Hashed fields of an audit row as a picklable tuple"""
+    return tuple(getattr(log, column) for column in HASHED_COLUMNS)
+
+
+def compute_row_hash(prev_hash: str, content: Tuple) -> str:
+    """sha256(prev_hash + canonical JSON of the row content)"""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in content]
+    canonical = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256((prev_hash + canonical).encode("utf-8")).hexdigest()
+
+
+def _checkpoint_key() -> bytes:
+    return (settings.AUDIT_CHECKPOINT_KEY or settings.SECRET_KEY).encode("utf-8")
+
+
+def sign_checkpoint(chain_seq: int, row_hash: str, created_at: datetime) -> str:
+    message = f"{chain_seq}|{row_hash}|{created_at.isoformat()}".encode("utf-8")
+    return hmac.new(_checkpoint_key(), message, hashlib.sha256).hexdigest()
+
+
+def checkpoint_is_authentic(checkpoint: AuditChainCheckpoint) -> bool:
+    expected = sign_checkpoint(checkpoint.chain_seq, checkpoint.row_hash, checkpoint.created_at)
+    return hmac.compare_digest(expected, checkpoint.signature)
+
+
+def seal_all(session_factory) -> int:
+    """Seal every pending row in its own transaction(s); used by the audit writer"""
+    total = 0
+    db = session_factory()
+    try:
+        while True:
+            sealed = seal_pending(db)
+            db.commit()
+            total += sealed
+            if not sealed:
+                return total
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def seal_pending(db: Session, limit: int = 5000) -> int:
+    """
+    Append unsealed audit rows to the hash chain
+
+    Rows are sealed in id order but chained by `chain_seq`, the order in
+    which they were sealed, so a row whose transaction committed late is
+    simply appended rather than breaking the chain. A signed checkpoint is
+    written every AUDIT_CHECKPOINT_INTERVAL rows. The caller commits.
+
+    Returns the number of rows sealed.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": _SEAL_LOCK_ID})
+
+    seq, prev_hash = _chain_head(db)
+
+    pending = (
+        db.query(AuditLog)
+        .filter(AuditLog.row_hash.is_(None))
+        .order_by(AuditLog.id.asc())
+        .limit(limit)
+        .all()
+    )
+
+    for log in pending:
+        seq += 1
+        log.chain_seq = seq
+        log.prev_hash = prev_hash
+        log.row_hash = compute_row_hash(prev_hash, row_content(log))
+        prev_hash = log.row_hash
+
+        if seq % settings.AUDIT_CHECKPOINT_INTERVAL == 0:
+            created_at = datetime.utcnow()
+            db.add(AuditChainCheckpoint(
+                chain_seq=seq,
+                row_hash=log.row_hash,
+                created_at=created_at,
+                signature=sign_checkpoint(seq, log.row_hash, created_at),
+            ))
+
+    db.flush()
+    return len(pending)
+
+
+def _chain_head(db: Session) -> Tuple[int, str]:
+    """
+    (chain_seq, row_hash) of the last sealed row, wherever it lives now
+
+    The newest sealed row may have been moved to the archive tier, whose
+    manifest records the last link of every archive; checkpoints only cover
+    archives written before the manifest did.
+    """
+    candidates = [(0, GENESIS_HASH)]
+    candidates.extend(
+        db.query(AuditLog.chain_seq, AuditLog.row_hash)
+        .filter(AuditLog.chain_seq.isnot(None))
+        .order_by(AuditLog.chain_seq.desc())
+        .limit(1)
+    )
+    candidates.extend(
+        db.query(AuditLogArchive.last_chain_seq, AuditLogArchive.last_row_hash)
+        .filter(AuditLogArchive.last_chain_seq.isnot(None))
+        .order_by(AuditLogArchive.last_chain_seq.desc())
+        .limit(1)
+    )
+    candidates.extend(
+        db.query(AuditChainCheckpoint.chain_seq, AuditChainCheckpoint.row_hash)
+        .order_by(AuditChainCheckpoint.chain_seq.desc())
+        .limit(1)
+    )
+    return tuple(max(candidates, key=lambda candidate: candidate[0]))
+
+
+def _archived_link(db: Session, expected_seq: int, first_seq: int) -> Optional[str]:
+    """
+    row_hash of chain_seq first_seq - 1 if the manifest shows that exactly
+    the rows [expected_seq, first_seq) were moved to the archive tier
+
+    The archives overlapping that span must hold every chain_seq from their
+    lowest to their highest without holes (each chain_seq lives in exactly
+    one place), start at or before expected_seq and end at first_seq - 1.
+    Returns None otherwise: the rows are missing, not archived. Archive
+    files still on disk must match their manifest SHA-256, or
+    ArchiveIntegrityError is raised.
+    """
+
+    archives = (
+        db.query(AuditLogArchive)
+        .filter(
+            AuditLogArchive.first_chain_seq < first_seq,
+            AuditLogArchive.last_chain_seq >= expected_seq,
+        )
+        .all()
+    )
+    if not archives:
+        return None
+    low = min(a.first_chain_seq for a in archives)
+    last = max(archives, key=lambda a: a.last_chain_seq)
+    if low > expected_seq or last.last_chain_seq != first_seq - 1:
+        return None
+    if sum(a.row_count for a in archives) != last.last_chain_seq - low + 1:
+        return None
+    for archive in archives:
+        if archive.purged_at is None:
+            check_archive(archive, cached=False)
+    return last.last_row_hash
+
+
+def _verify_batch(rows: List[Tuple[int, str, str, Tuple]]) -> Tuple[int, Optional[int]]:
+    """
+    Verify one batch of (chain_seq, prev_hash, row_hash, content) tuples
+
+    Runs in a worker process. Checks each row's hash and the links inside
+    the batch; links between batches are checked by the caller.
+    Returns (rows checked, chain_seq of the first bad row or None).
+    """
+    previous_seq, previous_hash = None, None
+    for seq, prev_hash, row_hash, content in rows:
+        if previous_seq is not None and (seq != previous_seq + 1 or prev_hash != previous_hash):
+            return len(rows), seq
+        if compute_row_hash(prev_hash, content) != row_hash:
+            return len(rows), seq
+        previous_seq, previous_hash = seq, row_hash
+    return len(rows), None
+
+
+def verify_chain(
+    db: Session,
+    full: bool = False,
+    workers: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Verify the audit hash chain
+
+    Resumes from the newest checkpoint already verified good unless `full`.
+    Rows are streamed in batches and hashed across a process pool. Every
+    checkpoint reached is checked for an authentic signature and a matching
+    row hash, and marked verified when everything before it checked out.
+
+    Rows already moved to the archive tier are not in the database; if the
+    chain in the database starts after the resume point, verification is
+    anchored at the first remaining row only when the archive manifest
+    records that exactly the rows in between were archived and its last
+    archived hash is the first row's `prev_hash` (archives carry their own
+    SHA-256). Any other gap is reported as missing rows, and so is a chain
+    that ends before the newest checkpoint or archived row.
+
+    Returns a report with the outcome and throughput.
+    """
+    workers = workers or settings.AUDIT_VERIFY_WORKERS
+    batch_size = batch_size or settings.AUDIT_VERIFY_BATCH_SIZE
+    started = time.perf_counter()
+
+    start_seq, expected_prev = 0, None
+    if not full:
+        resume = (
+            db.query(AuditChainCheckpoint)
+            .filter(AuditChainCheckpoint.verified_at.isnot(None))
+            .order_by(AuditChainCheckpoint.chain_seq.desc())
+            .first()
+        )
+        if resume and checkpoint_is_authentic(resume):
+            start_seq, expected_prev = resume.chain_seq, resume.row_hash
+
+    checkpoints = {
+        cp.chain_seq: cp
+        for cp in db.query(AuditChainCheckpoint).filter(AuditChainCheckpoint.chain_seq > start_seq)
+    }
+
+    query = (
+        db.query(AuditLog)
+        .filter(AuditLog.chain_seq > start_seq)
+        .order_by(AuditLog.chain_seq.asc())
+        .yield_per(batch_size)
+    )
+
+    failure: Optional[Dict[str, Any]] = None
+    verified = 0
+    anchor_seq = None
+    expected_seq = start_seq + 1
+    first_batch = True
+    good_checkpoints: List[AuditChainCheckpoint] = []
+
+    def batches():
+        batch = []
+        for log in query:
+            batch.append((log.chain_seq, log.prev_hash, log.row_hash, row_content(log)))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Keep at most two batches per worker in flight to bound memory
+    max_in_flight = workers * 2 if executor else 0
+    in_flight: deque = deque()
+    try:
+        for batch in batches():
+            # The first row must link to the resume point / previous batch
+            first_seq, first_prev = batch[0][0], batch[0][1]
+            if first_batch:
+                first_batch = False
+                if first_seq == 1:
+                    expected_prev = GENESIS_HASH
+                elif first_seq > expected_seq:
+                    # Earlier rows may have been archived: anchor on the first
+                    # one left if the manifest accounts for the whole gap
+                    try:
+                        archived_hash = _archived_link(db, expected_seq, first_seq)
+                    except ArchiveIntegrityError as e:
+                        failure = {"chain_seq": expected_seq, "reason": str(e)}
+                        break
+                    if archived_hash is not None:
+                        anchor_seq, expected_seq, expected_prev = first_seq, first_seq, archived_hash
+            if first_seq != expected_seq:
+                failure = {"chain_seq": expected_seq, "reason": "missing rows"}
+                break
+            if expected_prev is not None and first_prev != expected_prev:
+                failure = {"chain_seq": first_seq, "reason": "broken link"}
+                break
+            expected_seq, expected_prev = batch[-1][0] + 1, batch[-1][2]
+
+            job = executor.submit(_verify_batch, batch) if executor else _verify_batch(batch)
+            in_flight.append((batch, job))
+
+            while len(in_flight) > max_in_flight:
+                failure, checked = _collect(in_flight.popleft(), checkpoints, good_checkpoints)
+                verified += checked
+                if failure:
+                    break
+            if failure:
+                break
+
+        while in_flight and failure is None:
+            failure, checked = _collect(in_flight.popleft(), checkpoints, good_checkpoints)
+            verified += checked
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    if failure is None:
+        # Rows cut from the newest end leave no broken link behind; the
+        # signed checkpoints and the archive manifest still record how far
+        # the chain got
+        archived_head = db.query(func.max(AuditLogArchive.last_chain_seq)).scalar() or 0
+        reached = max(expected_seq - 1, archived_head)
+        head = _chain_head(db)[0]
+        if head > reached:
+            failure = {"chain_seq": reached + 1, "reason": f"rows missing after seq {reached}"}
+
+    now = datetime.utcnow()
+    for checkpoint in good_checkpoints:
+        checkpoint.verified_at = now
+    db.flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "ok": failure is None,
+        "failure": failure,
+        "started_from_seq": start_seq,
+        "anchored_at_seq": anchor_seq,
+        "rows_verified": verified,
+        "checkpoints_verified": len(good_checkpoints),
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(verified / elapsed, 1) if elapsed else None,
+        "workers": workers,
+    }
+
+
+def _collect(item, checkpoints, good_checkpoints) -> Tuple[Optional[Dict[str, Any]], int]:
+    """Resolve one batch result and check the checkpoints it covers"""
+    batch, result = item
+    checked, bad_seq = result.result() if isinstance(result, Future) else result
+    if bad_seq is not None:
+        return {"chain_seq": bad_seq, "reason": "hash mismatch or broken link"}, checked
+
+    for seq, _prev, row_hash, _content in batch:
+        checkpoint = checkpoints.get(seq)
+        if checkpoint is None:
+            continue
+        if not checkpoint_is_authentic(checkpoint):
+            return {"chain_seq": seq, "reason": "checkpoint signature invalid"}, checked
+        if checkpoint.row_hash != row_hash:
+            return {"chain_seq": seq, "reason": "checkpoint hash mismatch"}, checked
+        good_checkpoints.append(checkpoint)
+    return None, checked
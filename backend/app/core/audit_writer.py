@@ -0,0 +1,146 @@
+"""
+Buffered audit log writer
+Queues audit rows and bulk-inserts them in batches off the request path
+"""
+import atexit
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.audit_chain import seal_all
+from app.database import SessionLocal
+from app.models.audit_log import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """
+    Background writer that batches AuditLog inserts and seals them into
+    the audit hash chain
+
+    Rows are handed over only after the request transaction that produced
+    them has committed (see AuditLogger.log), then inserted by a daemon
+    thread every `flush_interval` seconds or as soon as `batch_size` rows
+    are waiting. stop() drains the queue, so a clean shutdown never drops
+    audit records. If the queue grows past `max_queue_size` (database down
+    or very slow) the enqueuing thread flushes synchronously instead of
+    buffering without bound.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        flush_interval: float = settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        batch_size: int = settings.AUDIT_FLUSH_BATCH_SIZE,
+        max_queue_size: int = settings.AUDIT_QUEUE_MAX_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_queue_size = max_queue_size
+
+        self._queue: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def start(self):
+        """Start the background flush thread"""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+        # Safety net for processes that exit without a shutdown event
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop the background thread and flush everything still queued"""
+        atexit.unregister(self.stop)
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self.seal()
+
+    def enqueue(self, rows: List[Dict[str, Any]]):
+        """Queue committed audit rows for insertion"""
+        if not rows:
+            return
+        with self._lock:
+            self._queue.extend(rows)
+            size = len(self._queue)
+
+        if size >= self.max_queue_size:
+            logger.warning(f"Audit queue at {size} rows, flushing synchronously")
+            self.flush()
+        elif size >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Insert all queued rows in batches
+
+        Returns the number of rows written. On failure the unwritten rows
+        are put back at the head of the queue so the next flush retries them.
+        """
+        written = 0
+        with self._flush_lock:
+            with self._lock:
+                rows, self._queue = self._queue, []
+
+            while rows:
+                batch = rows[:self.batch_size]
+                db = self.session_factory()
+                try:
+                    db.execute(insert(AuditLog), batch)
+                    db.commit()
+                except Exception:
+                    db.rollback()
+                    logger.error(f"Failed to write {len(rows)} audit rows, will retry", exc_info=True)
+                    with self._lock:
+                        self._queue[:0] = rows
+                    break
+                finally:
+                    db.close()
+                rows = rows[self.batch_size:]
+                written += len(batch)
+
+        return written
+
+    def seal(self) -> int:
+        """Append everything written so far to the tamper-evident hash chain"""
+        with self._flush_lock:
+            try:
+                return seal_all(self.session_factory)
+            except Exception:
+                logger.error("Failed to seal audit rows, will retry", exc_info=True)
+                return 0
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            self.seal()
+
+
+audit_writer = AuditWriter()
@@ -0,0 +1,249 @@
+"""
+Document full-text search
+Maintains `document_search` rows and runs ranked, highlighted, keyset-paged
+queries over them (FTS5 on SQLite, tsvector/GIN on PostgreSQL)
+"""
+import html
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import Document, DocumentVersion, DocumentSearchEntry, VersionStatus
+
+# Highlight markers used inside the database; swapped for <mark> after escaping
+_MARK_START = "\ue000"
+_MARK_STOP = "\ue001"
+_MAX_QUERY_TERMS = 16
+
+
+@dataclass
+class SearchHit:
+    """One ranked search result"""
+    document_id: int
+    document_number: str
+    title: str
+    department: Optional[str]
+    status: str
+    latest_version_status: Optional[str]
+    updated_at: datetime
+    score: float  # Lower is better on every backend
+    title_highlight: str
+    snippet: Optional[str]
+
+
+def strip_content(content: Optional[str]) -> str:
+    """Plain text of version content (HTML, or Syncfusion SFDT JSON)"""
+    if not content:
+        return ""
+    stripped = content.lstrip()
+    if stripped.startswith("{"):
+        try:
+            return " ".join(" ".join(_sfdt_text(json.loads(stripped))).split())
+        except ValueError:
+            pass
+    return " ".join(BeautifulSoup(content, "html.parser").get_text(" ").split())
+
+
+def _sfdt_text(node: Any) -> Iterator[str]:
+    """Text runs of an SFDT document ("text", or "tlp" in the optimized format)"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ("text", "tlp") and isinstance(value, str):
+                yield value
+            else:
+                yield from _sfdt_text(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _sfdt_text(item)
+
+
+def _indexed_version_id(db: Session, document: Document) -> Optional[int]:
+    """The effective version if there is one, else the latest"""
+    effective_id = db.query(DocumentVersion.id).filter(
+        DocumentVersion.document_id == document.id,
+        DocumentVersion.status == VersionStatus.EFFECTIVE,
+    ).order_by(DocumentVersion.version_number.desc()).limit(1).scalar()
+    return effective_id or document.latest_version_id
+
+
+def index_document(
+    db: Session,
+    document: Document,
+    version: Optional[DocumentVersion] = None,
+    metadata_only: bool = False,
+) -> DocumentSearchEntry:
+    """
+    Upsert a document's search entry
+
+    Pass `version` when the caller has its content loaded (save, publish);
+    it is used instead of re-reading the body if it is the indexed version,
+    and the body is left alone if it is another version while the entry
+    already points at the indexed one (draft saves over an effective
+    version). metadata_only=True keeps an existing entry's body (title/tags
+    edits).
+    The caller commits.
+    """
+    db.flush()
+    entry = db.get(DocumentSearchEntry, document.id)
+    if entry is None:
+        entry = DocumentSearchEntry(document_id=document.id)
+        db.add(entry)
+        metadata_only = False
+
+    entry.document_number = document.document_number
+    entry.title = document.title
+    entry.department = document.department
+    entry.tags = " ".join(document.tags or [])
+
+    if not metadata_only:
+        version_id = _indexed_version_id(db, document)
+        # Saving another version (a draft over the effective one) leaves the indexed text as is
+        unchanged = (
+            version is not None and version.id != version_id
+            and version_id is not None and entry.version_id == version_id
+        )
+        if not unchanged:
+            if version is not None and version.id == version_id:
+                content = version.content_html
+            elif version_id:
+                content = db.query(DocumentVersion.content_html).filter(DocumentVersion.id == version_id).scalar()
+            else:
+                content = None
+            entry.version_id = version_id
+            entry.body = strip_content(content)[:settings.SEARCH_BODY_MAX_CHARS]
+
+    entry.updated_at = datetime.utcnow()
+    db.flush()
+    return entry
+
+
+def rebuild_search_index(db: Session, batch_size: int = 200) -> int:
+    """(Re)index every document, committing per batch; returns the number indexed"""
+    indexed = 0
+    document_ids = [row.id for row in db.query(Document.id).order_by(Document.id)]
+    for start in range(0, len(document_ids), batch_size):
+        for document in db.query(Document).filter(Document.id.in_(document_ids[start:start + batch_size])):
+            index_document(db, document)
+            indexed += 1
+        db.commit()
+    return indexed
+
+
+def query_terms(query: str) -> List[str]:
+    """Word tokens of a user query; punctuation is never passed to the match syntax"""
+    return re.findall(r"\w+", query, re.UNICODE)[:_MAX_QUERY_TERMS]
+
+
+def _render_highlight(value: Optional[str]) -> Optional[str]:
+    """Escape database text, then turn the markers into <mark> tags"""
+    if value is None:
+        return None
+    return html.escape(value).replace(_MARK_START, "<mark>").replace(_MARK_STOP, "</mark>")
+
+
+def _sqlite_search_sql(filters: str) -> str:
+    # bm25() weights follow the FTS5 column order: number, title, department, tags, body
+    return f"""
+        SELECT hits.document_id, hits.score, hits.title_highlight, hits.snippet,
+               d.document_number, d.title, d.department, d.status, d.latest_version_status, d.updated_at
+        FROM (
+            SELECT rowid AS document_id,
+                   bm25(document_search_fts, 10.0, 8.0, 3.0, 3.0, 1.0) AS score,
+                   highlight(document_search_fts, 1, :mark_start, :mark_stop) AS title_highlight,
+                   snippet(document_search_fts, 4, :mark_start, :mark_stop, '…', :snippet_words) AS snippet
+            FROM document_search_fts
+            WHERE document_search_fts MATCH :match
+        ) AS hits
+        JOIN documents d ON d.id = hits.document_id
+        WHERE NOT d.is_deleted {filters}
+        ORDER BY hits.score, hits.document_id
+        LIMIT :limit
+    """
+
+
+def _postgresql_search_sql(filters: str) -> str:
+    # ts_rank_cd is "higher is better"; negated so both backends page on score ascending
+    return f"""
+        SELECT hits.document_id, hits.score,
+               ts_headline('english', hits.title, hits.query, :title_options) AS title_highlight,
+               ts_headline('english', coalesce(hits.body, ''), hits.query, :body_options) AS snippet,
+               d.document_number, d.title, d.department, d.status, d.latest_version_status, d.updated_at
+        FROM (
+            SELECT e.document_id, e.title, e.body, q.query,
+                   -ts_rank_cd(e.search_vector, q.query)::float8 AS score
+            FROM document_search e, to_tsquery('english', :match) AS q(query)
+            WHERE e.search_vector @@ q.query
+        ) AS hits
+        JOIN documents d ON d.id = hits.document_id
+        WHERE NOT d.is_deleted {filters}
+        ORDER BY hits.score, hits.document_id
+        LIMIT :limit
+    """
+
+
+def search_documents(
+    db: Session,
+    query: str,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None,
+    department: Optional[str] = None,
+    status: Optional[str] = None,
+) -> List[SearchHit]:
+    """
+    Ranked full-text search, best match first
+
+    Every term must match; the last term also matches as a prefix so
+    type-ahead works. `after` is the (score, document_id) keyset position of
+    the previous page's last hit. Returns at most `limit` hits.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+
+    params: Dict[str, Any] = {"limit": limit}
+    filters = ""
+    if department:
+        filters += " AND d.department = :department"
+        params["department"] = department
+    if status:
+        filters += " AND upper(d.status) = :status"
+        params["status"] = status.upper()
+    if after is not None:
+        filters += " AND (hits.score > :after_score OR (hits.score = :after_score AND hits.document_id > :after_id))"
+        params["after_score"], params["after_id"] = after
+
+    if db.bind.dialect.name == "postgresql":
+        params["match"] = " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        options = f'StartSel="{_MARK_START}", StopSel="{_MARK_STOP}"'
+        params["title_options"] = f"{options}, HighlightAll=true"
+        params["body_options"] = f"{options}, MaxWords={settings.SEARCH_SNIPPET_WORDS}, MinWords=5, MaxFragments=2"
+        sql = _postgresql_search_sql(filters)
+    else:
+        params["match"] = " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+        params["mark_start"], params["mark_stop"] = _MARK_START, _MARK_STOP
+        params["snippet_words"] = min(settings.SEARCH_SNIPPET_WORDS, 64)
+        sql = _sqlite_search_sql(filters)
+
+    rows = db.execute(text(sql), params).all()
+    return [
+        SearchHit(
+            document_id=row.document_id,
+            document_number=row.document_number,
+            title=row.title,
+            department=row.department,
+            status=row.status,
+            latest_version_status=row.latest_version_status,
+            updated_at=row.updated_at if isinstance(row.updated_at, datetime) else datetime.fromisoformat(row.updated_at),
+            score=float(row.score),
+            title_highlight=_render_highlight(row.title_highlight) or html.escape(row.title),
+            snippet=_render_highlight(row.snippet) or None,
+        )
+        for row in rows
+    ]
@@ -4,8 +4,17 @@ Utility functions for document management
 import hashlib
 import re
 from datetime import datetime
+from itertools import chain
+from sqlalchemy import event
 from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import run_after_commit
 from app.models import Document
+from app.core.sequences import next_sequence_value
+from app.utils.pagination import ResultCache
+
+# Exact document list totals keyed by filters; cleared whenever a commit changed documents
+document_count_cache = ResultCache(ttl=settings.DOCUMENT_COUNT_CACHE_TTL_SECONDS)
 
 
 def compute_content_hash(content: str) -> str:
@@ -44,6 +53,10 @@ def generate_document_number(db: Session, prefix: str = "SOP", department: str =
     Format: SOP-DEPT-YYYYMMDD-NNNN
     Example: SOP-QA-20251129-0001
     
+    The sequence number comes from the number_sequences row for the
+    prefix/department/date, so concurrent creates never collide. The
+    caller's transaction holds that row until it commits.
+    
     Args:
         db: Database session
         prefix: Document prefix (default: SOP)
@@ -62,20 +75,17 @@ def generate_document_number(db: Session, prefix: str = "SOP", department: str =
     else:
         pattern = f"{prefix}-{date_str}-"
     
-    # Find the highest sequence number for today
-    existing = db.query(Document).filter(
-        Document.document_number.like(f"{pattern}%")
-    ).order_by(Document.document_number.desc()).first()
-    
-    if existing:
-        # Extract sequence number and increment
+    def highest_existing() -> int:
+        # Numbers issued before the sequence row existed
+        existing = db.query(Document.document_number).filter(
+            Document.document_number.like(f"{pattern}%")
+        ).order_by(Document.document_number.desc()).first()
         try:
-            last_seq = int(existing.document_number.split('-')[-1])
-            next_seq = last_seq + 1
-        except (ValueError, IndexError):
-            next_seq = 1
-    else:
-        next_seq = 1
+            return int(existing.document_number.split('-')[-1]) if existing else 0
+        except ValueError:
+            return 0
+    
+    next_seq = next_sequence_value(db, f"document:{pattern.rstrip('-')}", seed=highest_existing)
     
     # Generate new document number with zero-padded sequence
     return f"{pattern}{next_seq:04d}"
@@ -139,3 +149,32 @@ def get_next_version_number(db: Session, document_id: int) -> int:
     return 1
 
 
+
+
+def record_new_version(document: Document, version) -> None:
+    """
+    Update the document's denormalized version summary for a new version
+    
+    The count is incremented in SQL so concurrent version creation cannot
+    lose an update. Call after the version has been flushed (needs its id).
+    """
+    document.version_count = Document.version_count + 1
+    set_latest_version(document, version)
+
+
+def set_latest_version(document: Document, version) -> None:
+    """Make `version` the document's latest version"""
+    document.latest_version_id = version.id
+    document.latest_version_status = version.status.value
+
+
+def sync_latest_version_status(document: Document, version) -> None:
+    """Copy a version's status to the document if it is the latest version"""
+    if document.latest_version_id == version.id:
+        document.latest_version_status = version.status.value
+
+
+@event.listens_for(Session, "before_flush")
+def _note_document_changes(session, flush_context, instances):
+    if any(isinstance(obj, Document) for obj in chain(session.new, session.dirty, session.deleted)):
+        run_after_commit(session, "document_count_cache", document_count_cache.clear)
@@ -1,65 +1,119 @@
 """
 Email Service
-Handles SMTP email sending using fastapi-mail
+Handles SMTP email sending over a pool of reused connections
 """
+import hashlib
 import logging
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from email.message import EmailMessage
+from email.utils import formataddr
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.core.smtp_pool import get_smtp_pool
 
 logger = logging.getLogger(__name__)
 
-# Email configuration singleton
-_email_config: Optional[ConnectionConfig] = None
-_fastmail: Optional[FastMail] = None
 
-
-def get_email_config() -> Optional[ConnectionConfig]:
-    """Get or create email configuration"""
-    global _email_config
-    
+def email_configured() -> bool:
+    """Whether email is enabled and the SMTP settings are complete"""
     if not settings.EMAIL_ENABLED:
         logger.warning("Email notifications are disabled. Set EMAIL_ENABLED=true to enable.")
-        return None
+        return False
     
     if not settings.SMTP_HOST or not settings.SMTP_USER or not settings.SMTP_PASSWORD:
         logger.warning("SMTP configuration incomplete. Email notifications will be disabled.")
-        return None
-    
-    if _email_config is None:
-        logger.info(f"Initializing email config: host={settings.SMTP_HOST}, port={settings.SMTP_PORT}, user={settings.SMTP_USER}, tls={settings.SMTP_USE_TLS}, ssl={settings.SMTP_USE_SSL}")
-        _email_config = ConnectionConfig(
-            MAIL_USERNAME=settings.SMTP_USER,
-            MAIL_PASSWORD=settings.SMTP_PASSWORD,
-            MAIL_FROM=settings.SMTP_FROM_EMAIL or settings.SMTP_USER,
-            MAIL_FROM_NAME=settings.SMTP_FROM_NAME,
-            MAIL_PORT=settings.SMTP_PORT,
-            MAIL_SERVER=settings.SMTP_HOST,
-            MAIL_STARTTLS=settings.SMTP_USE_TLS,
-            MAIL_SSL_TLS=settings.SMTP_USE_SSL,
-            USE_CREDENTIALS=True,
-            VALIDATE_CERTS=True,
-        )
-        logger.info("Email config initialized successfully")
+        return False
     
-    return _email_config
+    return True
+
 
+class EmailNotConfigured(Exception):
+    """Email is disabled or the SMTP settings are incomplete"""
+    pass
 
-def get_fastmail() -> Optional[FastMail]:
-    """Get or create FastMail instance"""
-    global _fastmail
+
+async def deliver_email(to: List[str], subject: str, html_body: str, bcc: Optional[List[str]] = None) -> None:
+    """
+    Send one message over SMTP
     
-    config = get_email_config()
-    if config is None:
-        return None
+    `bcc` recipients get the same message without appearing in its headers,
+    so identical content for many users is transferred once. Raises
+    EmailNotConfigured, or the SMTP error, when the message was not sent.
+    Used by the notification outbox, which records and retries failures.
+    """
+    if not email_configured():
+        raise EmailNotConfigured("Email not configured. Check EMAIL_ENABLED and SMTP settings.")
     
-    if _fastmail is None:
-        _fastmail = FastMail(config)
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = formataddr((settings.SMTP_FROM_NAME, settings.SMTP_FROM_EMAIL or settings.SMTP_USER))
+    message["To"] = ", ".join(to) if to else "undisclosed-recipients:;"
+    message.set_content(html_body, subtype="html")
     
-    return _fastmail
+    await get_smtp_pool().send(message, list(to) + list(bcc or []))
+
+
+def content_hash(subject: str, html_body: str) -> str:
+    """Key of a rendered message in notification_contents"""
+    return hashlib.sha256(f"{subject}\0{html_body}".encode("utf-8")).hexdigest()
+
+
+def store_content(db: Session, subject: str, html_body: str) -> str:
+    """Save a rendered message once, however many times it is sent; returns its hash"""
+    from app.models.notification_content import NotificationContent
+    digest = content_hash(subject, html_body)
+    values = {"hash": digest, "subject": subject, "body_html": html_body, "created_at": datetime.utcnow()}
+    
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.execute(postgresql.insert(NotificationContent).values(**values).on_conflict_do_nothing(index_elements=["hash"]))
+    elif dialect == "sqlite":
+        db.execute(sqlite.insert(NotificationContent).values(**values).on_conflict_do_nothing(index_elements=["hash"]))
+    elif not db.query(NotificationContent.hash).filter(NotificationContent.hash == digest).first():
+        db.execute(insert(NotificationContent).values(**values))
+    return digest
+
+
+def log_notifications(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Insert NotificationLog rows (dicts of column values) in one batch"""
+    from app.models.notification_log import NotificationLog
+    if rows:
+        db.execute(insert(NotificationLog), rows)
+
+
+def log_notification(
+    db: Session,
+    to: List[str],
+    subject: str,
+    html_body: str,
+    document_id: int,
+    version_id: Optional[int],
+    event_type: Optional[str],
+    recipient_user_id: Optional[int],
+    error: Optional[str] = None
+) -> None:
+    """Log one send to every address in `to`"""
+    from app.models.notification_log import NotificationStatus
+    digest = store_content(db, subject, html_body)
+    log_notifications(db, [
+        {
+            "document_id": document_id,
+            "version_id": version_id,
+            "event_type": event_type,
+            "recipient_email": email,
+            "recipient_user_id": recipient_user_id,
+            "subject": subject,
+            "content_hash": digest,
+            "status": NotificationStatus.FAILED if error else NotificationStatus.SENT,
+            "error_message": error,
+            "sent_at": None if error else datetime.utcnow(),
+        }
+        for email in to
+    ])
 
 
 async def send_email(
@@ -93,38 +147,17 @@ async def send_email(
         return False
     
     logger.info(f"Attempting to send email to {to}: {subject}")
-    fastmail = get_fastmail()
-    if fastmail is None:
-        logger.error("FastMail not configured. Email not sent. Check SMTP settings.")
+    if not email_configured():
+        logger.error("Email not configured. Email not sent. Check SMTP settings.")
         return False
     
     try:
-        message = MessageSchema(
-            subject=subject,
-            recipients=to,
-            body=html_body,
-            subtype=MessageType.html,
-        )
-        
-        await fastmail.send_message(message)
+        await deliver_email(to, subject, html_body)
         
         # Log successful send
         if db and document_id:
-            from app.models.notification_log import NotificationLog, NotificationStatus
-            for email in to:
-                log_entry = NotificationLog(
-                    document_id=document_id,
-                    version_id=version_id,
-                    event_type=event_type,
-                    recipient_email=email,
-                    recipient_user_id=recipient_user_id,
-                    subject=subject,
-                    body_html=html_body,
-                    status=NotificationStatus.SENT,
-                    sent_at=datetime.utcnow()
-                )
-                db.add(log_entry)
-            db.commit()
+            log_notification(db, to, subject, html_body, document_id, version_id, event_type, recipient_user_id)
+            db.flush()
         
         logger.info(f"Email sent successfully to {to}: {subject}")
         return True
@@ -134,22 +167,7 @@ async def send_email(
         
         # Log failed send
         if db and document_id:
-            from app.models.notification_log import NotificationLog, NotificationStatus
-            for email in to:
-                log_entry = NotificationLog(
-                    document_id=document_id,
-                    version_id=version_id,
-                    event_type=event_type,
-                    recipient_email=email,
-                    recipient_user_id=recipient_user_id,
-                    subject=subject,
-                    body_html=html_body,
-                    status=NotificationStatus.FAILED,
-                    error_message=str(e),
-                    sent_at=None
-                )
-                db.add(log_entry)
-            db.commit()
+            log_notification(db, to, subject, html_body, document_id, version_id, event_type, recipient_user_id, error=str(e))
+            db.flush()
         
         return False
-
@@ -2,9 +2,21 @@
 Email Templates
 HTML email templates for workflow notifications
 """
-from typing import Optional
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+# Stands in for the recipient's name when an event is rendered once for
+# all of its recipients; replaced per recipient by personalize()
+RECIPIENT_NAME = "%%RECIPIENT_NAME%%"
+
+# Substituted for RECIPIENT_NAME in messages shared by several recipients
+NEUTRAL_RECIPIENT_NAME = "Colleague"
+
+
+def personalize(html: str, recipient_name: Optional[str]) -> str:
+    """Substitute the recipient's name into a body rendered with RECIPIENT_NAME"""
+    return html.replace(RECIPIENT_NAME, recipient_name or "")
+
 
 def get_base_template(content: str) -> str:
     """Base HTML template for all emails"""
@@ -293,3 +305,28 @@ def version_obsoleted_template(
     """
     return get_base_template(content)
 
+
+
+def digest_template(
+    recipient_name: str,
+    items: List[Tuple[str, datetime, Optional[str]]]
+) -> str:
+    """Template for a digest of several notifications (subject, time, document URL)"""
+    rows = "".join(
+        f"""
+            <p><strong>{subject}</strong><br>
+            {created_at.strftime('%Y-%m-%d %H:%M')} UTC{f' - <a href="{document_url}">View Document</a>' if document_url else ''}</p>"""
+        for subject, created_at, document_url in items
+    )
+    content = f"""
+        <h2>Document Updates Digest</h2>
+        <p>Dear {recipient_name},</p>
+        
+        <p>The following {len(items)} update(s) were made in the Document Management System since your last digest:</p>
+        
+        <div class="info-box">{rows}
+        </div>
+        
+        <p><strong>Important:</strong> Please review the documents above to ensure you are aware of the latest procedures and requirements.</p>
+    """
+    return get_base_template(content)
@@ -1,16 +1,27 @@
 """
 Notification Dispatcher
 Event-driven notification system for workflow transitions
+
+Workflow transitions call the notify_* functions, which only record the
+event in the notification outbox inside the caller's transaction. The
+outbox dispatcher later calls build_notification() to resolve the
+recipients from the recipient directory and render the message once for
+all of them. Event types in
+NOTIFICATION_DIGEST_EVENTS are held per recipient and sent together as
+one render_digest() message instead.
 """
 import logging
-from typing import List, Optional
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy.orm import joinedload
 
 from app.models import User, Document, DocumentVersion
 from app.models.notification_log import NotificationEventType
-from app.core.email_service import send_email
+from app.models.notification_outbox import NotificationOutbox
+from app.core.notification_outbox import queue_notification
+from app.core.recipient_directory import Recipient, recipient_directory
 from app.core.email_templates import (
+    RECIPIENT_NAME,
     review_assigned_template,
     review_rejected_template,
     review_approved_template,
@@ -18,18 +29,23 @@ from app.core.email_templates import (
     approval_rejected_template,
     document_effective_template,
     version_obsoleted_template,
+    digest_template,
 )
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-def get_users_by_role(db: Session, role_name: str) -> List[User]:
-    """Get all users with a specific role"""
-    return db.query(User).join(User.roles).filter(
-        User.is_active == True,
-        User.roles.any(name=role_name)
-    ).options(joinedload(User.roles)).all()
+class RenderedNotification(NamedTuple):
+    """One event's message, shared by all of its recipients"""
+    subject: str
+    html_body: str  # Contains RECIPIENT_NAME where each recipient's name goes
+    recipients: List[Recipient]
+
+
+def get_users_by_role(db: Session, role_name: str) -> List[Recipient]:
+    """Get all active users with a specific role"""
+    return recipient_directory.by_role(db, role_name)
 
 
 def get_document_url(document_id: int, version_id: Optional[int] = None) -> str:
@@ -40,67 +56,36 @@ def get_document_url(document_id: int, version_id: Optional[int] = None) -> str:
     return f"{base_url}/documents/{document_id}"
 
 
-async def notify_review_assigned(
+def display_name(user: Optional[Recipient]) -> str:
+    """Full name, or username when the user has none"""
+    return user.name if user else "Unknown"
+
+
+def _version_label(version: DocumentVersion) -> str:
+    return version.version_string or f"v{version.version_number}"
+
+
+def _document_author(db: Session, document: Document) -> Optional[Recipient]:
+    """Document owner, or creator when there is no owner"""
+    author_id = document.owner_id or document.created_by_id
+    return recipient_directory.get(db, author_id) if author_id else None
+
+
+# ---------------------------------------------------------------------------
+# Workflow side: record the event in the caller's transaction
+# ---------------------------------------------------------------------------
+
+def notify_review_assigned(
     db: Session,
     document: Document,
     version: DocumentVersion,
     author: User
 ) -> None:
     """Notify reviewers that a document has been assigned for review"""
-    logger.info(f"notify_review_assigned called for document {document.id}, version {version.id}")
-    
-    if not settings.EMAIL_ENABLED:
-        logger.warning("Email notifications are disabled in settings")
-        return
-    
-    # Get all active reviewers
-    reviewers = get_users_by_role(db, "Reviewer")
-    logger.info(f"Found {len(reviewers)} reviewers with Reviewer role")
-    
-    if not reviewers:
-        logger.warning(f"No reviewers found to notify for document {document.id}")
-        return
-    
-    reviewer_emails = [r.email for r in reviewers if r.email]
-    if not reviewer_emails:
-        logger.warning(f"No reviewer emails found for document {document.id}. Reviewers: {[r.username for r in reviewers]}")
-        return
-    
-    logger.info(f"Sending review assignment emails to: {reviewer_emails}")
-    
-    # Send email to each reviewer
-    for reviewer in reviewers:
-        if not reviewer.email:
-            continue
-        
-        subject = f"New Document Pending for Review: {document.document_number}"
-        html_body = review_assigned_template(
-            document_number=document.document_number,
-            document_title=document.title,
-            version_number=version.version_string or f"v{version.version_number}",
-            author_name=author.full_name or author.username,
-            reviewer_name=reviewer.full_name or reviewer.username,
-            document_url=get_document_url(document.id, version.id),
-            change_summary=version.change_summary
-        )
-        
-        result = await send_email(
-            to=[reviewer.email],
-            subject=subject,
-            html_body=html_body,
-            db=db,
-            document_id=document.id,
-            version_id=version.id,
-            event_type=NotificationEventType.REVIEW_ASSIGNED.value,
-            recipient_user_id=reviewer.id
-        )
-        if result:
-            logger.info(f"Email sent successfully to {reviewer.email}")
-        else:
-            logger.error(f"Failed to send email to {reviewer.email}")
-
-
-async def notify_review_rejected(
+    queue_notification(db, NotificationEventType.REVIEW_ASSIGNED, document, version, actor=author)
+
+
+def notify_review_rejected(
     db: Session,
     document: Document,
     version: DocumentVersion,
@@ -108,84 +93,23 @@ async def notify_review_rejected(
     rejection_reason: Optional[str] = None
 ) -> None:
     """Notify author that review was rejected"""
-    if not settings.EMAIL_ENABLED:
-        return
-    
-    # Get document author (owner or creator)
-    author = document.owner or (db.query(User).filter(User.id == document.created_by_id).first() if document.created_by_id else None)
-    
-    if not author or not author.email:
-        logger.warning(f"No author email found for document {document.id}")
-        return
-    
-    subject = f"Document Review Rejected: {document.document_number}"
-    html_body = review_rejected_template(
-        document_number=document.document_number,
-        document_title=document.title,
-        version_number=version.version_string or f"v{version.version_number}",
-        reviewer_name=reviewer.full_name or reviewer.username,
-        author_name=author.full_name or author.username,
-        rejection_reason=rejection_reason,
-        document_url=get_document_url(document.id, version.id)
-    )
-    
-    await send_email(
-        to=[author.email],
-        subject=subject,
-        html_body=html_body,
-        db=db,
-        document_id=document.id,
-        version_id=version.id,
-        event_type=NotificationEventType.REVIEW_REJECTED.value,
-        recipient_user_id=author.id
+    queue_notification(
+        db, NotificationEventType.REVIEW_REJECTED, document, version,
+        actor=reviewer, rejection_reason=rejection_reason
     )
 
 
-async def notify_review_approved(
+def notify_review_approved(
     db: Session,
     document: Document,
     version: DocumentVersion,
     reviewer: User
 ) -> None:
     """Notify approvers that review was approved"""
-    if not settings.EMAIL_ENABLED:
-        return
-    
-    # Get all active approvers
-    approvers = get_users_by_role(db, "Approver")
-    
-    if not approvers:
-        logger.warning(f"No approvers found to notify for document {document.id}")
-        return
-    
-    # Send email to each approver
-    for approver in approvers:
-        if not approver.email:
-            continue
-        
-        subject = f"Document Pending for Approval: {document.document_number}"
-        html_body = review_approved_template(
-            document_number=document.document_number,
-            document_title=document.title,
-            version_number=version.version_string or f"v{version.version_number}",
-            reviewer_name=reviewer.full_name or reviewer.username,
-            approver_name=approver.full_name or approver.username,
-            document_url=get_document_url(document.id, version.id)
-        )
-        
-        await send_email(
-            to=[approver.email],
-            subject=subject,
-            html_body=html_body,
-            db=db,
-            document_id=document.id,
-            version_id=version.id,
-            event_type=NotificationEventType.APPROVAL_ASSIGNED.value,
-            recipient_user_id=approver.id
-        )
-
-
-async def notify_approval_rejected(
+    queue_notification(db, NotificationEventType.APPROVAL_ASSIGNED, document, version, actor=reviewer)
+
+
+def notify_approval_rejected(
     db: Session,
     document: Document,
     version: DocumentVersion,
@@ -193,127 +117,212 @@ async def notify_approval_rejected(
     rejection_reason: Optional[str] = None
 ) -> None:
     """Notify author that approval was rejected"""
-    if not settings.EMAIL_ENABLED:
-        return
-    
-    # Get document author
-    author = document.owner or (db.query(User).filter(User.id == document.created_by_id).first() if document.created_by_id else None)
-    
-    if not author or not author.email:
-        logger.warning(f"No author email found for document {document.id}")
-        return
-    
-    subject = f"Document Approval Rejected: {document.document_number}"
-    html_body = approval_rejected_template(
-        document_number=document.document_number,
-        document_title=document.title,
-        version_number=version.version_string or f"v{version.version_number}",
-        approver_name=approver.full_name or approver.username,
-        author_name=author.full_name or author.username,
-        rejection_reason=rejection_reason,
-        document_url=get_document_url(document.id, version.id)
-    )
-    
-    await send_email(
-        to=[author.email],
-        subject=subject,
-        html_body=html_body,
-        db=db,
-        document_id=document.id,
-        version_id=version.id,
-        event_type=NotificationEventType.APPROVAL_REJECTED.value,
-        recipient_user_id=author.id
+    queue_notification(
+        db, NotificationEventType.APPROVAL_REJECTED, document, version,
+        actor=approver, rejection_reason=rejection_reason
     )
 
 
-async def notify_document_effective(
+def notify_document_effective(
     db: Session,
     document: Document,
     version: DocumentVersion
 ) -> None:
     """Notify all related users that a document is now effective"""
-    if not settings.EMAIL_ENABLED:
-        return
-    
-    # Get all active users (or filter by department/role as needed)
-    # For now, notify all active users - you can customize this based on your requirements
-    users = db.query(User).filter(User.is_active == True).all()
-    
-    if not users:
-        logger.warning(f"No users found to notify for document {document.id}")
-        return
-    
-    effective_date = version.effective_date.strftime('%Y-%m-%d') if version.effective_date else "Immediately"
-    
-    # Send email to each user
-    for user in users:
-        if not user.email:
-            continue
-        
-        subject = f"New Document Published: {document.document_number}"
-        html_body = document_effective_template(
-            document_number=document.document_number,
-            document_title=document.title,
-            version_number=version.version_string or f"v{version.version_number}",
-            effective_date=effective_date,
-            recipient_name=user.full_name or user.username,
-            document_url=get_document_url(document.id, version.id)
-        )
-        
-        await send_email(
-            to=[user.email],
-            subject=subject,
-            html_body=html_body,
-            db=db,
-            document_id=document.id,
-            version_id=version.id,
-            event_type=NotificationEventType.DOCUMENT_EFFECTIVE.value,
-            recipient_user_id=user.id
-        )
-
-
-async def notify_version_obsoleted(
+    queue_notification(db, NotificationEventType.DOCUMENT_EFFECTIVE, document, version)
+
+
+def notify_version_obsoleted(
     db: Session,
     document: Document,
     old_version: DocumentVersion,
     new_version: DocumentVersion
 ) -> None:
     """Notify users that a version has been obsoleted"""
-    if not settings.EMAIL_ENABLED:
-        return
-    
-    # Get all active users
-    users = db.query(User).filter(User.is_active == True).all()
-    
-    if not users:
-        return
-    
-    old_version_str = old_version.version_string or f"v{old_version.version_number}"
-    new_version_str = new_version.version_string or f"v{new_version.version_number}"
-    
-    # Send email to each user
-    for user in users:
-        if not user.email:
-            continue
-        
-        subject = f"Document Version Obsoleted: {document.document_number}"
-        html_body = version_obsoleted_template(
+    queue_notification(
+        db, NotificationEventType.VERSION_OBSOLETED, document, old_version,
+        new_version_id=new_version.id
+    )
+
+
+# ---------------------------------------------------------------------------
+# Dispatcher side: resolve recipients and render once per event
+# ---------------------------------------------------------------------------
+
+def _review_assigned(db: Session, event: NotificationOutbox, document: Document, version: DocumentVersion, actor: Optional[Recipient]) -> Optional[RenderedNotification]:
+    # Get all active reviewers
+    reviewers = get_users_by_role(db, "Reviewer")
+    if not reviewers:
+        logger.warning(f"No reviewers found to notify for document {document.id}")
+        return None
+
+    return RenderedNotification(
+        subject=f"New Document Pending for Review: {document.document_number}",
+        html_body=review_assigned_template(
+            document_number=document.document_number,
+            document_title=document.title,
+            version_number=_version_label(version),
+            author_name=display_name(actor),
+            reviewer_name=RECIPIENT_NAME,
+            document_url=get_document_url(document.id, version.id),
+            change_summary=version.change_summary
+        ),
+        recipients=reviewers,
+    )
+
+
+def _review_rejected(db: Session, event: NotificationOutbox, document: Document, version: DocumentVersion, actor: Optional[Recipient]) -> Optional[RenderedNotification]:
+    author = _document_author(db, document)
+    if not author:
+        logger.warning(f"No author found for document {document.id}")
+        return None
+
+    return RenderedNotification(
+        subject=f"Document Review Rejected: {document.document_number}",
+        html_body=review_rejected_template(
+            document_number=document.document_number,
+            document_title=document.title,
+            version_number=_version_label(version),
+            reviewer_name=display_name(actor),
+            author_name=RECIPIENT_NAME,
+            rejection_reason=(event.payload or {}).get("rejection_reason"),
+            document_url=get_document_url(document.id, version.id)
+        ),
+        recipients=[author],
+    )
+
+
+def _approval_assigned(db: Session, event: NotificationOutbox, document: Document, version: DocumentVersion, actor: Optional[Recipient]) -> Optional[RenderedNotification]:
+    # Get all active approvers
+    approvers = get_users_by_role(db, "Approver")
+    if not approvers:
+        logger.warning(f"No approvers found to notify for document {document.id}")
+        return None
+
+    return RenderedNotification(
+        subject=f"Document Pending for Approval: {document.document_number}",
+        html_body=review_approved_template(
+            document_number=document.document_number,
+            document_title=document.title,
+            version_number=_version_label(version),
+            reviewer_name=display_name(actor),
+            approver_name=RECIPIENT_NAME,
+            document_url=get_document_url(document.id, version.id)
+        ),
+        recipients=approvers,
+    )
+
+
+def _approval_rejected(db: Session, event: NotificationOutbox, document: Document, version: DocumentVersion, actor: Optional[Recipient]) -> Optional[RenderedNotification]:
+    author = _document_author(db, document)
+    if not author:
+        logger.warning(f"No author found for document {document.id}")
+        return None
+
+    return RenderedNotification(
+        subject=f"Document Approval Rejected: {document.document_number}",
+        html_body=approval_rejected_template(
+            document_number=document.document_number,
+            document_title=document.title,
+            version_number=_version_label(version),
+            approver_name=display_name(actor),
+            author_name=RECIPIENT_NAME,
+            rejection_reason=(event.payload or {}).get("rejection_reason"),
+            document_url=get_document_url(document.id, version.id)
+        ),
+        recipients=[author],
+    )
+
+
+def _document_effective(db: Session, event: NotificationOutbox, document: Document, version: DocumentVersion, actor: Optional[Recipient]) -> Optional[RenderedNotification]:
+    # Notify all active users - customize here to filter by department/role
+    users = recipient_directory.active_users(db)
+    effective_date = version.effective_date.strftime('%Y-%m-%d') if version.effective_date else "Immediately"
+
+    return RenderedNotification(
+        subject=f"New Document Published: {document.document_number}",
+        html_body=document_effective_template(
             document_number=document.document_number,
             document_title=document.title,
-            old_version=old_version_str,
-            new_version=new_version_str,
-            recipient_name=user.full_name or user.username,
+            version_number=_version_label(version),
+            effective_date=effective_date,
+            recipient_name=RECIPIENT_NAME,
+            document_url=get_document_url(document.id, version.id)
+        ),
+        recipients=users,
+    )
+
+
+def _version_obsoleted(db: Session, event: NotificationOutbox, document: Document, version: DocumentVersion, actor: Optional[Recipient]) -> Optional[RenderedNotification]:
+    new_version = db.get(DocumentVersion, (event.payload or {}).get("new_version_id"))
+    if not new_version:
+        return None
+    users = recipient_directory.active_users(db)
+
+    return RenderedNotification(
+        subject=f"Document Version Obsoleted: {document.document_number}",
+        html_body=version_obsoleted_template(
+            document_number=document.document_number,
+            document_title=document.title,
+            old_version=_version_label(version),
+            new_version=_version_label(new_version),
+            recipient_name=RECIPIENT_NAME,
             document_url=get_document_url(document.id, new_version.id)
-        )
-        
-        await send_email(
-            to=[user.email],
-            subject=subject,
-            html_body=html_body,
-            db=db,
-            document_id=document.id,
-            version_id=old_version.id,
-            event_type=NotificationEventType.VERSION_OBSOLETED.value,
-            recipient_user_id=user.id
-        )
+        ),
+        recipients=users,
+    )
+
+
+_BUILDERS: Dict[str, Callable[..., Optional[RenderedNotification]]] = {
+    NotificationEventType.REVIEW_ASSIGNED.value: _review_assigned,
+    NotificationEventType.REVIEW_REJECTED.value: _review_rejected,
+    NotificationEventType.APPROVAL_ASSIGNED.value: _approval_assigned,
+    NotificationEventType.APPROVAL_REJECTED.value: _approval_rejected,
+    NotificationEventType.DOCUMENT_EFFECTIVE.value: _document_effective,
+    NotificationEventType.VERSION_OBSOLETED.value: _version_obsoleted,
+}
+
+
+def build_notification(db: Session, event: NotificationOutbox) -> Optional[RenderedNotification]:
+    """
+    The message of one outbox event and its recipients with an email address
 
+    The body is rendered once, with RECIPIENT_NAME where each recipient's
+    name goes. Recipients are resolved now, at delivery time, so users
+    deactivated since the transition are skipped.
+    """
+    builder = _BUILDERS.get(event.event_type)
+    if builder is None:
+        logger.error(f"No notification builder for event type {event.event_type}")
+        return None
+
+    document = db.get(Document, event.document_id)
+    version = db.get(DocumentVersion, event.version_id) if event.version_id else None
+    if document is None or version is None:
+        logger.warning(f"Document or version of notification event {event.id} no longer exists")
+        return None
+    actor = recipient_directory.get(db, event.actor_user_id) if event.actor_user_id else None
+
+    rendered = builder(db, event, document, version, actor)
+    if rendered is None:
+        return None
+    return rendered._replace(recipients=[user for user in rendered.recipients if user.email])
+
+
+def render_digest(items: List[Tuple[str, datetime, Optional[int], Optional[int]]]) -> Tuple[str, str]:
+    """
+    Subject and body of one digest message
+
+    `items` are (subject, created_at, document_id, version_id) of the
+    notifications it replaces, oldest first. The body contains
+    RECIPIENT_NAME, so users with the same items share one rendering.
+    """
+    subject = f"Document Updates Digest: {len(items)} update(s)"
+    html_body = digest_template(
+        recipient_name=RECIPIENT_NAME,
+        items=[
+            (item_subject, created_at, get_document_url(document_id, version_id) if document_id else None)
+            for item_subject, created_at, document_id, version_id in items
+        ]
+    )
+    return subject, html_body
@@ -0,0 +1,462 @@
+"""
+Notification outbox
+Workflow transitions record notification events in `notification_outbox`
+inside their own transaction; a background dispatcher delivers them with
+bounded concurrency, retries and exponential backoff
+"""
+import asyncio
+import atexit
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.email_service import deliver_email, log_notifications, store_content
+from app.core.email_templates import NEUTRAL_RECIPIENT_NAME, personalize
+from app.core.smtp_pool import close_smtp_pool
+from app.database import SessionLocal, run_after_commit
+from app.models.notification_content import NotificationContent
+from app.models.notification_log import NotificationEventType, NotificationStatus
+from app.models.notification_outbox import DIGEST_EVENT_TYPE, NotificationOutbox, OutboxStatus
+
+logger = logging.getLogger(__name__)
+
+
+def queue_notification(
+    db: Session,
+    event_type: NotificationEventType,
+    document,
+    version,
+    actor=None,
+    **payload
+) -> Optional[NotificationOutbox]:
+    """
+    Record a notification event in the caller's transaction
+
+    Nothing is sent if the transaction rolls back. Recipients are resolved
+    and messages rendered later by the dispatcher, so this costs one row
+    however many users will be notified.
+    """
+    if not settings.EMAIL_ENABLED:
+        logger.info(f"Email disabled. Skipping {event_type.value} notification for document {document.id}")
+        return None
+
+    row = NotificationOutbox(
+        event_type=event_type.value,
+        document_id=document.id,
+        version_id=version.id if version is not None else None,
+        actor_user_id=actor.id if actor is not None else None,
+        payload=payload or None,
+        status=OutboxStatus.PENDING.value,
+    )
+    db.add(row)
+    run_after_commit(db, "notification_outbox", outbox_dispatcher.wake)
+    return row
+
+
+class _Delivery(NamedTuple):
+    """Detached copy of a per-recipient outbox row being sent"""
+    id: int
+    event_type: str
+    document_id: Optional[int]  # None on digests
+    version_id: Optional[int]
+    recipient_user_id: Optional[int]
+    recipient_email: str
+    recipient_name: Optional[str]  # As substituted into body_html
+    content_hash: str
+    attempts: int
+    subject: str
+    body_html: str  # Personalized
+
+
+class OutboxDispatcher:
+    """
+    Background delivery of the notification outbox
+
+    Each round claims up to `batch_size` due rows by pushing their
+    next_attempt_at past a lease (FOR UPDATE SKIP LOCKED on PostgreSQL, so
+    several workers can share the outbox). An event row is rendered once
+    into notification_contents and expanded into one row per recipient
+    with a bulk insert; recipient rows only carry the content hash and the
+    name substituted at send time. They are sent at most `concurrency` at
+    a time. Event types opted into `bcc_events` (none by default) are
+    addressed to NEUTRAL_RECIPIENT_NAME instead, so recipients of the same
+    content share one BCC message of up to `bcc_batch_size` addresses; they
+    cannot also be digest events. A failed send is
+    retried after retry_base * 2^(attempts-1) seconds, capped at
+    retry_max, and marked FAILED after `max_attempts`. Every final outcome
+    is written to notification_logs in one batch per round.
+
+    Recipient rows of event types in `digest_events` are parked as DIGEST,
+    due `digest_interval` seconds after they were created. Once a
+    recipient's oldest parked row is due, all of that recipient's parked
+    rows are folded into one digest row, sent like any other, and logged
+    per original notification.
+
+    Rows live in the database, so nothing is lost on restart: a crashed
+    worker's claims simply expire and are picked up again.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        sender: Callable[..., Awaitable[None]] = deliver_email,
+        interval: float = settings.NOTIFICATION_DISPATCH_INTERVAL_SECONDS,
+        batch_size: int = settings.NOTIFICATION_BATCH_SIZE,
+        concurrency: int = settings.NOTIFICATION_MAX_CONCURRENCY,
+        bcc_batch_size: int = settings.NOTIFICATION_BCC_BATCH_SIZE,
+        bcc_events: Iterable[str] = settings.NOTIFICATION_BCC_EVENTS,
+        max_attempts: int = settings.NOTIFICATION_MAX_ATTEMPTS,
+        retry_base: float = settings.NOTIFICATION_RETRY_BASE_SECONDS,
+        retry_max: float = settings.NOTIFICATION_RETRY_MAX_SECONDS,
+        lease: float = settings.NOTIFICATION_LEASE_SECONDS,
+        digest_events: Iterable[str] = settings.NOTIFICATION_DIGEST_EVENTS,
+        digest_interval: float = settings.NOTIFICATION_DIGEST_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.sender = sender
+        self.interval = interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.bcc_batch_size = bcc_batch_size
+        self.bcc_events = set(bcc_events)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease = lease
+        self.digest_events = set(digest_events)
+        self.digest_interval = digest_interval
+        if self.bcc_events & self.digest_events:
+            raise ValueError("Event types cannot be both BCC and digest events")
+
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the background delivery thread"""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Stop after the current round; undelivered rows stay in the outbox"""
+        atexit.unregister(self.stop)
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+
+    def wake(self):
+        """Start a round now instead of at the next interval"""
+        self._wakeup.set()
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(self.retry_base * 2 ** max(attempts - 1, 0), self.retry_max)
+
+    async def run_once(self) -> int:
+        """
+        Fold due digests, then claim one batch of due rows, fan out its
+        events and send its messages; returns the number of rows handled
+        """
+        folded = self._flush_digests()
+        deliveries, claimed = self._claim()
+        if deliveries:
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def send(group: List[_Delivery]) -> Dict[int, Optional[str]]:
+                first = group[0]
+                async with semaphore:
+                    try:
+                        if len(group) == 1:
+                            await self.sender([first.recipient_email], first.subject, first.body_html)
+                        else:
+                            bcc = [delivery.recipient_email for delivery in group]
+                            await self.sender([], first.subject, first.body_html, bcc=bcc)
+                        error = None
+                    except Exception as e:
+                        logger.warning(f"Notification {first.id} to {len(group)} recipient(s) failed: {e}")
+                        error = str(e) or e.__class__.__name__
+                return {delivery.id: error for delivery in group}
+
+            errors: Dict[int, Optional[str]] = {}
+            for result in await asyncio.gather(*(send(group) for group in self._group(deliveries))):
+                errors.update(result)
+            self._record(deliveries, errors)
+        return folded + claimed
+
+    def _shared(self, event_type: str) -> bool:
+        """Whether messages of this event type go out unpersonalized, by BCC"""
+        return self.bcc_batch_size > 1 and event_type in self.bcc_events
+
+    def _group(self, deliveries: List[_Delivery]) -> List[List[_Delivery]]:
+        """Shared messages batched per content for one BCC send each"""
+        groups: Dict[tuple, List[_Delivery]] = {}
+        for delivery in deliveries:
+            key = (delivery.content_hash,) if self._shared(delivery.event_type) else (delivery.content_hash, delivery.id)
+            groups.setdefault(key, []).append(delivery)
+        size = max(self.bcc_batch_size, 1)
+        return [
+            group[start:start + size]
+            for group in groups.values()
+            for start in range(0, len(group), size)
+        ]
+
+    def _claim(self):
+        """Lease due rows; expand events, return detached recipient rows"""
+        now = datetime.utcnow()
+        fanned_out = False
+        db = self.session_factory()
+        try:
+            rows = db.query(NotificationOutbox).filter(
+                NotificationOutbox.status == OutboxStatus.PENDING.value,
+                NotificationOutbox.next_attempt_at <= now
+            ).order_by(NotificationOutbox.id).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+            recipients = [row for row in rows if not row.is_event]
+            contents = dict(
+                db.query(NotificationContent.hash, NotificationContent).filter(
+                    NotificationContent.hash.in_({row.content_hash for row in recipients})
+                ).all()
+            ) if recipients else {}
+
+            deliveries: List[_Delivery] = []
+            for row in rows:
+                row.next_attempt_at = now + timedelta(seconds=self.lease)
+                if row.is_event:
+                    fanned_out = self._fan_out(db, row, now) or fanned_out
+                    continue
+                content = contents.get(row.content_hash)
+                if content is None:
+                    self._failed_attempt(row, "Notification content missing", now)
+                    continue
+                name = NEUTRAL_RECIPIENT_NAME if self._shared(row.event_type) else row.recipient_name
+                deliveries.append(_Delivery(
+                    row.id, row.event_type, row.document_id, row.version_id,
+                    row.recipient_user_id, row.recipient_email, name,
+                    row.content_hash, row.attempts,
+                    content.subject, personalize(content.body_html, name),
+                ))
+
+            db.commit()
+            if fanned_out:
+                self._wakeup.set()  # Send the new recipient rows right away
+            return deliveries, len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _fan_out(self, db: Session, event_row: NotificationOutbox, now: datetime) -> bool:
+        """Render an event once and insert its recipient rows; False if it failed"""
+        from app.core.notification_dispatcher import build_notification
+
+        try:
+            with db.begin_nested():
+                rendered = build_notification(db, event_row)
+                if rendered is not None and rendered.recipients:
+                    digest = store_content(db, rendered.subject, rendered.html_body)
+                    if event_row.event_type in self.digest_events:
+                        status, due = OutboxStatus.DIGEST.value, now + timedelta(seconds=self.digest_interval)
+                    else:
+                        status, due = OutboxStatus.PENDING.value, now
+                    db.execute(insert(NotificationOutbox), [
+                        {
+                            "event_type": event_row.event_type,
+                            "document_id": event_row.document_id,
+                            "version_id": event_row.version_id,
+                            "actor_user_id": event_row.actor_user_id,
+                            "event_id": event_row.id,
+                            "recipient_user_id": recipient.id,
+                            "recipient_email": recipient.email,
+                            "recipient_name": recipient.name,
+                            "content_hash": digest,
+                            "status": status,
+                            "attempts": 0,
+                            "next_attempt_at": due,
+                            "created_at": now,
+                        }
+                        for recipient in rendered.recipients
+                    ])
+                event_row.status = OutboxStatus.FANNED_OUT.value
+                event_row.processed_at = now
+            return True
+        except Exception as e:
+            logger.error(f"Failed to expand notification event {event_row.id}", exc_info=True)
+            self._failed_attempt(event_row, str(e), now)
+            return False
+
+    def _flush_digests(self) -> int:
+        """
+        Fold the parked rows of up to `batch_size` recipients whose digest
+        is due into one digest row each; returns the number of rows folded
+        """
+        from app.core.notification_dispatcher import render_digest
+
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            due = [
+                email for (email,) in db.query(NotificationOutbox.recipient_email).filter(
+                    NotificationOutbox.status == OutboxStatus.DIGEST.value,
+                    NotificationOutbox.next_attempt_at <= now
+                ).distinct().limit(self.batch_size)
+            ]
+            if not due:
+                return 0
+            rows = db.query(NotificationOutbox).filter(
+                NotificationOutbox.status == OutboxStatus.DIGEST.value,
+                NotificationOutbox.recipient_email.in_(due)
+            ).order_by(NotificationOutbox.id).with_for_update(skip_locked=True).all()
+            if not rows:
+                return 0  # Another worker is folding them
+            subjects = dict(db.query(NotificationContent.hash, NotificationContent.subject).filter(
+                NotificationContent.hash.in_({row.content_hash for row in rows})
+            ))
+
+            by_recipient: Dict[str, List[NotificationOutbox]] = {}
+            for row in rows:
+                by_recipient.setdefault(row.recipient_email, []).append(row)
+
+            # Recipients with the same notifications share one rendering
+            rendered: Dict[tuple, str] = {}
+            digests = []
+            for email, items in by_recipient.items():
+                key = tuple((row.content_hash, row.document_id, row.version_id) for row in items)
+                if key not in rendered:
+                    rendered[key] = store_content(db, *render_digest([
+                        (subjects.get(row.content_hash, row.event_type), row.created_at, row.document_id, row.version_id)
+                        for row in items
+                    ]))
+                digests.append({
+                    "event_type": DIGEST_EVENT_TYPE,
+                    "recipient_user_id": items[0].recipient_user_id,
+                    "recipient_email": email,
+                    "recipient_name": items[-1].recipient_name,
+                    "content_hash": rendered[key],
+                    "status": OutboxStatus.PENDING.value,
+                    "attempts": 0,
+                    "next_attempt_at": now,
+                    "created_at": now,
+                })
+
+            digest_ids = dict(
+                (email, digest_id) for digest_id, email in db.execute(
+                    insert(NotificationOutbox).returning(NotificationOutbox.id, NotificationOutbox.recipient_email),
+                    digests
+                )
+            )
+            db.execute(update(NotificationOutbox), [
+                {"id": row.id, "status": OutboxStatus.DIGESTED.value, "digest_id": digest_ids[row.recipient_email], "processed_at": now}
+                for row in rows
+            ])
+            db.commit()
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _record(self, deliveries: List[_Delivery], errors: Dict[int, Optional[str]]):
+        """Store the outcome of each send, logging final ones in one insert"""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            digest_items = self._digest_items(
+                db, [delivery.id for delivery in deliveries if delivery.event_type == DIGEST_EVENT_TYPE]
+            )
+            updates = []
+            logs = []
+            for delivery in deliveries:
+                error = errors[delivery.id]
+                attempts = delivery.attempts + 1
+                if error is None:
+                    updates.append({"id": delivery.id, "status": OutboxStatus.SENT.value, "attempts": attempts, "last_error": None, "processed_at": now})
+                elif attempts >= self.max_attempts:
+                    updates.append({"id": delivery.id, "status": OutboxStatus.FAILED.value, "attempts": attempts, "last_error": error, "processed_at": now})
+                else:
+                    retry_at = now + timedelta(seconds=self.retry_delay(attempts))
+                    updates.append({"id": delivery.id, "attempts": attempts, "last_error": error, "next_attempt_at": retry_at})
+                    continue
+                # A digest is logged once for each notification it carried
+                carried = digest_items.get(delivery.id) or [(delivery.document_id, delivery.version_id, delivery.event_type)]
+                for document_id, version_id, event_type in carried:
+                    logs.append({
+                        "document_id": document_id,
+                        "version_id": version_id,
+                        "event_type": event_type,
+                        "recipient_email": delivery.recipient_email,
+                        "recipient_user_id": delivery.recipient_user_id,
+                        "recipient_name": delivery.recipient_name,
+                        "subject": delivery.subject,
+                        "content_hash": delivery.content_hash,
+                        "status": NotificationStatus.FAILED if error else NotificationStatus.SENT,
+                        "error_message": error,
+                        "sent_at": None if error else now,
+                        "created_at": now,
+                    })
+
+            # Bulk UPDATE by primary key, one executemany per set of columns
+            for keys in {frozenset(values) for values in updates}:
+                db.execute(update(NotificationOutbox), [values for values in updates if frozenset(values) == keys])
+            log_notifications(db, logs)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.error("Failed to record notification results; leases will expire and retry", exc_info=True)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _digest_items(db: Session, digest_ids: List[int]) -> Dict[int, List[tuple]]:
+        """(document_id, version_id, event_type) of the rows folded into each digest"""
+        items: Dict[int, List[tuple]] = {}
+        if digest_ids:
+            for row in db.query(
+                NotificationOutbox.digest_id, NotificationOutbox.document_id,
+                NotificationOutbox.version_id, NotificationOutbox.event_type
+            ).filter(NotificationOutbox.digest_id.in_(digest_ids)).order_by(NotificationOutbox.id):
+                items.setdefault(row.digest_id, []).append((row.document_id, row.version_id, row.event_type))
+        return items
+
+    def _failed_attempt(self, row: NotificationOutbox, error: str, now: datetime):
+        row.attempts += 1
+        row.last_error = error
+        if row.attempts >= self.max_attempts:
+            row.status = OutboxStatus.FAILED.value
+            row.processed_at = now
+        else:
+            row.next_attempt_at = now + timedelta(seconds=self.retry_delay(row.attempts))
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        try:
+            while not self._stopping.is_set():
+                self._wakeup.wait(self.interval)
+                self._wakeup.clear()
+                try:
+                    # Keep going while full batches are being claimed
+                    while loop.run_until_complete(self.run_once()) >= self.batch_size and not self._stopping.is_set():
+                        pass
+                except Exception:
+                    logger.exception("Notification dispatch round failed")
+        finally:
+            loop.run_until_complete(close_smtp_pool())
+            loop.close()
+
+
+outbox_dispatcher = OutboxDispatcher()
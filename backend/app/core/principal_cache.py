@@ -0,0 +1,145 @@
+"""
+Principal cache
+Keeps authenticated users (active flag, roles, permissions) in memory for a
+short TTL so request authentication does not hit the database every time
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+from sqlalchemy.orm import Session, defer, selectinload
+
+from app.config import settings
+from app.core import rbac
+from app.database import run_after_commit
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authorization facts about one user, plus a detached snapshot of the row"""
+    user_id: int
+    username: str
+    is_active: bool
+    roles: FrozenSet[str]
+    role_mask: int  # rbac.ROLE_BITS of the roles
+    permission_mask: int  # rbac.PERMISSION_BITS granted by the roles
+    user: User  # Detached, roles loaded, no password hash; attach with Session.merge(load=False)
+
+    def with_token_claims(self, claims: Dict[str, Any]) -> "Principal":
+        """
+        Use the role/permission masks signed into the access token
+
+        Claims compiled against a different RBAC table (a deploy changed
+        ROLE_CAPABILITIES) are ignored and the masks derived from the
+        user's roles are kept.
+        """
+        if claims.get("rbac") != rbac.RBAC_VERSION or not isinstance(claims.get("perm"), int) or not isinstance(claims.get("rmask"), int):
+            return self
+        return replace(self, role_mask=claims["rmask"], permission_mask=claims["perm"])
+
+
+class PrincipalCache:
+    """
+    TTL + LRU bounded cache of Principals keyed by user id
+
+    Entries expire after `ttl` seconds, which bounds staleness across worker
+    processes; within a process users.py/auth.py invalidate explicitly
+    whenever a user's account, roles, password or session changes.
+    """
+
+    def __init__(self, ttl: float = settings.PRINCIPAL_CACHE_TTL_SECONDS, max_size: int = settings.PRINCIPAL_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, loader: Callable[[int], Optional[Principal]]) -> Optional[Principal]:
+        """Return the cached Principal, calling `loader` on a miss or expiry"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        principal = loader(user_id)
+        if principal is not None and self.ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, principal)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return principal
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.invalidations = 0
+
+
+principal_cache = PrincipalCache()
+
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    """
+    Load a user and its roles into a detached snapshot
+
+    Uses a short-lived session of its own so the snapshot never belongs to
+    (or shares state with) a request session.
+    """
+    with Session(bind=db.get_bind()) as loader_db:
+        # Credentials stay out of the cache; see security.verify_user_password
+        user = loader_db.query(User).options(
+            selectinload(User.roles), defer(User.hashed_password)
+        ).filter(User.id == user_id).first()
+        if user is None:
+            return None
+        role_names = frozenset(role.name for role in user.roles)
+
+    return Principal(
+        user_id=user.id,
+        username=user.username,
+        is_active=user.is_active,
+        roles=role_names,
+        role_mask=rbac.role_mask(role_names),
+        permission_mask=rbac.permission_mask(role_names),
+        user=user,
+    )
+
+
+def invalidate_principal(db: Session, user_id: int):
+    """
+    Drop a user's cached principal now and again when `db` commits
+
+    The second drop covers a concurrent request re-caching the old row
+    between this call and the commit.
+    """
+    principal_cache.invalidate(user_id)
+    run_after_commit(db, ("principal", user_id), lambda: principal_cache.invalidate(user_id))
@@ -1,8 +1,9 @@
 """
 Role-Based Access Control (RBAC) utilities and decorators
 """
+import hashlib
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
 
 
 class RoleEnum(str, Enum):
@@ -58,6 +59,76 @@ ROLE_CAPABILITIES = {
 }
 
 
+def compile_rbac() -> str:
+    """
+    Compile ROLE_CAPABILITIES into integer bitsets
+    
+    Every permission and every role gets one bit. A user's combined masks
+    (see permission_mask / role_mask) are then checked with a single AND.
+    Runs at import; call again if ROLE_CAPABILITIES is changed at runtime.
+    
+    Returns:
+        Version tag of the compiled table, carried in tokens so masks
+        issued against a different table are not trusted
+    """
+    global RBAC_VERSION
+    
+    permissions = sorted({p for caps in ROLE_CAPABILITIES.values() for p in caps})
+    PERMISSION_BITS.clear()
+    PERMISSION_BITS.update({permission: 1 << i for i, permission in enumerate(permissions)})
+    
+    ROLE_BITS.clear()
+    ROLE_BITS.update({role.value: 1 << i for i, role in enumerate(RoleEnum)})
+    
+    ROLE_PERMISSION_MASKS.clear()
+    for role in RoleEnum:
+        mask = 0
+        for permission in ROLE_CAPABILITIES.get(role, []):
+            mask |= PERMISSION_BITS[permission]
+        ROLE_PERMISSION_MASKS[role.value] = mask
+    
+    layout = "|".join(permissions) + "#" + "|".join(ROLE_BITS) + "#" + ",".join(
+        str(ROLE_PERMISSION_MASKS[role]) for role in ROLE_BITS
+    )
+    RBAC_VERSION = hashlib.sha256(layout.encode("utf-8")).hexdigest()[:12]
+    return RBAC_VERSION
+
+
+# Compiled tables (filled by compile_rbac)
+PERMISSION_BITS: Dict[str, int] = {}
+ROLE_BITS: Dict[str, int] = {}
+ROLE_PERMISSION_MASKS: Dict[str, int] = {}
+RBAC_VERSION: str = ""
+
+
+def permission_mask(user_roles: Iterable[str]) -> int:
+    """Combined permission bitset of a set of role names (unknown roles grant nothing)"""
+    mask = 0
+    for role_name in user_roles:
+        mask |= ROLE_PERMISSION_MASKS.get(role_name, 0)
+    return mask
+
+
+def role_mask(user_roles: Iterable[str]) -> int:
+    """Bitset of a set of role names (unknown roles are ignored)"""
+    mask = 0
+    for role_name in user_roles:
+        mask |= ROLE_BITS.get(role_name, 0)
+    return mask
+
+
+def mask_has_permission(mask: int, required_permission: str) -> bool:
+    """Check a permission bitset; unknown permissions are never granted"""
+    bit = PERMISSION_BITS.get(required_permission, 0)
+    return bit != 0 and mask & bit == bit
+
+
+def mask_has_role(mask: int, role_name: str) -> bool:
+    """Check a role bitset"""
+    bit = ROLE_BITS.get(role_name, 0)
+    return bit != 0 and mask & bit == bit
+
+
 def has_permission(user_roles: List[str], required_permission: str) -> bool:
     """
     Check if any of the user's roles grant the required permission
@@ -69,16 +140,7 @@ def has_permission(user_roles: List[str], required_permission: str) -> bool:
     Returns:
         True if user has permission, False otherwise
     """
-    for role_name in user_roles:
-        try:
-            role = RoleEnum(role_name)
-            if required_permission in ROLE_CAPABILITIES.get(role, []):
-                return True
-        except ValueError:
-            # Invalid role name
-            continue
-    
-    return False
+    return mask_has_permission(permission_mask(user_roles), required_permission)
 
 
 def has_any_role(user_roles: List[str], required_roles: List[str]) -> bool:
@@ -118,15 +180,8 @@ def get_user_permissions(user_roles: List[str]) -> List[str]:
     Returns:
         List of all permissions the user has
     """
-    permissions = set()
-    
-    for role_name in user_roles:
-        try:
-            role = RoleEnum(role_name)
-            permissions.update(ROLE_CAPABILITIES.get(role, []))
-        except ValueError:
-            continue
-    
-    return list(permissions)
+    mask = permission_mask(user_roles)
+    return [permission for permission, bit in PERMISSION_BITS.items() if mask & bit]
 
 
+compile_rbac()
@@ -0,0 +1,121 @@
+"""
+Recipient directory
+Keeps the active users' ids, emails, names and roles in memory so resolving
+notification recipients does not query the users table for every event
+"""
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.database import run_after_commit
+from app.models.user import User
+
+
+class Recipient(NamedTuple):
+    """What a notification needs to know about a user"""
+    id: int
+    email: Optional[str]
+    name: str  # Full name, or username when the user has none
+
+    @classmethod
+    def of(cls, user: User) -> "Recipient":
+        return cls(user.id, user.email, user.full_name or user.username)
+
+
+class _Snapshot(NamedTuple):
+    expires: float
+    active: List[Recipient]  # Ordered by user id
+    by_id: Dict[int, Recipient]
+    by_role: Dict[str, List[Recipient]]
+
+
+class RecipientDirectory:
+    """
+    All active users, indexed by id and by role, loaded in one pass
+
+    The snapshot is reloaded after `ttl` seconds, which bounds staleness
+    across worker processes; within a process users.py invalidates it
+    whenever a user is created, changed, (de)activated or deleted.
+    """
+
+    def __init__(self, ttl: float = settings.RECIPIENT_DIRECTORY_TTL_SECONDS):
+        self.ttl = ttl
+        self._snapshot: Optional[_Snapshot] = None
+        self._generation = 0  # Bumped by invalidate(); a load started before it is not kept
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.invalidations = 0
+
+    def active_users(self, db: Session) -> List[Recipient]:
+        return self._get(db).active
+
+    def by_role(self, db: Session, role_name: str) -> List[Recipient]:
+        """Active users with the role"""
+        return self._get(db).by_role.get(role_name, [])
+
+    def get(self, db: Session, user_id: int) -> Optional[Recipient]:
+        """Any user by id; inactive users are looked up in the database"""
+        recipient = self._get(db).by_id.get(user_id)
+        if recipient is None:
+            user = db.get(User, user_id)
+            recipient = Recipient.of(user) if user is not None else None
+        return recipient
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "users": len(self._snapshot.active) if self._snapshot else None,
+                "loads": self.loads,
+                "invalidations": self.invalidations,
+            }
+
+    def _get(self, db: Session) -> _Snapshot:
+        now = time.monotonic()
+        with self._lock:
+            snapshot, generation = self._snapshot, self._generation
+        if snapshot is not None and snapshot.expires > now:
+            return snapshot
+
+        snapshot = self._load(db, now)
+        with self._lock:
+            self.loads += 1
+            if self.ttl > 0 and generation == self._generation:
+                self._snapshot = snapshot
+        return snapshot
+
+    def _load(self, db: Session, now: float) -> _Snapshot:
+        users = db.query(User).options(selectinload(User.roles)).filter(
+            User.is_active == True
+        ).order_by(User.id).all()
+
+        active: List[Recipient] = []
+        by_role: Dict[str, List[Recipient]] = {}
+        for user in users:
+            recipient = Recipient.of(user)
+            active.append(recipient)
+            for role in user.roles:
+                by_role.setdefault(role.name, []).append(recipient)
+        return _Snapshot(now + self.ttl, active, {recipient.id: recipient for recipient in active}, by_role)
+
+
+recipient_directory = RecipientDirectory()
+
+
+def invalidate_recipients(db: Session):
+    """
+    Drop the directory now and again when `db` commits
+
+    The second drop covers a notification round reloading the old rows
+    between this call and the commit.
+    """
+    recipient_directory.invalidate()
+    run_after_commit(db, "recipient_directory", recipient_directory.invalidate)
@@ -1,30 +1,145 @@
 """
 Security utilities for password hashing and JWT token management
 """
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.models.user import User
 
 # Password hashing context
 # Using pbkdf2_sha256 for Windows compatibility (change to bcrypt in production with proper setup)
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Hashes whose rounds differ from PASSWORD_HASH_ROUNDS are flagged for rehash
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+    pbkdf2_sha256__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+)
+
+
+class PasswordPoolBusy(Exception):
+    """Too many password hash operations are already queued"""
+
+
+class PasswordHashPool:
+    """
+    Size-limited pool for password hashing and verification
+    
+    PBKDF2 is CPU-bound (hashlib releases the GIL while it runs), so a
+    login burst would otherwise occupy every request worker thread and
+    every core at once. Work runs on `workers` dedicated threads; at most
+    `max_queued` further calls may wait, beyond that callers get
+    PasswordPoolBusy (503) straight away instead of piling up.
+    """
+    
+    def __init__(self, workers: int = settings.PASSWORD_HASH_WORKERS, max_queued: int = settings.PASSWORD_HASH_QUEUE_MAX):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queued)
+        self._lock = threading.Lock()
+        self.reset_stats()
+    
+    def run(self, func: Callable, *args):
+        """Run `func(*args)` on the pool and wait for the result"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise PasswordPoolBusy("Password verification is busy, please retry")
+        submitted = time.perf_counter()
+        try:
+            future = self._executor.submit(self._timed, func, args, submitted)
+        except Exception:
+            self._slots.release()
+            raise
+        # The slot is held until the work finishes, even if the caller gives up
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=settings.PASSWORD_HASH_TIMEOUT_SECONDS)
+        except FuturesTimeoutError:
+            raise PasswordPoolBusy("Password verification timed out, please retry")
+    
+    def _timed(self, func: Callable, args: Tuple, submitted: float):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self._completed += 1
+                self._wait_total += started - submitted
+                self._run_total += finished - started
+                self._wait_max = max(self._wait_max, started - submitted)
+                self._run_max = max(self._run_max, finished - started)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self.workers,
+                "max_queued": self.max_queued,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(self._wait_total / completed * 1000, 2) if completed else None,
+                "max_wait_ms": round(self._wait_max * 1000, 2),
+                "avg_run_ms": round(self._run_total / completed * 1000, 2) if completed else None,
+                "max_run_ms": round(self._run_max * 1000, 2),
+            }
+    
+    def reset_stats(self):
+        with self._lock:
+            self._completed = self._rejected = 0
+            self._wait_total = self._run_total = self._wait_max = self._run_max = 0.0
+
+
+password_pool = PasswordHashPool()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a plain password against a hashed password
+    
+    Runs on the password pool; raises PasswordPoolBusy when it is saturated.
+    """
+    return password_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def verify_user_password(db: Session, user_id: int, plain_password: str) -> bool:
+    """
+    Verify a re-authentication (e-signature) password
+
+    The hash is read from the database on every call: the authenticated
+    user is a cached snapshot that does not carry credentials, and a
+    password changed in another worker must stop signing at once.
+    """
+    hashed_password = db.scalar(select(User.hashed_password).where(User.id == user_id))
+    return hashed_password is not None and verify_password(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and rehash it if the hash uses outdated settings
+    
+    Returns:
+        (is_valid, new_hash) - new_hash is None unless a rehash is due
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_pool.run(pwd_context.verify_and_update, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
     Hash a plain password
     """
-    return pwd_context.hash(password)
+    return password_pool.run(pwd_context.hash, password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -0,0 +1,48 @@
+"""
+Number sequences
+Atomic increment-and-return counters backing document numbers and template codes
+"""
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.number_sequence import NumberSequence
+
+_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def next_sequence_value(db: Session, key: str, seed: Optional[Callable[[], int]] = None) -> int:
+    """
+    Advance the sequence `key` and return the new value (1, 2, 3, ...)
+
+    The increment is one UPDATE ... RETURNING, so concurrent callers never
+    get the same value: the row stays locked until the caller's transaction
+    ends, and a rollback gives the value back (numbers stay gapless).
+    The UPDATE also comes before any read, which lets SQLite take its write
+    lock up front instead of failing a read-to-write upgrade.
+
+    `seed` is called only for a key that has no row yet and returns the
+    highest value already in use (identifiers issued before the sequence
+    existed), so numbering continues from there.
+    """
+    now = datetime.utcnow()
+    value = db.execute(
+        update(NumberSequence)
+        .where(NumberSequence.key == key)
+        .values(value=NumberSequence.value + 1, updated_at=now)
+        .returning(NumberSequence.value)
+    ).scalar()
+    if value is not None:
+        return value
+
+    start = (seed() if seed else 0) + 1
+    insert = _INSERT[db.get_bind().dialect.name](NumberSequence).values(key=key, value=start, updated_at=now)
+    # A concurrent first allocation may have created the row meanwhile
+    insert = insert.on_conflict_do_update(
+        index_elements=[NumberSequence.key],
+        set_={"value": NumberSequence.value + 1, "updated_at": now},
+    )
+    return db.execute(insert.returning(NumberSequence.value)).scalar()
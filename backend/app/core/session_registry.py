@@ -0,0 +1,182 @@
+"""
+Session registry
+Tracks issued access tokens by their `jti` claim in `user_sessions`, with an
+in-memory front cache and push notification of revocations
+"""
+import asyncio
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import partial
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import run_after_commit
+from app.models.user_session import UserSession
+
+
+@dataclass(frozen=True)
+class SessionState:
+    """What the registry knows about one token"""
+    jti: str
+    user_id: int
+    expires_at: datetime
+    revoked_reason: Optional[str] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.revoked_reason is None and self.expires_at > datetime.utcnow()
+
+
+class SessionRegistry:
+    """
+    Front cache over `user_sessions` keyed by jti
+
+    Lookups are a dict hit; misses read one row through the unique jti
+    index. Revocations committed in this process update the cache and are
+    pushed to subscribers (the session event stream) right away; entries
+    are re-read after `ttl` seconds so revocations made by other worker
+    processes are picked up within that bound.
+    """
+
+    def __init__(self, ttl: float = settings.SESSION_CACHE_TTL_SECONDS, max_size: int = settings.SESSION_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[str, Tuple[float, SessionState]] = {}
+        self._subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def check(self, db: Session, jti: str) -> Optional[SessionState]:
+        """Return the state of a token's session, or None if it was never issued"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(jti)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        row = db.query(
+            UserSession.user_id, UserSession.expires_at, UserSession.revoked_reason, UserSession.revoked_at
+        ).filter(UserSession.jti == jti).first()
+        if row is None:
+            return None
+        state = SessionState(
+            jti=jti,
+            user_id=row.user_id,
+            expires_at=row.expires_at,
+            revoked_reason=(row.revoked_reason or "revoked") if row.revoked_at else None,
+        )
+        self._store(state)
+        return state
+
+    def _store(self, state: SessionState):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._evict()
+            self._entries[state.jti] = (time.monotonic() + self.ttl, state)
+
+    def _evict(self):
+        now = time.monotonic()
+        for jti in [jti for jti, (until, _) in self._entries.items() if until <= now]:
+            del self._entries[jti]
+        while len(self._entries) >= self.max_size:
+            self._entries.pop(next(iter(self._entries)))
+
+    def mark_revoked(self, jti: str, reason: str):
+        """Record a committed revocation and notify the session's subscribers"""
+        with self._lock:
+            entry = self._entries.get(jti)
+            if entry:
+                state = entry[1]
+                self._entries[jti] = (entry[0], SessionState(state.jti, state.user_id, state.expires_at, reason))
+            subscribers = list(self._subscribers.get(jti, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, reason)
+            except RuntimeError:
+                # Event loop already closed; the stream is gone
+                pass
+
+    def subscribe(self, jti: str) -> asyncio.Queue:
+        """Queue that receives the revocation reason when the session ends"""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(jti, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, jti: str, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(jti)
+            if subscribers:
+                subscribers.difference_update({s for s in subscribers if s[1] is queue})
+                if not subscribers:
+                    del self._subscribers[jti]
+
+    def forget(self, jti: str):
+        """Drop a cached entry so the next check() re-reads the row"""
+        with self._lock:
+            self._entries.pop(jti, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+session_registry = SessionRegistry()
+
+
+def create_session(
+    db: Session,
+    user_id: int,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> UserSession:
+    """Register a new session; put its `jti` in the access token. The caller commits."""
+    user_session = UserSession(
+        jti=uuid.uuid4().hex,
+        user_id=user_id,
+        created_at=datetime.utcnow(),
+        expires_at=datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        ip_address=ip_address,
+        user_agent=user_agent,
+    )
+    db.add(user_session)
+    db.flush()
+    return user_session
+
+
+def active_sessions(db: Session, user_id: int) -> List[UserSession]:
+    """A user's unrevoked, unexpired sessions, newest first"""
+    return (
+        db.query(UserSession)
+        .filter(
+            UserSession.user_id == user_id,
+            UserSession.revoked_at.is_(None),
+            UserSession.expires_at > datetime.utcnow(),
+        )
+        .order_by(UserSession.created_at.desc())
+        .all()
+    )
+
+
+def revoke_user_sessions(db: Session, user_id: int, reason: str) -> int:
+    """
+    Revoke every live session of a user
+
+    Takes effect in the cache and reaches subscribers when `db` commits.
+    Returns the number of sessions revoked.
+    """
+    sessions = active_sessions(db, user_id)
+    now = datetime.utcnow()
+    for user_session in sessions:
+        user_session.revoked_at = now
+        user_session.revoked_reason = reason
+        publish = partial(session_registry.mark_revoked, user_session.jti, reason)
+        run_after_commit(db, ("session_revoked", user_session.jti), publish)
+    db.flush()
+    return len(sessions)
@@ -0,0 +1,148 @@
+"""
+SMTP connection pool
+Keeps a few authenticated SMTP connections open and sends many messages
+over each, instead of a connect + TLS handshake + login per message
+"""
+import asyncio
+import logging
+import time
+import weakref
+from email.message import EmailMessage
+from typing import Callable, List, Optional
+
+import aiosmtplib
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+def _default_connection() -> aiosmtplib.SMTP:
+    return aiosmtplib.SMTP(
+        hostname=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        use_tls=settings.SMTP_USE_SSL,
+        start_tls=settings.SMTP_USE_TLS,
+        validate_certs=True,
+        timeout=settings.SMTP_TIMEOUT_SECONDS,
+    )
+
+
+class SMTPPool:
+    """
+    At most `size` SMTP connections shared by the coroutines of one event loop
+
+    A connection is opened (and authenticated when SMTP_USER is set) on
+    first use and then reused for up to `max_messages` messages. Idle
+    connections older than `idle_timeout` are closed rather than reused,
+    since servers drop them anyway. If a reused connection turns out to be
+    closed by the server, the message is retried once on a fresh one.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.SMTP_POOL_SIZE,
+        max_messages: int = settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+        idle_timeout: float = settings.SMTP_IDLE_TIMEOUT_SECONDS,
+        connection_factory: Callable[[], aiosmtplib.SMTP] = _default_connection,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+    ):
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_timeout = idle_timeout
+        self.connection_factory = connection_factory
+        self.username = username if username is not None else settings.SMTP_USER
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[_PooledConnection] = []
+        self.connections_opened = 0
+
+    async def send(self, message: EmailMessage, recipients: List[str]) -> None:
+        """Send `message` to the envelope `recipients` (To, Cc and Bcc alike)"""
+        async with self._slots:
+            connection = self._take_idle()
+            reused = connection is not None
+            try:
+                if connection is None:
+                    connection = await self._open()
+                try:
+                    await connection.smtp.send_message(message, recipients=recipients)
+                except aiosmtplib.SMTPServerDisconnected:
+                    if not reused:
+                        raise
+                    # The server closed the idle connection; retry once
+                    self._discard(connection)
+                    connection = await self._open()
+                    await connection.smtp.send_message(message, recipients=recipients)
+            except Exception:
+                if connection is not None:
+                    self._discard(connection)
+                raise
+            connection.sent += 1
+            connection.last_used = time.monotonic()
+            if connection.sent >= self.max_messages:
+                await self._quit(connection)
+            else:
+                self._idle.append(connection)
+
+    async def close(self):
+        """QUIT every idle connection"""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await self._quit(connection)
+
+    def _take_idle(self) -> Optional[_PooledConnection]:
+        now = time.monotonic()
+        while self._idle:
+            connection = self._idle.pop()
+            if connection.smtp.is_connected and now - connection.last_used < self.idle_timeout:
+                return connection
+            self._discard(connection)
+        return None
+
+    async def _open(self) -> _PooledConnection:
+        smtp = self.connection_factory()
+        await smtp.connect()
+        if self.username and self.password:
+            await smtp.login(self.username, self.password)
+        self.connections_opened += 1
+        return _PooledConnection(smtp)
+
+    async def _quit(self, connection: _PooledConnection):
+        try:
+            await connection.smtp.quit()
+        except Exception:
+            self._discard(connection)
+
+    @staticmethod
+    def _discard(connection: _PooledConnection):
+        connection.smtp.close()
+
+
+# One pool per event loop: connections cannot be shared between loops
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, SMTPPool]" = weakref.WeakKeyDictionary()
+
+
+def get_smtp_pool() -> SMTPPool:
+    """The pool of the running event loop"""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        pool = _pools[loop] = SMTPPool()
+    return pool
+
+
+async def close_smtp_pool():
+    """Close the running event loop's pool, if it has one"""
+    pool = _pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.close()
@@ -0,0 +1,228 @@
+"""
+Dashboard statistics
+Counters of documents (by status, department and latest workflow state) and
+users, kept in `stat_counters` by the transactions that change those rows
+and periodically rebuilt from the source tables
+"""
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func, inspect, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Document, StatCounter, User
+
+logger = logging.getLogger(__name__)
+
+_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+CounterKey = Tuple[str, str]  # (scope, key)
+
+_DOCUMENT_FIELDS = ("status", "department", "latest_version_status", "is_deleted")
+_USER_FIELDS = ("is_active",)
+
+
+def _document_counters(status, department, latest_version_status, is_deleted) -> List[CounterKey]:
+    """The counters one document row contributes 1 to"""
+    if is_deleted:
+        return []
+    counters = [("documents", "total")]
+    if status:
+        counters.append(("document_status", status.upper()))
+    if department:
+        counters.append(("document_department", department))
+    if latest_version_status:
+        counters.append(("version_status", latest_version_status))
+    return counters
+
+
+def _user_counters(is_active) -> List[CounterKey]:
+    """The counters one user row contributes 1 to"""
+    return [("users", "total"), ("users", "active")] if is_active else [("users", "total")]
+
+
+def _current(obj, fields: Iterable[str]) -> tuple:
+    return tuple(getattr(obj, field) for field in fields)
+
+
+def _previous(obj, fields: Iterable[str]) -> Optional[tuple]:
+    """Values before this flush, or None when none of the fields changed"""
+    state = inspect(obj)
+    values = []
+    changed = False
+    for field in fields:
+        history = state.attrs[field].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.added:
+            values.append(None)  # Replaced a NULL
+        else:
+            values.append(getattr(obj, field))
+            continue
+        changed = True
+    return tuple(values) if changed else None
+
+
+def _flush_deltas(session: Session) -> Counter:
+    """Counter changes implied by the Document/User rows of the current flush"""
+    deltas: Counter = Counter()
+    tracked = ((Document, _DOCUMENT_FIELDS, _document_counters), (User, _USER_FIELDS, _user_counters))
+    for model, fields, counters in tracked:
+        for obj in session.new:
+            if isinstance(obj, model):
+                deltas.update(counters(*_current(obj, fields)))
+        for obj in session.deleted:
+            if isinstance(obj, model):
+                deltas.subtract(counters(*(_previous(obj, fields) or _current(obj, fields))))
+        for obj in session.dirty:
+            if isinstance(obj, model) and obj not in session.deleted:
+                previous = _previous(obj, fields)
+                if previous is not None:
+                    deltas.subtract(counters(*previous))
+                    deltas.update(counters(*_current(obj, fields)))
+    return deltas
+
+
+def apply_deltas(session: Session, deltas: Dict[CounterKey, int]):
+    """
+    Add `deltas` to the counters inside the session's transaction
+
+    One multi-row upsert; rows are written in key order so concurrent
+    transactions lock them in the same order and cannot deadlock.
+    """
+    rows = [
+        {"scope": scope, "key": key, "value": delta, "updated_at": datetime.utcnow()}
+        for (scope, key), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+    table = StatCounter.__table__
+    upsert = _INSERT[session.get_bind().dialect.name](table)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[table.c.scope, table.c.key],
+        set_={"value": table.c.value + upsert.excluded.value, "updated_at": upsert.excluded.updated_at},
+    )
+    session.connection().execute(upsert, rows)
+
+
+@event.listens_for(Document.status, "set", active_history=True)
+@event.listens_for(Document.department, "set", active_history=True)
+@event.listens_for(Document.latest_version_status, "set", active_history=True)
+@event.listens_for(Document.is_deleted, "set", active_history=True)
+@event.listens_for(User.is_active, "set", active_history=True)
+def _keep_previous_value(target, value, oldvalue, initiator):
+    # active_history loads the replaced value even if it was expired, so
+    # the flush below always knows which counter to decrement
+    pass
+
+
+@event.listens_for(Session, "after_flush")
+def _count_flushed_rows(session, flush_context):
+    apply_deltas(session, _flush_deltas(session))
+
+
+def read_stats(db: Session) -> Dict[str, Dict[str, int]]:
+    """All counters as {scope: {key: value}}, zero counts omitted"""
+    stats: Dict[str, Dict[str, int]] = {}
+    for row in db.execute(select(StatCounter.scope, StatCounter.key, StatCounter.value)):
+        if row.value:
+            stats.setdefault(row.scope, {})[row.key] = row.value
+    return stats
+
+
+def count_stats(db: Session) -> Dict[CounterKey, int]:
+    """Exact counter values computed from the documents and users tables"""
+    counts: Counter = Counter()
+    rows = db.execute(
+        select(
+            Document.status, Document.department, Document.latest_version_status, func.count()
+        ).where(
+            Document.is_deleted == False
+        ).group_by(Document.status, Document.department, Document.latest_version_status)
+    )
+    for status, department, latest_version_status, count in rows:
+        for counter in _document_counters(status, department, latest_version_status, False):
+            counts[counter] += count
+    for is_active, count in db.execute(select(User.is_active, func.count()).group_by(User.is_active)):
+        for counter in _user_counters(is_active):
+            counts[counter] += count
+    return dict(counts)
+
+
+def reconcile_stats(db: Session) -> Dict[CounterKey, Tuple[int, int]]:
+    """
+    Rebuild every counter from the source tables; the caller commits
+
+    Writers are locked out of stat_counters first (LOCK TABLE on
+    PostgreSQL; the DELETE takes SQLite's write lock), so a transition
+    that commits meanwhile is either in the recount or applies its delta
+    on top of it afterwards. Returns {(scope, key): (stored, exact)} for
+    the counters that had drifted.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE stat_counters IN EXCLUSIVE MODE"))
+    stored = {
+        (row.scope, row.key): row.value
+        for row in db.execute(delete(StatCounter).returning(StatCounter.scope, StatCounter.key, StatCounter.value))
+    }
+    exact = count_stats(db)
+    apply_deltas(db, exact)
+    return {
+        counter: (stored.get(counter, 0), exact.get(counter, 0))
+        for counter in set(stored) | set(exact)
+        if stored.get(counter, 0) != exact.get(counter, 0)
+    }
+
+
+class StatsReconciler:
+    """Daemon thread running reconcile_stats() every `interval` seconds"""
+
+    def __init__(self, interval: float = settings.STATS_RECONCILE_INTERVAL_SECONDS, session_factory=SessionLocal):
+        self.interval = interval
+        self.session_factory = session_factory
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-reconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+
+    def run_once(self) -> Dict[CounterKey, Tuple[int, int]]:
+        db = self.session_factory()
+        try:
+            drift = reconcile_stats(db)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        if drift:
+            logger.warning("Stat counters drifted and were corrected: %s", drift)
+        return drift
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Stat counter reconciliation failed")
+
+
+stats_reconciler = StatsReconciler()
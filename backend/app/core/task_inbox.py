@@ -0,0 +1,115 @@
+"""
+Task inbox
+Computes the document versions waiting for a user's action (drafts to edit,
+reviews, approvals, publishing) in SQL, and caches the result per user
+"""
+from itertools import chain
+from typing import Optional
+
+from sqlalchemy import Subquery, and_, case, event, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import run_after_commit
+from app.models import Document, DocumentComment, DocumentVersion, User, VersionStatus
+from app.utils.pagination import ResultCache
+
+PRIORITIES = ("high", "medium", "low")
+
+# Task inbox pages keyed per user and request. Any committed change to
+# documents, versions or comments clears it, since one transition moves
+# tasks between users
+task_inbox_cache = ResultCache(ttl=settings.TASK_INBOX_CACHE_TTL_SECONDS)
+
+
+def task_roles(user: User) -> frozenset:
+    """The workflow roles that decide which tasks a user gets"""
+    return frozenset(
+        role for role in ("DMS_Admin", "Author", "Reviewer", "Approver") if user.has_role(role)
+    )
+
+
+def task_query(user: User) -> Optional[Subquery]:
+    """
+    Latest versions the user can act on, one row per task
+
+    Mirrors the workflow permissions: drafts go to admins and to the
+    authors who own the document or created the version, reviews to
+    reviewers, approvals to approvers, and approved versions to admins
+    (only admins publish). Returns None when the user has no workflow role.
+    Columns: the document and version fields of TaskItem plus `priority`
+    and `unresolved_comments`.
+    """
+    roles = task_roles(user)
+    is_admin = "DMS_Admin" in roles
+
+    conditions = []
+    if is_admin:
+        conditions.append(DocumentVersion.status == VersionStatus.DRAFT)
+    elif "Author" in roles:
+        conditions.append(and_(
+            DocumentVersion.status == VersionStatus.DRAFT,
+            or_(Document.owner_id == user.id, DocumentVersion.created_by_id == user.id),
+        ))
+    if is_admin or "Reviewer" in roles:
+        conditions.append(DocumentVersion.status == VersionStatus.UNDER_REVIEW)
+    if is_admin or "Approver" in roles:
+        conditions.append(DocumentVersion.status == VersionStatus.PENDING_APPROVAL)
+    if is_admin:
+        conditions.append(DocumentVersion.status == VersionStatus.APPROVED)
+    if not conditions:
+        return None
+
+    unresolved = select(func.count(DocumentComment.id)).where(
+        DocumentComment.document_version_id == DocumentVersion.id,
+        DocumentComment.is_resolved == False,
+    ).correlate(DocumentVersion).scalar_subquery()
+
+    is_draft = DocumentVersion.status == VersionStatus.DRAFT
+    # Drafts sent back with comments are "high"; fresh drafts wait ("low")
+    priority = case(
+        (and_(is_draft, unresolved > 0), "high"),
+        (is_draft, "low"),
+        (DocumentVersion.status == VersionStatus.APPROVED, "medium"),
+        else_="high",
+    )
+
+    return select(
+        Document.id.label("document_id"),
+        Document.document_number,
+        Document.title,
+        Document.department,
+        DocumentVersion.id.label("version_id"),
+        DocumentVersion.version_number,
+        DocumentVersion.version_string,
+        DocumentVersion.status,
+        DocumentVersion.updated_at,
+        unresolved.label("unresolved_comments"),
+        priority.label("priority"),
+    ).join(
+        Document, Document.id == DocumentVersion.document_id
+    ).where(
+        DocumentVersion.is_latest == True,
+        Document.is_deleted == False,
+        or_(*conditions),
+    ).subquery("tasks")
+
+
+def task_type(status: str, unresolved_comments: int) -> str:
+    """Label shown for a task, from its version status"""
+    if status == VersionStatus.DRAFT.value:
+        return "Draft - Address Comments" if unresolved_comments else "Draft - Continue Editing"
+    if status == VersionStatus.UNDER_REVIEW.value:
+        return "Review Required"
+    if status == VersionStatus.PENDING_APPROVAL.value:
+        return "Approval Required"
+    return "Ready to Publish"
+
+
+@event.listens_for(Session, "before_flush")
+def _note_task_changes(session, flush_context, instances):
+    if any(
+        isinstance(obj, (Document, DocumentVersion, DocumentComment))
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        run_after_commit(session, "task_inbox_cache", task_inbox_cache.clear)
@@ -1,9 +1,13 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from contextvars import ContextVar
+from typing import Callable, Hashable, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import settings
 
@@ -22,15 +26,128 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def get_async_database_url(database_url: str) -> str:
+    """
+    Map a synchronous DATABASE_URL onto the matching asyncio driver
+    
+    sqlite:///./dms.db          -> sqlite+aiosqlite:///./dms.db
+    postgresql://...            -> postgresql+asyncpg://...
+    postgresql+psycopg2://...   -> postgresql+asyncpg://...
+    """
+    scheme, sep, rest = database_url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return database_url
+
+
+# Create async engine next to the sync one (same database, asyncio driver)
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL),
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+)
+
+# Create AsyncSessionLocal class
+# expire_on_commit=False: attributes stay readable after commit without implicit IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+class CommitCounter:
+    """Number of transactions committed while handling one request"""
+    
+    def __init__(self):
+        self.count = 0
+
+
+_commit_counter: ContextVar[Optional[CommitCounter]] = ContextVar("commit_counter", default=None)
+
+
+def start_commit_counter() -> CommitCounter:
+    """
+    Start counting commits for the current request
+    
+    The counter is a mutable object so increments made from threadpool
+    handlers (which run on a copy of the context) are still visible here.
+    """
+    counter = CommitCounter()
+    _commit_counter.set(counter)
+    return counter
+
+
+@event.listens_for(Session, "after_commit")
+def _count_commit(session):
+    counter = _commit_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+# Session.info key holding {key: callback} to run once the transaction commits
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+
+
+def run_after_commit(session: Session, key: Hashable, callback: Callable[[], None]):
+    """
+    Run `callback` once the session's transaction commits
+    
+    Dropped if it rolls back instead. Callbacks registered under the same
+    key in one transaction run once, so invalidating a cache on every
+    flush costs a single invalidation.
+    """
+    session.info.setdefault(_AFTER_COMMIT_KEY, {})[key] = callback
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session):
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, {}).values():
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session):
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+
+
 def get_db():
     """
     Dependency function to get database session
     Usage: db: Session = Depends(get_db)
+    
+    The session is a unit of work: handlers and AuditLogger only add/flush,
+    and the transaction is committed once after the handler returns, or
+    rolled back if it raises (including HTTPException).
     """
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency function to get an async database session
+    Usage: db: AsyncSession = Depends(get_async_db)
+    
+    Use this from `async def` route handlers so database I/O is awaited
+    instead of blocking the event loop. Same unit of work semantics as get_db().
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
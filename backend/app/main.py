@@ -2,11 +2,18 @@
 FastAPI Application Entry Point
 Pharma Document Management System (DMS)
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.api.v1 import api_router
+from app.database import start_commit_counter
+from app.core.audit_writer import audit_writer
+from app.core.principal_cache import principal_cache
+from app.core.stats import stats_reconciler
+from app.core.notification_outbox import outbox_dispatcher
+from app.core.security import PasswordPoolBusy, password_pool
 
 # Create FastAPI app
 app = FastAPI(
@@ -46,10 +53,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def count_db_commits(request: Request, call_next):
+    """Expose the number of database commits made for each request"""
+    counter = start_commit_counter()
+    response = await call_next(request)
+    response.headers["X-DB-Commits"] = str(counter.count)
+    return response
+
+
+@app.exception_handler(PasswordPoolBusy)
+async def password_pool_busy(request: Request, exc: PasswordPoolBusy):
+    """Shed password checks beyond the hash pool's queue instead of stalling"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
 
+@app.on_event("startup")
+def start_audit_writer():
+    """Start the buffered audit log writer"""
+    if settings.AUDIT_BUFFERED_WRITES:
+        audit_writer.start()
+
+
+@app.on_event("shutdown")
+def stop_audit_writer():
+    """Flush queued audit rows before the process exits"""
+    audit_writer.stop()
+
+
+@app.on_event("startup")
+def start_stats_reconciler():
+    """Periodically rebuild the dashboard counters from the source tables"""
+    stats_reconciler.start()
+
+
+@app.on_event("shutdown")
+def stop_stats_reconciler():
+    stats_reconciler.stop()
+
+
+@app.on_event("startup")
+def start_notification_dispatcher():
+    """Deliver queued workflow notifications in the background"""
+    outbox_dispatcher.start()
+
+
+@app.on_event("shutdown")
+def stop_notification_dispatcher():
+    outbox_dispatcher.stop()
+
+
 @app.get("/", tags=["Health"])
 def root():
     """Root endpoint - API health check"""
@@ -64,7 +125,11 @@ def root():
 @app.get("/health", tags=["Health"])
 def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "principal_cache": principal_cache.stats(),
+        "password_pool": password_pool.stats(),
+    }
 
 
 if __name__ == "__main__":
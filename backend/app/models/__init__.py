@@ -3,24 +3,36 @@ Database Models
 """
 from app.models.user import User
 from app.models.role import Role
-from app.models.audit_log import AuditLog
+from app.models.user_session import UserSession
+from app.models.audit_log import AuditLog, AuditLogArchive, AuditAction, AuditEntityType, AuditChainCheckpoint
 from app.models.document import Document
 from app.models.document_version import DocumentVersion, VersionStatus, ChangeType
+from app.models.document_search import DocumentSearchEntry
 from app.models.attachment import Attachment
 from app.models.edit_lock import EditLock
 from app.models.comment import DocumentComment
 from app.models.document_view import DocumentView
 from app.models.template import Template, TemplateVersion, TemplateReview, TemplateApproval, TemplateStatus
+from app.models.number_sequence import NumberSequence
+from app.models.stat_counter import StatCounter
 from app.models.notification_log import NotificationLog, NotificationStatus, NotificationEventType
+from app.models.notification_content import NotificationContent
+from app.models.notification_outbox import NotificationOutbox, OutboxStatus
 
 __all__ = [
     "User",
     "Role", 
+    "UserSession",
     "AuditLog",
+    "AuditLogArchive",
+    "AuditAction",
+    "AuditEntityType",
+    "AuditChainCheckpoint",
     "Document",
     "DocumentVersion",
     "VersionStatus",
     "ChangeType",
+    "DocumentSearchEntry",
     "Attachment",
     "EditLock",
     "DocumentComment",
@@ -30,9 +42,14 @@ __all__ = [
     "TemplateReview",
     "TemplateApproval",
     "TemplateStatus",
+    "NumberSequence",
+    "StatCounter",
     "NotificationLog",
     "NotificationStatus",
     "NotificationEventType",
+    "NotificationContent",
+    "NotificationOutbox",
+    "OutboxStatus",
 ]
 
 
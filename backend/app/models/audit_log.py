@@ -2,7 +2,7 @@
 Audit Log Model - Records all significant system actions for compliance
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -14,6 +14,12 @@ class AuditLog(Base):
     Critical for FDA 21 CFR Part 11 compliance
     """
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Keyset pagination order: newest first, id breaks timestamp ties
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        # Per-entity history: one index range scan per entity, already time ordered
+        Index("ix_audit_logs_entity_timestamp", "entity_type", "entity_id", "timestamp"),
+    )
     
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
@@ -24,7 +30,7 @@ class AuditLog(Base):
     
     # What action was performed
     action = Column(String(100), nullable=False, index=True)  # e.g., "USER_CREATED", "USER_DEACTIVATED"
-    entity_type = Column(String(50), nullable=False, index=True)  # e.g., "User", "Document"
+    entity_type = Column(String(50), nullable=False)  # e.g., "User", "Document" (indexed via ix_audit_logs_entity_timestamp)
     entity_id = Column(Integer, nullable=True, index=True)  # ID of affected entity
     
     # Details
@@ -38,6 +44,11 @@ class AuditLog(Base):
     # Timestamp
     timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
+    # Tamper-evidence hash chain (assigned by the sealer, see app/core/audit_chain.py)
+    chain_seq = Column(BigInteger, nullable=True, index=True)  # Position in the chain
+    prev_hash = Column(String(64), nullable=True)  # row_hash of chain_seq - 1
+    row_hash = Column(String(64), nullable=True)  # sha256(prev_hash + row content)
+    
     # Relationships
     user = relationship("User", back_populates="audit_logs", foreign_keys=[user_id])
     
@@ -45,3 +56,85 @@ class AuditLog(Base):
         return f"<AuditLog(id={self.id}, action='{self.action}', user='{self.username}', timestamp='{self.timestamp}')>"
 
 
+class AuditLogArchive(Base):
+    """
+    Manifest entry for one month of audit logs moved out of the database
+    into a compressed, read-only archive file (see app/core/audit_archive.py)
+    """
+    __tablename__ = "audit_log_archives"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Covered month: [period_start, period_end)
+    period_start = Column(DateTime, nullable=False, unique=True, index=True)
+    period_end = Column(DateTime, nullable=False)
+    
+    # Archive file (gzip NDJSON, newest row first)
+    file_path = Column(String(500), nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    min_id = Column(Integer, nullable=True)
+    max_id = Column(Integer, nullable=True)
+    # {entity_type: [min entity_id, max entity_id]}; NULL on archives written
+    # before it was recorded, which are then always searched
+    entity_ranges = Column(JSON, nullable=True)
+    # Hash chain span of the archived rows; the last link lets sealing and
+    # verification continue past rows that left the database
+    first_chain_seq = Column(BigInteger, nullable=True)
+    last_chain_seq = Column(BigInteger, nullable=True)
+    last_row_hash = Column(String(64), nullable=True)
+    
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set when the archive is deleted after AUDIT_LOG_RETENTION_DAYS
+    purged_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<AuditLogArchive(period_start='{self.period_start}', rows={self.row_count})>"
+
+
+class AuditAction(Base):
+    """
+    Lookup of every action code ever written to the audit log
+    Maintained by AuditLogger.log (insert-if-absent)
+    """
+    __tablename__ = "audit_actions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False, unique=True)
+    first_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<AuditAction(name='{self.name}')>"
+
+
+class AuditEntityType(Base):
+    """
+    Lookup of every entity type ever written to the audit log
+    Maintained by AuditLogger.log (insert-if-absent)
+    """
+    __tablename__ = "audit_entity_types"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), nullable=False, unique=True)
+    first_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<AuditEntityType(name='{self.name}')>"
+
+
+class AuditChainCheckpoint(Base):
+    """
+    Signed checkpoint of the audit hash chain
+    Verification resumes from the newest checkpoint already verified good
+    """
+    __tablename__ = "audit_chain_checkpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    chain_seq = Column(BigInteger, nullable=False, unique=True, index=True)
+    row_hash = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    signature = Column(String(64), nullable=False)  # HMAC-SHA256 over seq, hash and created_at
+    verified_at = Column(DateTime, nullable=True)  # Last time the chain up to here verified good
+    
+    def __repr__(self):
+        return f"<AuditChainCheckpoint(chain_seq={self.chain_seq}, verified_at='{self.verified_at}')>"
@@ -2,7 +2,7 @@
 Document Comment Model
 Represents inline comments and annotations on document versions
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -15,6 +15,10 @@ class DocumentComment(Base):
     Used by reviewers/approvers to annotate specific text
     """
     __tablename__ = "document_comments"
+    __table_args__ = (
+        # Unresolved comment counts per version
+        Index("ix_document_comments_version_resolved", "document_version_id", "is_resolved"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -2,7 +2,7 @@
 Document model for DMS
 Represents the master document entity with metadata
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -13,6 +13,10 @@ class Document(Base):
     Master Document entity containing metadata and lifecycle state
     """
     __tablename__ = "documents"
+    __table_args__ = (
+        # Keyset pagination of document lists (newest first)
+        Index("ix_documents_updated_at_id", "updated_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_number = Column(String(100), unique=True, nullable=False, index=True)
@@ -29,6 +33,11 @@ class Document(Base):
     # Status from current version (denormalized for quick filtering)
     status = Column(String(50), default='Draft', nullable=False, index=True)
     
+    # Version summary (denormalized, maintained by the version workflow endpoints)
+    version_count = Column(Integer, default=0, nullable=False)
+    latest_version_id = Column(Integer, ForeignKey('document_versions.id'), nullable=True)
+    latest_version_status = Column(String(50), nullable=True, index=True)  # VersionStatus value
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -0,0 +1,83 @@
+"""
+DocumentSearchEntry model for DMS
+One row of searchable text per document; the full-text index over it is
+dialect specific (FTS5 on SQLite, tsvector/GIN on PostgreSQL)
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, DDL, event
+from datetime import datetime
+from app.database import Base
+
+
+class DocumentSearchEntry(Base):
+    """
+    Searchable text of a document: metadata plus the stripped content of
+    its effective (or else latest) version. Maintained by
+    app.core.document_search.index_document().
+    """
+    __tablename__ = "document_search"
+
+    document_id = Column(Integer, ForeignKey('documents.id', ondelete='CASCADE'), primary_key=True)
+    version_id = Column(Integer, ForeignKey('document_versions.id', ondelete='SET NULL'), nullable=True)  # Version the body was taken from
+    document_number = Column(String(100), nullable=False)
+    title = Column(String(500), nullable=False)
+    department = Column(String(100), nullable=True)
+    tags = Column(Text, nullable=True)  # Space-separated
+    body = Column(Text, nullable=True)  # Plain text, HTML/SFDT stripped
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<DocumentSearchEntry(document_id={self.document_id}, version_id={self.version_id})>"
+
+
+# SQLite: external-content FTS5 table kept in sync by triggers
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS document_search_fts USING fts5(
+        document_number, title, department, tags, body,
+        content='document_search', content_rowid='document_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS document_search_ai AFTER INSERT ON document_search BEGIN
+        INSERT INTO document_search_fts(rowid, document_number, title, department, tags, body)
+        VALUES (new.document_id, new.document_number, new.title, new.department, new.tags, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS document_search_ad AFTER DELETE ON document_search BEGIN
+        INSERT INTO document_search_fts(document_search_fts, rowid, document_number, title, department, tags, body)
+        VALUES ('delete', old.document_id, old.document_number, old.title, old.department, old.tags, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS document_search_au AFTER UPDATE ON document_search BEGIN
+        INSERT INTO document_search_fts(document_search_fts, rowid, document_number, title, department, tags, body)
+        VALUES ('delete', old.document_id, old.document_number, old.title, old.department, old.tags, old.body);
+        INSERT INTO document_search_fts(rowid, document_number, title, department, tags, body)
+        VALUES (new.document_id, new.document_number, new.title, new.department, new.tags, new.body);
+    END
+    """,
+]
+
+# PostgreSQL: weighted tsvector generated from the row, GIN indexed
+POSTGRESQL_SEARCH_DDL = [
+    """
+    ALTER TABLE document_search ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(document_number, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(department, '') || ' ' || coalesce(tags, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX ix_document_search_vector ON document_search USING GIN (search_vector)",
+]
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(DocumentSearchEntry.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(DocumentSearchEntry.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+event.listen(
+    DocumentSearchEntry.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS document_search_fts").execute_if(dialect="sqlite"),
+)
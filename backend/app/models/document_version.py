@@ -2,8 +2,8 @@
 DocumentVersion model for DMS
 Represents a specific version of a document with content and workflow state
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Index, Enum as SQLEnum
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from app.database import Base
 import enum
@@ -32,6 +32,10 @@ class DocumentVersion(Base):
     Individual version of a document with content and workflow state
     """
     __tablename__ = "document_versions"
+    __table_args__ = (
+        # Task inbox: latest versions by workflow status, newest first
+        Index("ix_document_versions_latest_status_updated", "is_latest", "status", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     document_id = Column(Integer, ForeignKey('documents.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -44,7 +48,9 @@ class DocumentVersion(Base):
     replaced_by_version_id = Column(Integer, ForeignKey('document_versions.id'), nullable=True)
     
     # Content
-    content_html = Column(Text)  # HTML or SFDT format from Syncfusion
+    # Deferred: list endpoints and relationship loads never need the body;
+    # handlers that return or edit it undefer(DocumentVersion.content_html)
+    content_html = deferred(Column(Text))  # HTML or SFDT format from Syncfusion
     content_hash = Column(String(64), nullable=True)  # SHA-256 hash for optimistic concurrency
     
     # Metadata
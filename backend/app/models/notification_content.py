@@ -0,0 +1,27 @@
+"""
+Notification Content Model
+Rendered email subjects and bodies, stored once and shared by every
+notification log row and outbox row that sent them
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime
+
+from app.database import Base
+
+
+class NotificationContent(Base):
+    """
+    One rendered message, keyed by the SHA-256 of its subject and body
+
+    The body may contain the email_templates.RECIPIENT_NAME placeholder;
+    rows referencing it carry the recipient_name substituted at send time.
+    """
+    __tablename__ = "notification_contents"
+
+    hash = Column(String(64), primary_key=True)
+    subject = Column(String(500), nullable=False)
+    body_html = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<NotificationContent(hash={self.hash[:12]}, subject={self.subject})>"
@@ -5,9 +5,11 @@ Tracks all email notifications sent for audit compliance
 from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Optional
 import enum
 
 from app.database import Base
+from app.core.email_templates import personalize
 
 
 class NotificationStatus(str, enum.Enum):
@@ -41,7 +43,9 @@ class NotificationLog(Base):
     recipient_email = Column(String(255), nullable=False, index=True)
     recipient_user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True, index=True)
     subject = Column(String(500), nullable=False)
-    body_html = Column(Text, nullable=True)
+    body_html = Column(Text, nullable=True)  # Only on rows written before content_hash
+    content_hash = Column(String(64), ForeignKey('notification_contents.hash'), nullable=True, index=True)
+    recipient_name = Column(String(255), nullable=True)  # Substituted into the shared content
     status = Column(SQLEnum(NotificationStatus), default=NotificationStatus.PENDING, nullable=False, index=True)
     sent_at = Column(DateTime, nullable=True)
     error_message = Column(Text, nullable=True)
@@ -51,6 +55,14 @@ class NotificationLog(Base):
     document = relationship("Document", foreign_keys=[document_id])
     version = relationship("DocumentVersion", foreign_keys=[version_id])
     recipient_user = relationship("User", foreign_keys=[recipient_user_id])
+    content = relationship("NotificationContent")
+    
+    @property
+    def rendered_html(self) -> Optional[str]:
+        """The body exactly as it was sent to this recipient"""
+        if self.content is None:
+            return self.body_html
+        return personalize(self.content.body_html, self.recipient_name)
     
     def __repr__(self):
         return f"<NotificationLog(id={self.id}, event={self.event_type.value}, recipient={self.recipient_email}, status={self.status.value})>"
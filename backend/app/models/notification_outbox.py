@@ -0,0 +1,71 @@
+"""
+Notification Outbox Model
+Notification intents written by workflow transitions, delivered in the
+background by app.core.notification_outbox
+"""
+from datetime import datetime
+import enum
+
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Index
+
+from app.database import Base
+
+
+class OutboxStatus(str, enum.Enum):
+    """Outbox row state"""
+    PENDING = "PENDING"  # Waiting for (another) delivery attempt
+    FANNED_OUT = "FANNED_OUT"  # Event expanded into one row per recipient
+    DIGEST = "DIGEST"  # Waiting for the recipient's next digest (due at next_attempt_at)
+    DIGESTED = "DIGESTED"  # Included in the digest row `digest_id`
+    SENT = "SENT"
+    FAILED = "FAILED"  # Gave up after NOTIFICATION_MAX_ATTEMPTS
+
+
+# event_type of an aggregated per-recipient digest row (no document)
+DIGEST_EVENT_TYPE = "DIGEST"
+
+
+class NotificationOutbox(Base):
+    """
+    One pending notification
+
+    A workflow transition inserts an event row (no recipient) in its own
+    transaction. The dispatcher resolves the recipients of the event and
+    replaces it with one row per recipient, each retried on its own.
+    Recipient rows of digest event types are later folded into a single
+    DIGEST_EVENT_TYPE row per recipient.
+    """
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        # Dispatcher scan: due rows in insertion order
+        Index('ix_notification_outbox_status_due', 'status', 'next_attempt_at'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)  # NotificationEventType value
+    document_id = Column(Integer, ForeignKey('documents.id', ondelete='CASCADE'), nullable=True, index=True)  # NULL on digest rows
+    version_id = Column(Integer, ForeignKey('document_versions.id', ondelete='CASCADE'), nullable=True)
+    actor_user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)  # User who made the transition
+    payload = Column(JSON, nullable=True)  # Event details, e.g. rejection_reason
+
+    # Set on per-recipient rows only
+    event_id = Column(Integer, ForeignKey('notification_outbox.id', ondelete='CASCADE'), nullable=True, index=True)
+    recipient_user_id = Column(Integer, ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    recipient_email = Column(String(255), nullable=True)
+    recipient_name = Column(String(255), nullable=True)
+    content_hash = Column(String(64), ForeignKey('notification_contents.hash'), nullable=True)  # Event rendered once
+    digest_id = Column(Integer, ForeignKey('notification_outbox.id', ondelete='SET NULL'), nullable=True, index=True)
+
+    status = Column(String(20), default=OutboxStatus.PENDING.value, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # Also the claim lease
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = Column(DateTime, nullable=True)
+
+    @property
+    def is_event(self) -> bool:
+        return self.recipient_email is None
+
+    def __repr__(self):
+        return f"<NotificationOutbox(id={self.id}, event={self.event_type}, recipient={self.recipient_email}, status={self.status})>"
@@ -0,0 +1,25 @@
+"""
+NumberSequence model - named counters for human-readable identifiers
+(document numbers, template codes)
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from app.database import Base
+
+
+class NumberSequence(Base):
+    """
+    Last value handed out for one numbering key, e.g.
+    "document:SOP-QA-20251129" or "template:SP-QA:SOP"
+
+    Only ever advanced through app.core.sequences.next_sequence_value().
+    """
+    __tablename__ = "number_sequences"
+
+    key = Column(String(200), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<NumberSequence(key={self.key}, value={self.value})>"
@@ -0,0 +1,27 @@
+"""
+StatCounter model - precomputed dashboard counts
+(documents by status, department and workflow state; users)
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from app.database import Base
+
+
+class StatCounter(Base):
+    """
+    One dashboard count, e.g. ("document_status", "EFFECTIVE") or
+    ("users", "active")
+
+    Adjusted in the same transaction as the rows it counts by
+    app.core.stats, and periodically rebuilt by reconcile_stats().
+    """
+    __tablename__ = "stat_counters"
+
+    scope = Column(String(50), primary_key=True)
+    key = Column(String(200), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<StatCounter(scope={self.scope}, key={self.key}, value={self.value})>"
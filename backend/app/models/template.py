@@ -4,7 +4,7 @@ Handles template metadata, versions, reviews, and approvals
 """
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum as SQLEnum, JSON, TypeDecorator
 from sqlalchemy.dialects.postgresql import ENUM
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from app.database import Base
 import enum
@@ -116,7 +116,8 @@ class TemplateVersion(Base):
     preview_html_path = Column(String(500), nullable=True)  # Path to converted HTML preview
     
     # For block-based templates - JSON storage
-    template_data = Column(JSON, nullable=True)  # Stores: {metadata: {}, blocks: []}
+    # Deferred like DocumentVersion.content_html; undefer(TemplateVersion.template_data) where it is read
+    template_data = deferred(Column(JSON, nullable=True))  # Stores: {metadata: {}, blocks: []}
     # Structure:
     # {
     #   "metadata": {
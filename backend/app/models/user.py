@@ -5,6 +5,7 @@ from datetime import datetime
 from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
 from sqlalchemy.orm import relationship
 
+from app.core import rbac
 from app.database import Base
 from app.models.role import user_roles
 
@@ -25,10 +26,6 @@ class User(Base):
     hashed_password = Column(String(255), nullable=False)
     is_temp_password = Column(Boolean, default=False, nullable=False)
     
-    # Session Management - Single session enforcement
-    active_session_token = Column(String(500), nullable=True)  # Current active JWT token
-    session_created_at = Column(DateTime, nullable=True)  # When current session was created
-    
     # Profile
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
@@ -48,6 +45,11 @@ class User(Base):
     audit_logs = relationship("AuditLog", back_populates="user", foreign_keys="AuditLog.user_id")
     owned_documents = relationship("Document", foreign_keys="Document.owner_id", back_populates="owner")
     
+    # Bitsets (app.core.rbac) for the authenticated user, set from the access
+    # token by get_current_user; None means derive them from `roles`
+    role_mask = None
+    permission_mask = None
+    
     @property
     def full_name(self):
         """Returns user's full name"""
@@ -55,7 +57,13 @@ class User(Base):
     
     def has_role(self, role_name: str) -> bool:
         """Check if user has a specific role"""
-        return any(role.name == role_name for role in self.roles)
+        mask = self.role_mask if self.role_mask is not None else rbac.role_mask(role.name for role in self.roles)
+        return rbac.mask_has_role(mask, role_name)
+    
+    def has_permission(self, permission: str) -> bool:
+        """Check if user's roles grant a permission (e.g. "document.publish")"""
+        mask = self.permission_mask if self.permission_mask is not None else rbac.permission_mask(role.name for role in self.roles)
+        return rbac.mask_has_permission(mask, permission)
     
     def is_admin(self) -> bool:
         """Check if user has DMS_Admin role"""
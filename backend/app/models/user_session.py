@@ -0,0 +1,44 @@
+"""
+UserSession model - registry of issued access tokens
+Backs single-session enforcement: a token is valid only while its session
+row is unrevoked and unexpired
+"""
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+
+
+class UserSession(Base):
+    """
+    One login session, identified by the `jti` claim of its access token
+    (the token itself is never stored)
+    """
+    __tablename__ = "user_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), unique=True, nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    revoked_reason = Column(String(50), nullable=True)  # logout, superseded, deactivated
+
+    ip_address = Column(String(45), nullable=True)
+    user_agent = Column(String(500), nullable=True)
+
+    __table_args__ = (
+        # Finding a user's live session(s) at login / revocation
+        Index('ix_user_sessions_user_revoked', 'user_id', 'revoked_at'),
+    )
+
+    user = relationship("User", foreign_keys=[user_id])
+
+    @property
+    def is_active(self) -> bool:
+        return self.revoked_at is None and self.expires_at > datetime.utcnow()
+
+    def __repr__(self):
+        return f"<UserSession(id={self.id}, user_id={self.user_id}, active={self.is_active})>"
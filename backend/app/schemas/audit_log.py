@@ -28,8 +28,11 @@ class AuditLogListResponse(BaseModel):
     """Paginated list of audit logs"""
     logs: List[AuditLogResponse]
     total: int
-    page: int
+    page: Optional[int] = None  # None in cursor mode
     page_size: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
+    older_history_archived: bool = False  # Matching months are archived but were not searched
     
     class Config:
         from_attributes = True
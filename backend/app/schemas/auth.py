@@ -39,6 +39,12 @@ class SessionConflictResponse(BaseModel):
     detail: str = "Please confirm to override the existing session"
 
 
+class SessionEventsTicket(BaseModel):
+    """Short-lived ticket opening the session event stream"""
+    ticket: str
+    expires_in: int  # Seconds
+
+
 class TokenData(BaseModel):
     """Data stored in JWT token"""
     username: Optional[str] = None
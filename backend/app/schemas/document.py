@@ -45,8 +45,10 @@ class DocumentResponse(DocumentBase):
     owner_username: Optional[str] = None
     owner_full_name: Optional[str] = None
     
-    # Version count
+    # Version summary
     version_count: Optional[int] = None
+    latest_version_id: Optional[int] = None
+    latest_version_status: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -56,9 +58,11 @@ class DocumentListResponse(BaseModel):
     """Schema for paginated document list"""
     items: List[DocumentResponse]
     total: int
-    page: int
+    page: Optional[int] = None  # None in cursor mode
     size: int  # Changed from page_size to match frontend expectation
     pages: int = 1  # Total number of pages
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
     
     
 class DocumentDetailResponse(DocumentResponse):
@@ -82,3 +86,24 @@ class DocumentSearchFilters(BaseModel):
     page: int = Field(default=1, ge=1)
     page_size: int = Field(default=20, ge=1, le=100)
 
+
+
+class DocumentSearchHit(BaseModel):
+    """Ranked full-text search result"""
+    id: int
+    document_number: str
+    title: str
+    department: Optional[str] = None
+    status: str
+    latest_version_status: Optional[str] = None
+    updated_at: datetime
+    score: float  # Lower is a better match
+    title_highlight: str  # HTML-escaped title with <mark> around matched terms
+    snippet: Optional[str] = None  # HTML-escaped content excerpt with <mark> highlights
+
+
+class DocumentSearchResponse(BaseModel):
+    """Keyset-paged full-text search results, best match first"""
+    items: List[DocumentSearchHit]
+    page_size: int
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
@@ -0,0 +1,25 @@
+"""
+Dashboard Statistics Schemas
+"""
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class DocumentStats(BaseModel):
+    """Counts of non-deleted documents"""
+    total: int = 0
+    by_status: Dict[str, int] = {}  # Document status, upper-cased (EFFECTIVE, DRAFT, ...)
+    by_department: Dict[str, int] = {}
+    by_version_status: Dict[str, int] = {}  # Workflow state of each document's latest version
+
+
+class UserStats(BaseModel):
+    """Counts of user accounts"""
+    total: int = 0
+    active: int = 0
+
+
+class StatsResponse(BaseModel):
+    """Dashboard counters"""
+    documents: DocumentStats
+    users: Optional[UserStats] = None  # Admins only
@@ -0,0 +1,30 @@
+"""
+Task Inbox Schemas
+"""
+from typing import Dict, List, Optional
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class TaskItem(BaseModel):
+    """A document version waiting for the current user's action"""
+    document_id: int
+    document_number: str
+    title: str
+    department: Optional[str] = None
+    version_id: int
+    version_number: int
+    version_string: Optional[str] = None
+    status: str  # Version workflow status
+    task_type: str  # e.g. "Review Required", "Draft - Address Comments"
+    priority: str  # high, medium or low
+    unresolved_comments: int
+    updated_at: datetime
+
+
+class TaskListResponse(BaseModel):
+    """Keyset-paged task inbox, most recently updated first"""
+    items: List[TaskItem]
+    counts: Optional[Dict[str, int]] = None  # Tasks per priority plus "all"; first page only
+    page_size: int
+    next_cursor: Optional[str] = None  # Pass as `cursor` to fetch the next page
@@ -0,0 +1,96 @@
+"""
+Audit Trail Export Utility
+Encodes audit rows as CSV or NDJSON, optionally gzip-compressed, as a stream
+of byte chunks suitable for a StreamingResponse
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator
+
+EXPORT_COLUMNS = [
+    "id",
+    "timestamp",
+    "user_id",
+    "username",
+    "action",
+    "entity_type",
+    "entity_id",
+    "description",
+    "details",
+    "ip_address",
+    "user_agent",
+]
+
+# Rows encoded per chunk handed to the response / compressor
+CHUNK_ROWS = 500
+
+
+def _export_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Export columns of a row, timestamps as ISO-8601 in every format"""
+    return {
+        column: value.isoformat() if isinstance(value, datetime) else value
+        for column, value in ((column, row.get(column)) for column in EXPORT_COLUMNS)
+    }
+
+
+def _csv_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    
+    count = 0
+    for row in rows:
+        record = _export_record(row)
+        if record["details"] is not None:
+            record["details"] = json.dumps(record["details"], separators=(",", ":"), default=str)
+        writer.writerow(record.values())
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _ndjson_lines(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(_export_record(row), separators=(",", ":"), default=str))
+        if len(chunk) == CHUNK_ROWS:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+
+def iter_audit_export(
+    rows: Iterable[Dict[str, Any]],
+    export_format: str = "csv",
+    compress: bool = True,
+) -> Iterator[bytes]:
+    """
+    Encode audit rows chunk by chunk
+    
+    Args:
+        rows: Iterable of audit row dicts (consumed lazily)
+        export_format: "csv" or "ndjson"
+        compress: Gzip the stream
+    
+    Returns:
+        Iterator of bytes; memory use is bounded by CHUNK_ROWS, not the row count
+    """
+    encode = _csv_lines if export_format == "csv" else _ndjson_lines
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+    
+    for text in encode(rows):
+        data = text.encode("utf-8")
+        if compressor:
+            data = compressor.compress(data)
+        if data:
+            yield data
+    
+    if compressor:
+        yield compressor.flush()
@@ -0,0 +1,109 @@
+"""
+Pagination Utilities
+Opaque keyset cursors and cheap row-count estimates for large tables
+"""
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Query, Session
+
+from app.config import settings
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Encode keyset values (e.g. {"ts": datetime, "id": 42}) as an opaque cursor
+
+    Datetimes are serialized as ISO strings and restored by decode_cursor().
+    """
+    payload = {
+        key: {"$dt": value.isoformat()} if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor()
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, dict):
+            raise ValueError("cursor payload must be an object")
+        return {
+            key: datetime.fromisoformat(value["$dt"]) if isinstance(value, dict) else value
+            for key, value in payload.items()
+        }
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def estimate_count(db: Session, query: Union[Query, Select]) -> int:
+    """
+    Cheap row-count estimate for a filtered query (ORM Query or select())
+
+    PostgreSQL: the planner's row estimate from EXPLAIN (no table scan).
+    Other databases: an exact count capped at COUNT_ESTIMATE_CAP rows, so the
+    cost is bounded no matter how large the table grows.
+    """
+    statement = query.order_by(None)
+    if isinstance(statement, Query):
+        statement = statement.statement
+
+    if db.bind.dialect.name == "postgresql":
+        compiled = statement.compile(dialect=db.bind.dialect)
+        plan = db.connection().exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    capped = statement.limit(settings.COUNT_ESTIMATE_CAP).subquery()
+    return db.execute(select(func.count()).select_from(capped)).scalar()
+
+
+class ResultCache:
+    """
+    Short-lived cache of query results (exact counts, whole pages) keyed by
+    filter values
+
+    Owners clear() it when the underlying rows change in this process; the
+    TTL bounds how stale results can be after writes from other workers.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+            return None
+
+    def set(self, key: Hashable, value: Any):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._entries.clear()
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -2,7 +2,9 @@
 Template Code Auto-Generation Utility
 Generates template codes based on category, department, and sequential numbering
 """
+from datetime import datetime
 from sqlalchemy.orm import Session
+from app.core.sequences import next_sequence_value
 from app.models import Template
 import re
 
@@ -57,6 +59,23 @@ def get_department_code(department: str) -> str:
         return 'GEN'
 
 
+def _highest_template_sequence(db: Session, dept_code: str, category: str, is_form: bool) -> int:
+    """Highest NUM among existing SP-DEPT-NUM codes of a category (seeds the sequence)"""
+    codes = db.query(Template.template_code).filter(
+        Template.template_code.like(f"SP-{dept_code}-%"),
+        Template.category == category,
+        Template.is_deleted == False
+    )
+    # Forms: SP-DEPT-NUM-F##-##, others: SP-DEPT-NUM-##
+    code_pattern = rf'SP-{re.escape(dept_code)}-(\d+)-F(\d+)-(\d+)' if is_form else rf'SP-{re.escape(dept_code)}-(\d+)-(\d+)'
+    seq_numbers = [
+        int(match.group(1))
+        for (code,) in codes
+        if code and (match := re.match(code_pattern, code))
+    ]
+    return max(seq_numbers, default=0)
+
+
 def generate_template_code(
     db: Session,
     category: str,
@@ -72,6 +91,9 @@ def generate_template_code(
     - SOP/STP/Report/Annexure: SP-DEPT-NUM-##
       Example: SP-PKG-002-01
     
+    NUM is allocated from the number_sequences row for the department and
+    category, so concurrent creates never get the same code.
+    
     Args:
         db: Database session
         category: Template category (SOP, STP, Form, Report, Annexure)
@@ -86,65 +108,54 @@ def generate_template_code(
     # Determine if it's a Form
     is_form = category.upper() == 'FORM'
     
+    next_seq = next_sequence_value(
+        db,
+        f"template:SP-{dept_code}:{category}",
+        seed=lambda: _highest_template_sequence(db, dept_code, category, is_form),
+    )
+    
     if is_form:
-        # Format: SP-DEPT-NUM-F##-##
-        # Find the highest sequence number for this department and category
-        pattern = f"SP-{dept_code}-"
-        
-        existing_templates = db.query(Template).filter(
-            Template.template_code.like(f"{pattern}%"),
-            Template.category == category,
-            Template.is_deleted == False
-        ).order_by(Template.template_code.desc()).all()
-        
-        # Extract form numbers
-        form_numbers = []
-        for template in existing_templates:
-            if template.template_code:
-                # Pattern: SP-DEPT-NUM-F##-##
-                match = re.match(rf'SP-{dept_code}-(\d+)-F(\d+)-(\d+)', template.template_code)
-                if match:
-                    seq_num = int(match.group(1))
-                    form_numbers.append(seq_num)
-        
-        # Get next sequence number
-        if form_numbers:
-            next_seq = max(form_numbers) + 1
-        else:
-            next_seq = 1
-        
         # Format: SP-DEPT-NUM-F01-##
         form_num = '01'  # Default form number, can be incremented if needed
         return f"SP-{dept_code}-{next_seq:03d}-F{form_num}-{revision}"
-    else:
-        # Format: SP-DEPT-NUM-##
-        # Find the highest sequence number for this department and category
-        pattern = f"SP-{dept_code}-"
+    
+    # Format: SP-DEPT-NUM-##
+    return f"SP-{dept_code}-{next_seq:03d}-{revision}"
+
+
+def generate_builder_template_code(db: Session, category: str) -> str:
+    """
+    Placeholder code for a block-builder template
+    
+    Format: TEMPLATE-CATEGORY-YYYYMMDD for the first template of the day,
+    then TEMPLATE-CATEGORY-YYYYMMDD-001, -002, ...
+    
+    Args:
+        db: Database session
+        category: Template category
         
-        existing_templates = db.query(Template).filter(
-            Template.template_code.like(f"{pattern}%"),
-            Template.category == category,
+    Returns:
+        Unique template code
+    """
+    base_code = f"TEMPLATE-{category}-{datetime.now().strftime('%Y%m%d')}"
+    
+    def highest_existing() -> int:
+        # Codes issued before the sequence row existed: base is 1, base-NNN is NNN + 1
+        codes = [code for (code,) in db.query(Template.template_code).filter(
+            Template.template_code.like(f"{base_code}%"),
             Template.is_deleted == False
-        ).order_by(Template.template_code.desc()).all()
-        
-        # Extract sequence numbers
-        seq_numbers = []
-        for template in existing_templates:
-            if template.template_code:
-                # Pattern: SP-DEPT-NUM-##
-                match = re.match(rf'SP-{dept_code}-(\d+)-(\d+)', template.template_code)
-                if match:
-                    seq_num = int(match.group(1))
-                    seq_numbers.append(seq_num)
-        
-        # Get next sequence number
-        if seq_numbers:
-            next_seq = max(seq_numbers) + 1
-        else:
-            next_seq = 1
-        
-        # Format: SP-DEPT-NUM-##
-        return f"SP-{dept_code}-{next_seq:03d}-{revision}"
+        )]
+        suffixes = [
+            int(code[len(base_code) + 1:])
+            for code in codes
+            if code.startswith(base_code + "-") and code[len(base_code) + 1:].isdigit()
+        ]
+        if suffixes:
+            return max(suffixes) + 1
+        return 1 if base_code in codes else 0
+    
+    next_seq = next_sequence_value(db, f"template:{base_code}", seed=highest_existing)
+    return base_code if next_seq == 1 else f"{base_code}-{next_seq - 1:03d}"
 
 
 def validate_template_code_format(template_code: str, category: str) -> bool:
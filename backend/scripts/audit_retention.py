@@ -0,0 +1,40 @@
+"""
+Audit log retention job
+Archives audit months older than AUDIT_HOT_MONTHS and purges anything older
+than AUDIT_LOG_RETENTION_DAYS. Run daily (e.g. from cron):
+
+    python scripts/audit_retention.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal
+from app.core.audit_archive import run_retention
+
+
+def main():
+    db = SessionLocal()
+    try:
+        summary = run_retention(db)
+        
+        print("=" * 60)
+        print("Audit Log Retention")
+        print("=" * 60)
+        for archived in summary["archived"]:
+            print(f"✓ Archived {archived['period']}: {archived['rows']} rows")
+        for period in summary["purged"]:
+            print(f"✓ Purged archive {period}")
+        print(f"✓ Deleted {summary['deleted_rows']} rows past retention")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
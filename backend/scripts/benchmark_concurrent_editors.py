@@ -0,0 +1,150 @@
+"""
+Benchmark edit lock endpoints under concurrent editors
+
+Spins up the app in-process against a throwaway SQLite database, creates one
+document/version per editor and then has every editor hammer the lock
+heartbeat and lock status endpoints concurrently. Prints p50/p95/p99 latency
+so the numbers can be compared before and after changes to the database layer.
+
+Usage:
+    python scripts/benchmark_concurrent_editors.py --editors 50 --rounds 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_db_dir = tempfile.mkdtemp(prefix="dms-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("DEBUG", "false")
+
+import httpx
+
+from app.main import app
+from app.database import Base, engine, SessionLocal
+from app.core.security import get_password_hash
+from app.models import User, Role
+
+
+PASSWORD = "Bench@12345"
+
+
+def setup_database(editors: int):
+    """Create schema, an Author role and one author account per editor"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        role = Role(name="Author", description="Benchmark author")
+        db.add(role)
+        for i in range(editors):
+            user = User(
+                username=f"editor{i}",
+                email=f"editor{i}@bench.local",
+                hashed_password=get_password_hash(PASSWORD),
+                first_name="Editor",
+                last_name=str(i),
+                is_active=True,
+            )
+            user.roles.append(role)
+            db.add(user)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def prepare_editor(client: httpx.AsyncClient, index: int) -> dict:
+    """Log in, create a document + draft and acquire its edit lock"""
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"username": f"editor{index}", "password": PASSWORD}
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    
+    response = await client.post(
+        "/api/v1/documents", headers=headers, json={"title": f"Bench SOP {index}"}
+    )
+    response.raise_for_status()
+    document_id = response.json()["id"]
+    
+    response = await client.post(
+        f"/api/v1/documents/{document_id}/versions",
+        headers=headers,
+        json={"content_html": "<p>benchmark</p>"}
+    )
+    response.raise_for_status()
+    version_id = response.json()["id"]
+    
+    lock_url = f"/api/v1/documents/{document_id}/versions/{version_id}/lock"
+    response = await client.post(lock_url, headers=headers, json={"timeout_minutes": 30})
+    response.raise_for_status()
+    
+    return {
+        "headers": headers,
+        "lock_url": lock_url,
+        "lock_token": response.json()["lock_token"],
+    }
+
+
+async def run_editor(client: httpx.AsyncClient, editor: dict, rounds: int, samples: list):
+    """Alternate heartbeat and lock status calls, recording latency in ms"""
+    for _ in range(rounds):
+        start = time.perf_counter()
+        response = await client.post(
+            f"{editor['lock_url']}/heartbeat",
+            headers=editor["headers"],
+            json={"lock_token": editor["lock_token"], "extend_minutes": 30}
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        
+        start = time.perf_counter()
+        response = await client.get(editor["lock_url"], headers=editor["headers"])
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def main(editors: int, rounds: int):
+    setup_database(editors)
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        prepared = [await prepare_editor(client, i) for i in range(editors)]
+        
+        samples: list = []
+        started = time.perf_counter()
+        await asyncio.gather(*(run_editor(client, e, rounds, samples) for e in prepared))
+        elapsed = time.perf_counter() - started
+    
+    print("=" * 60)
+    print(f"Concurrent editors: {editors}   rounds: {rounds}")
+    print(f"Requests: {len(samples)} in {elapsed:.2f}s ({len(samples) / elapsed:.1f} req/s)")
+    print(f"p50: {statistics.median(samples):.1f} ms")
+    print(f"p95: {percentile(samples, 95):.1f} ms")
+    print(f"p99: {percentile(samples, 99):.1f} ms")
+    print(f"max: {max(samples):.1f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--editors", type=int, default=25)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+    
+    asyncio.run(main(args.editors, args.rounds))
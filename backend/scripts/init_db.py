@@ -117,6 +117,7 @@ def seed_admin_user(db: Session):
             "roles": ["DMS_Admin"]
         },
     )
+    db.commit()
     
     print(f"✓ Admin user created successfully")
     print(f"  Username: {settings.FIRST_ADMIN_USERNAME}")
@@ -0,0 +1,33 @@
+"""
+Rebuild the document full-text search index
+Re-extracts the text of every document's effective (or latest) version.
+Run once after migrating to 015_document_search, and whenever the index
+needs repairing:
+
+    python scripts/rebuild_search_index.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal
+from app.core.document_search import rebuild_search_index
+
+
+def main():
+    db = SessionLocal()
+    try:
+        indexed = rebuild_search_index(db)
+        print(f"✓ Indexed {indexed} documents")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Rebuild the dashboard stat counters
+Recounts documents and users into `stat_counters`. The API process does
+this every STATS_RECONCILE_INTERVAL_SECONDS; run it by hand (or from cron
+when the in-process job is disabled) to repair counters immediately:
+
+    python scripts/reconcile_stats.py
+"""
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.database import SessionLocal
+from app.core.stats import reconcile_stats
+
+
+def main():
+    db = SessionLocal()
+    try:
+        drift = reconcile_stats(db)
+        db.commit()
+        for (scope, key), (stored, exact) in sorted(drift.items()):
+            print(f"  {scope}/{key}: {stored} -> {exact}")
+        print(f"✓ Stat counters rebuilt ({len(drift)} corrected)")
+    except Exception as e:
+        print(f"\n❌ Error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -73,6 +73,7 @@ def test_audit_logs():
             user_agent="Test Script",
         )
         print(f"✓ Created log ID: {log3.id} - {log3.action}")
+        db.commit()
         
         print()
         print("=" * 60)
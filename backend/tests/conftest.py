@@ -4,10 +4,20 @@ Pytest configuration and fixtures
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.core.audit import reset_audit_lookup_cache
+from app.core.audit_writer import audit_writer
+from app.core.document_utils import document_count_cache
+from app.core.notification_outbox import outbox_dispatcher
+from app.core.principal_cache import principal_cache
+from app.core.recipient_directory import recipient_directory
+from app.core.session_registry import session_registry
+from app.core.task_inbox import task_inbox_cache
+from app.database import Base, get_db, get_async_db, get_async_database_url
 from app.models import User, Role, AuditLog
 from app.core.security import get_password_hash
 
@@ -22,11 +32,31 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on the same test database
+# NullPool: every TestClient runs its own event loop, so connections must not be reused
+async_engine = create_async_engine(
+    get_async_database_url(SQLALCHEMY_TEST_DATABASE_URL),
+    poolclass=NullPool,
+)
+
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test"""
     Base.metadata.create_all(bind=engine)
+    reset_audit_lookup_cache()
+    principal_cache.clear()
+    recipient_directory.invalidate()
+    session_registry.clear()
+    document_count_cache.clear()
+    task_inbox_cache.clear()
     db = TestingSessionLocal()
     
     # Seed roles
@@ -56,10 +86,25 @@ def client(db_session):
     def override_get_db():
         try:
             yield db_session
-        finally:
-            pass
+            db_session.commit()
+        except Exception:
+            db_session.rollback()
+            raise
+    
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            try:
+                yield db
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    # Buffered audit rows go to the test database too
+    audit_writer.session_factory = TestingSessionLocal
+    outbox_dispatcher.session_factory = TestingSessionLocal
     
     with TestClient(app) as test_client:
         yield test_client
@@ -0,0 +1,223 @@
+"""
+Tests for audit log archiving and retention
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.core import audit_archive
+from app.core.audit_archive import ArchiveIntegrityError, AuditLogFilters, archived_rows, run_retention
+from app.models import AuditLog, AuditLogArchive
+
+
+@pytest.fixture(scope="function")
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "AUDIT_HOT_MONTHS", 1)
+    return tmp_path
+
+
+@pytest.fixture(scope="function")
+def aged_rows(db_session):
+    """Two rows per month for the last four months"""
+    now = datetime.utcnow()
+    for month in range(4):
+        for i in range(2):
+            db_session.add(AuditLog(
+                username="seed",
+                action="DOCUMENT_VIEWED" if i else "USER_LOGIN",
+                entity_type="Document",
+                entity_id=month,
+                description=f"Month -{month} row {i}",
+                timestamp=now - timedelta(days=31 * month, minutes=i),
+            ))
+    db_session.commit()
+    return now
+
+
+def test_retention_archives_old_months(db_session, archive_dir, aged_rows):
+    """Test months outside the hot window move to read-only archive files"""
+    summary = run_retention(db_session, now=aged_rows)
+    
+    assert len(summary["archived"]) == 3
+    assert db_session.query(AuditLog).count() == 2
+    archives = db_session.query(AuditLogArchive).all()
+    assert sum(a.row_count for a in archives) == 6
+    for archive in archives:
+        path = archive_dir / archive.file_path.rsplit("/", 1)[-1]
+        assert path.exists()
+        assert not path.stat().st_mode & 0o222
+
+
+def test_retention_purges_expired_archives(db_session, archive_dir, aged_rows, monkeypatch):
+    """Test archives older than AUDIT_LOG_RETENTION_DAYS are purged"""
+    run_retention(db_session, now=aged_rows)
+    monkeypatch.setattr(settings, "AUDIT_LOG_RETENTION_DAYS", 45)
+    
+    summary = run_retention(db_session, now=aged_rows)
+    
+    assert len(summary["purged"]) >= 1
+    purged = db_session.query(AuditLogArchive).filter(AuditLogArchive.purged_at.isnot(None)).all()
+    assert all(not (archive_dir / a.file_path.rsplit("/", 1)[-1]).exists() for a in purged)
+
+
+def test_get_audit_logs_reads_across_tiers(client, admin_token, db_session, archive_dir, aged_rows):
+    """Test listing and filtering reach archived months on request"""
+    run_retention(db_session, now=aged_rows)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    
+    response = client.get(
+        "/api/v1/audit-logs",
+        headers=headers,
+        params={"entity_type": "Document", "page_size": 3, "include_archived": True}
+    )
+    data = response.json()
+    # Archived rows are counted from the manifest: exact here, but flagged
+    # as an estimate because the filter is not date-only
+    assert data["total"] == 8
+    assert data["total_is_estimate"] is True
+    
+    seen = list(data["logs"])
+    while data["next_cursor"]:
+        data = client.get(
+            "/api/v1/audit-logs",
+            headers=headers,
+            params={"entity_type": "Document", "page_size": 3, "include_archived": True, "cursor": data["next_cursor"]}
+        ).json()
+        seen.extend(data["logs"])
+    assert len({log["id"] for log in seen}) == 8
+    
+    response = client.get(
+        "/api/v1/audit-logs",
+        headers=headers,
+        params={"action": "USER_LOGIN", "entity_type": "Document", "page": 2, "page_size": 2, "include_archived": True}
+    )
+    data = response.json()
+    assert data["total"] == 7  # 1 hot row + every row of the 3 archived months
+    assert data["total_is_estimate"] is True
+    assert [log["entity_id"] for log in data["logs"]] == [2, 3]
+    
+    response = client.get(
+        "/api/v1/audit-logs",
+        headers=headers,
+        params={"start_date": (aged_rows - timedelta(days=365)).isoformat(), "include_archived": True}
+    )
+    data = response.json()
+    assert data["total"] == 8
+    assert data["total_is_estimate"] is False
+
+
+def test_get_audit_logs_leaves_archives_closed_by_default(client, admin_token, db_session, archive_dir, aged_rows, monkeypatch):
+    """Test archive files are not opened unless archived rows are requested"""
+    run_retention(db_session, now=aged_rows)
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("archive file opened")
+    monkeypatch.setattr(audit_archive.gzip, "open", fail)
+    
+    response = client.get(
+        "/api/v1/audit-logs",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"page_size": 100}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert len(data["logs"]) == 2
+    assert data["older_history_archived"] is True
+    assert data["next_cursor"] is None
+
+
+def test_archived_rows_open_only_reachable_archives(db_session, archive_dir, aged_rows, monkeypatch):
+    """Test skipped and newer-than-cursor archives are never decompressed"""
+    run_retention(db_session, now=aged_rows)
+    archives = db_session.query(AuditLogArchive).order_by(AuditLogArchive.period_start.desc()).all()
+    opened = []
+    real_open = audit_archive.gzip.open
+    
+    def recording_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return real_open(path, *args, **kwargs)
+    monkeypatch.setattr(audit_archive.gzip, "open", recording_open)
+    
+    rows = list(archived_rows(db_session, AuditLogFilters(), skip=3))
+    assert [row["entity_id"] for row in rows] == [2, 3, 3]
+    assert opened == [archives[1].file_path, archives[2].file_path]
+    
+    opened.clear()
+    before = (archives[2].period_end - timedelta(seconds=1), 0)
+    rows = list(archived_rows(db_session, AuditLogFilters(), before=before, skip=1))
+    assert [row["entity_id"] for row in rows] == [3]
+    assert opened == [archives[2].file_path]
+
+
+def test_document_timeline_skips_unrelated_archives(client, author_token, admin_token, db_session, archive_dir, monkeypatch):
+    """Test the timeline opens only archives whose entity ranges hold the document"""
+    from app.core.audit_writer import audit_writer
+    
+    document = client.post(
+        "/api/v1/documents",
+        headers={"Authorization": f"Bearer {author_token}"},
+        json={"title": "Archived SOP", "department": "QA"}
+    ).json()
+    audit_writer.flush()
+    now = datetime.utcnow()
+    for days, entity_id in ((62, document["id"]), (31, document["id"] + 100)):
+        db_session.add(AuditLog(
+            username="seed",
+            action="DOCUMENT_VIEWED",
+            entity_type="Document",
+            entity_id=entity_id,
+            description=f"Viewed {entity_id}",
+            timestamp=now - timedelta(days=days),
+        ))
+    db_session.commit()
+    run_retention(db_session, now=now)
+    
+    related = db_session.query(AuditLogArchive).filter(
+        AuditLogArchive.period_start <= now - timedelta(days=62)
+    ).order_by(AuditLogArchive.period_start.desc()).first()
+    assert related.entity_ranges == {"Document": [document["id"], document["id"]]}
+    
+    opened = []
+    real_open = audit_archive.gzip.open
+    
+    def recording_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return real_open(path, *args, **kwargs)
+    monkeypatch.setattr(audit_archive.gzip, "open", recording_open)
+    
+    url = f"/api/v1/audit-logs/documents/{document['id']}"
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    data = client.get(url, headers=headers).json()
+    assert data["older_history_archived"] is True
+    assert all(log["timestamp"] > related.period_end.isoformat() for log in data["logs"])
+    assert opened == []
+    
+    data = client.get(url, headers=headers, params={"include_archived": True}).json()
+    assert data["older_history_archived"] is False
+    assert data["logs"][-1]["description"] == f"Viewed {document['id']}"
+    assert opened == [related.file_path]
+
+
+def test_corrupted_archive_is_rejected(client, admin_token, db_session, archive_dir, aged_rows):
+    """Test an archive that no longer matches its manifest SHA-256 is never served"""
+    import os
+    run_retention(db_session, now=aged_rows)
+    archive = db_session.query(AuditLogArchive).order_by(AuditLogArchive.period_start.desc()).first()
+    os.chmod(archive.file_path, 0o644)
+    with open(archive.file_path, "r+b") as archive_file:
+        archive_file.truncate(os.path.getsize(archive.file_path) - 8)
+    
+    with pytest.raises(ArchiveIntegrityError):
+        list(archived_rows(db_session, AuditLogFilters()))
+    
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = client.get("/api/v1/audit-logs", headers=headers, params={"page": 2, "page_size": 2, "include_archived": True})
+    assert response.status_code == 500
+    assert "integrity" in response.json()["detail"]
+    response = client.get("/api/v1/audit-logs/export", headers=headers, params={"include_archived": True})
+    assert response.status_code == 500
+    # The hot tier alone is still served
+    assert client.get("/api/v1/audit-logs", headers=headers).status_code == 200
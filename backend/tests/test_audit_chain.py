@@ -0,0 +1,212 @@
+"""
+Tests for the tamper-evident audit hash chain
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.audit_archive import archive_month
+from app.core.audit_chain import seal_pending, verify_chain
+from app.models import AuditLog, AuditChainCheckpoint
+
+
+@pytest.fixture(scope="function")
+def sealed_rows(db_session, monkeypatch):
+    """25 sealed audit rows with a checkpoint every 10"""
+    monkeypatch.setattr(settings, "AUDIT_CHECKPOINT_INTERVAL", 10)
+    base = datetime(2026, 1, 1)
+    for i in range(25):
+        db_session.add(AuditLog(
+            username="seed",
+            action="DOCUMENT_VIEWED",
+            entity_type="Document",
+            entity_id=i,
+            description=f"Row {i}",
+            details={"n": i},
+            timestamp=base + timedelta(seconds=i),
+        ))
+    db_session.commit()
+    
+    assert seal_pending(db_session) == 25
+    db_session.commit()
+    db_session.expire_all()
+
+
+def test_verify_intact_chain(db_session, sealed_rows):
+    """Test a freshly sealed chain verifies with its checkpoints"""
+    report = verify_chain(db_session, full=True, workers=1, batch_size=7)
+    
+    assert report["ok"] is True
+    assert report["rows_verified"] == 25
+    assert report["checkpoints_verified"] == 2
+    assert report["rows_per_second"] > 0
+
+
+def test_verify_is_incremental(db_session, sealed_rows):
+    """Test verification resumes from the last good checkpoint"""
+    verify_chain(db_session, workers=1)
+    db_session.commit()
+    
+    report = verify_chain(db_session, workers=1)
+    
+    assert report["ok"] is True
+    assert report["started_from_seq"] == 20
+    assert report["rows_verified"] == 5
+
+
+def test_verify_with_process_pool(db_session, sealed_rows):
+    """Test batches verified across worker processes give the same result"""
+    report = verify_chain(db_session, full=True, workers=2, batch_size=4)
+    
+    assert report["ok"] is True
+    assert report["rows_verified"] == 25
+
+
+def test_verify_detects_modified_row(db_session, sealed_rows):
+    """Test editing a row's content breaks the chain at that row"""
+    db_session.execute(text("UPDATE audit_logs SET description = 'edited' WHERE chain_seq = 13"))
+    db_session.commit()
+    
+    report = verify_chain(db_session, full=True, workers=1, batch_size=7)
+    
+    assert report["ok"] is False
+    assert report["failure"]["chain_seq"] == 13
+
+
+def test_verify_detects_deleted_row(db_session, sealed_rows):
+    """Test removing a row from the middle of the chain is detected"""
+    db_session.execute(text("DELETE FROM audit_logs WHERE chain_seq = 7"))
+    db_session.commit()
+    
+    report = verify_chain(db_session, full=True, workers=1, batch_size=5)
+    
+    assert report["ok"] is False
+    assert report["failure"]["chain_seq"] in (7, 8)
+
+
+def test_verify_detects_forged_checkpoint(db_session, sealed_rows):
+    """Test a checkpoint whose signature does not match is rejected"""
+    checkpoint = db_session.query(AuditChainCheckpoint).filter(AuditChainCheckpoint.chain_seq == 10).first()
+    checkpoint.signature = "0" * 64
+    db_session.commit()
+    
+    report = verify_chain(db_session, full=True, workers=1)
+    
+    assert report["ok"] is False
+    assert report["failure"]["reason"] == "checkpoint signature invalid"
+
+
+def test_verify_endpoint(client, admin_token, db_session, sealed_rows):
+    """Test the admin verification endpoint reports the outcome"""
+    response = client.post(
+        "/api/v1/audit-logs/verify",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"full": True}
+    )
+    
+    assert response.status_code == 200
+    assert response.json()["ok"] is True
+
+
+def test_verify_detects_deleted_oldest_rows(db_session, sealed_rows):
+    """Test removing the start of the chain is not mistaken for archiving"""
+    db_session.execute(text("DELETE FROM audit_logs WHERE chain_seq <= 5"))
+    db_session.commit()
+    
+    report = verify_chain(db_session, full=True, workers=1, batch_size=7)
+    
+    assert report["ok"] is False
+    assert report["failure"] == {"chain_seq": 1, "reason": "missing rows"}
+
+
+def test_verify_detects_deleted_rows_after_checkpoint(db_session, sealed_rows):
+    """Test removing the rows right after the resume checkpoint is detected"""
+    verify_chain(db_session, workers=1)
+    db_session.commit()
+    db_session.add(AuditLog(username="seed", action="DOCUMENT_VIEWED", entity_type="Document", description="Late row"))
+    db_session.commit()
+    seal_pending(db_session)
+    db_session.execute(text("DELETE FROM audit_logs WHERE chain_seq BETWEEN 21 AND 25"))
+    db_session.commit()
+    
+    report = verify_chain(db_session, workers=1)
+    
+    assert report["ok"] is False
+    assert report["failure"] == {"chain_seq": 21, "reason": "missing rows"}
+
+
+def test_verify_anchors_after_archived_rows(db_session, sealed_rows, tmp_path, monkeypatch):
+    """Test the chain re-anchors only past rows the manifest shows as archived"""
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_DIR", str(tmp_path))
+    archive = archive_month(db_session, datetime(2026, 1, 1))
+    db_session.commit()
+    assert (archive.first_chain_seq, archive.last_chain_seq) == (1, 25)
+    for i in range(3):
+        db_session.add(AuditLog(username="seed", action="DOCUMENT_VIEWED", entity_type="Document", description=f"New row {i}"))
+    db_session.commit()
+    seal_pending(db_session)
+    db_session.commit()
+    
+    report = verify_chain(db_session, full=True, workers=1)
+    assert report["ok"] is True
+    assert report["anchored_at_seq"] == 26
+    assert report["rows_verified"] == 3
+    
+    db_session.execute(text("DELETE FROM audit_logs WHERE chain_seq = 26"))
+    db_session.commit()
+    report = verify_chain(db_session, full=True, workers=1)
+    assert report["ok"] is False
+    assert report["failure"] == {"chain_seq": 1, "reason": "missing rows"}
+
+
+def test_seal_continues_after_archived_rows(db_session, sealed_rows, tmp_path, monkeypatch):
+    """Test sealing resumes from the last archived link, not the last checkpoint"""
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_DIR", str(tmp_path))
+    archive = archive_month(db_session, datetime(2026, 1, 1))
+    db_session.commit()
+    assert db_session.query(AuditLog).count() == 0
+    
+    db_session.add(AuditLog(username="seed", action="DOCUMENT_VIEWED", entity_type="Document", description="New row"))
+    db_session.commit()
+    assert seal_pending(db_session) == 1
+    db_session.commit()
+    
+    row = db_session.query(AuditLog).one()
+    assert row.chain_seq == 26
+    assert row.prev_hash == archive.last_row_hash
+
+
+def test_verify_detects_deleted_newest_rows(db_session, sealed_rows):
+    """Test cutting the newest rows past a checkpoint is detected"""
+    db_session.execute(text("DELETE FROM audit_logs WHERE chain_seq >= 15"))
+    db_session.commit()
+    
+    report = verify_chain(db_session, full=True, workers=1, batch_size=7)
+    
+    assert report["ok"] is False
+    assert report["failure"] == {"chain_seq": 15, "reason": "rows missing after seq 14"}
+
+
+def test_verify_rejects_altered_archive(db_session, sealed_rows, tmp_path, monkeypatch):
+    """Test an archive edited after the fact fails verification instead of anchoring the chain"""
+    import gzip
+    import os
+    monkeypatch.setattr(settings, "AUDIT_ARCHIVE_DIR", str(tmp_path))
+    archive = archive_month(db_session, datetime(2026, 1, 1))
+    db_session.add(AuditLog(username="seed", action="DOCUMENT_VIEWED", entity_type="Document", description="New row"))
+    db_session.commit()
+    seal_pending(db_session)
+    db_session.commit()
+    
+    with gzip.open(archive.file_path, "rt", encoding="utf-8") as archive_file:
+        lines = archive_file.readlines()
+    os.chmod(archive.file_path, 0o644)
+    with gzip.open(archive.file_path, "wt", encoding="utf-8") as archive_file:
+        archive_file.writelines(lines[1:])
+    
+    report = verify_chain(db_session, full=True, workers=1)
+    
+    assert report["ok"] is False
+    assert "SHA-256" in report["failure"]["reason"]
@@ -0,0 +1,199 @@
+"""
+Tests for audit log endpoints
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import status
+
+from app.models import AuditLog
+
+
+@pytest.fixture(scope="function")
+def audit_rows(db_session):
+    """Create 7 audit rows, two of them sharing a timestamp"""
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    timestamps = [base + timedelta(minutes=i) for i in range(6)] + [base + timedelta(minutes=5)]
+    for i, ts in enumerate(timestamps):
+        db_session.add(AuditLog(
+            username="seed",
+            action="DOCUMENT_VIEWED",
+            entity_type="Document",
+            entity_id=i,
+            description=f"Row {i}",
+            timestamp=ts,
+        ))
+    db_session.commit()
+
+
+def test_page_mode_is_backward_compatible(client, admin_token, audit_rows):
+    """Test page/page_size still returns an exact total"""
+    response = client.get(
+        "/api/v1/audit-logs",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"page": 2, "page_size": 3, "entity_type": "Document"}
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] == 7
+    assert data["total_is_estimate"] is False
+    assert data["page"] == 2
+    assert len(data["logs"]) == 3
+    assert data["next_cursor"]
+
+
+def test_cursor_pagination_walks_all_rows(client, admin_token, audit_rows):
+    """Test following next_cursor visits every row once, newest first"""
+    seen = []
+    params = {"page_size": 2, "entity_type": "Document"}
+    
+    while True:
+        response = client.get(
+            "/api/v1/audit-logs",
+            headers={"Authorization": f"Bearer {admin_token}"},
+            params=params
+        )
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        if "cursor" in params:
+            assert data["page"] is None
+            assert data["total_is_estimate"] is True
+        seen.extend(data["logs"])
+        if not data["next_cursor"]:
+            break
+        params["cursor"] = data["next_cursor"]
+    
+    assert len(seen) == 7
+    assert len({log["id"] for log in seen}) == 7
+    keys = [(log["timestamp"], log["id"]) for log in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_invalid_cursor(client, admin_token):
+    """Test a malformed cursor is rejected"""
+    response = client.get(
+        "/api/v1/audit-logs",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"cursor": "not-a-cursor"}
+    )
+    
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_export_csv_gzip(client, admin_token, audit_rows):
+    """Test the CSV export streams every matching row, gzip-compressed"""
+    import csv
+    import gzip
+    import io
+    
+    response = client.get(
+        "/api/v1/audit-logs/export",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"entity_type": "Document"}
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/gzip"
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert len(rows) == 7
+    assert rows[0]["timestamp"] >= rows[-1]["timestamp"]
+
+
+def test_export_ndjson_with_filters(client, admin_token, audit_rows):
+    """Test the NDJSON export applies the same filters as the list endpoint and formats like CSV"""
+    import csv
+    import io
+    import json
+    
+    response = client.get(
+        "/api/v1/audit-logs/export",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={
+            "format": "ndjson",
+            "compress": False,
+            "entity_type": "Document",
+            "start_date": "2026-01-01T12:04:00",
+        }
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 3
+    assert {r["entity_id"] for r in records} == {4, 5, 6}
+    
+    # The same rows export identically in CSV
+    response = client.get(
+        "/api/v1/audit-logs/export",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"compress": False, "entity_type": "Document", "start_date": "2026-01-01T12:04:00"}
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["timestamp"] for row in rows] == [r["timestamp"] for r in records]
+    assert records[0]["timestamp"] == "2026-01-01T12:05:00"
+
+
+def test_available_actions_and_entity_types(client, admin_token, db_session):
+    """Test filter options come from the lookup tables AuditLogger maintains"""
+    from app.core.audit import AuditLogger
+    
+    for action, entity_type in [("DOCUMENT_VIEWED", "Document"), ("DOCUMENT_VIEWED", "Document"), ("ROLE_CHANGED", "Role")]:
+        AuditLogger.log(
+            db=db_session,
+            user_id=None,
+            username="seed",
+            action=action,
+            entity_type=entity_type,
+            entity_id=None,
+            description="seed",
+        )
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    
+    actions = client.get("/api/v1/audit-logs/actions", headers=headers).json()["actions"]
+    entity_types = client.get("/api/v1/audit-logs/entity-types", headers=headers).json()["entity_types"]
+    
+    assert actions.count("DOCUMENT_VIEWED") == 1
+    assert "ROLE_CHANGED" in actions
+    assert {"Document", "Role"} <= set(entity_types)
+
+
+def test_document_timeline(client, admin_token, author_token):
+    """Test a document's timeline merges document, version and comment events"""
+    from app.core.audit_writer import audit_writer
+    
+    author = {"Authorization": f"Bearer {author_token}"}
+    document = client.post("/api/v1/documents", headers=author, json={"title": "Timeline SOP", "department": "QA"}).json()
+    version = client.post(
+        f"/api/v1/documents/{document['id']}/versions",
+        headers=author,
+        json={"content_html": "<p>Draft</p>", "change_summary": "Initial"}
+    ).json()
+    client.post(
+        f"/api/v1/documents/{document['id']}/versions/{version['id']}/comments",
+        headers=author,
+        json={"comment_text": "Looks good"}
+    )
+    # An unrelated document must not show up
+    client.post("/api/v1/documents", headers=author, json={"title": "Other SOP", "department": "QA"})
+    audit_writer.flush()
+    
+    url = f"/api/v1/audit-logs/documents/{document['id']}"
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    records, cursor = [], None
+    while True:
+        response = client.get(url, headers=headers, params={"page_size": 1, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        records.extend(body["logs"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    
+    assert [r["entity_type"] for r in records] == ["DocumentComment", "DocumentVersion", "Document"]
+    assert records[-1]["entity_id"] == document["id"]
+    timestamps = [r["timestamp"] for r in records]
+    assert timestamps == sorted(timestamps, reverse=True)
+    
+    response = client.get("/api/v1/audit-logs/documents/999999", headers=headers)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
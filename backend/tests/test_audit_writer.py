@@ -0,0 +1,65 @@
+"""
+Tests for the buffered audit log writer
+"""
+import pytest
+
+from app.core import audit
+from app.core.audit import AuditLogger
+from app.core.audit_writer import AuditWriter
+from app.models import AuditLog
+from tests.conftest import TestingSessionLocal
+
+
+@pytest.fixture(scope="function")
+def writer(db_session, monkeypatch):
+    """Run a buffered writer against the test database"""
+    writer = AuditWriter(session_factory=TestingSessionLocal, flush_interval=60, batch_size=2)
+    monkeypatch.setattr(audit, "audit_writer", writer)
+    writer.start()
+    yield writer
+    writer.stop()
+
+
+def _log(db, action="DOCUMENT_VIEWED", **kwargs):
+    return AuditLogger.log(
+        db=db,
+        user_id=None,
+        username="tester",
+        action=action,
+        entity_type="Document",
+        entity_id=1,
+        description=f"{action} for test",
+        **kwargs
+    )
+
+
+def test_rows_are_written_after_commit(writer, db_session):
+    """Test buffered rows are queued on commit and inserted in batches"""
+    for _ in range(3):
+        _log(db_session)
+    
+    assert writer.pending == 0
+    db_session.commit()
+    
+    writer.stop()
+    assert db_session.query(AuditLog).count() == 3
+
+
+def test_rows_are_discarded_on_rollback(writer, db_session):
+    """Test buffered rows from a rolled back transaction are never written"""
+    _log(db_session)
+    db_session.rollback()
+    
+    writer.stop()
+    assert writer.pending == 0
+    assert db_session.query(AuditLog).count() == 0
+
+
+def test_esignature_actions_are_synchronous(writer, db_session):
+    """Test e-signature events bypass the buffer and join the transaction"""
+    entry = _log(db_session, action="VERSION_APPROVED")
+    _log(db_session, synchronous=True)
+    
+    assert entry.id is not None
+    assert db_session.query(AuditLog).count() == 2
+    assert writer.pending == 0
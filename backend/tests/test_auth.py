@@ -70,3 +70,175 @@ def test_get_current_user_invalid_token(client):
     assert response.status_code == status.HTTP_401_UNAUTHORIZED
 
 
+
+
+def test_login_commits_once(client, admin_user, db_session):
+    """Test login writes the session and audit row in a single commit"""
+    from app.models import AuditLog
+    from app.core.audit_writer import audit_writer
+    
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "testadmin", "password": "Admin@123"}
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["X-DB-Commits"] == "1"
+    audit_writer.flush()
+    assert db_session.query(AuditLog).filter(AuditLog.action == "USER_LOGIN").count() == 1
+
+
+def test_login_failed_is_audited(client, admin_user, db_session):
+    """Test failed logins are persisted even though the request errors out"""
+    from app.models import AuditLog
+    from app.core.audit_writer import audit_writer
+    
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "testadmin", "password": "WrongPassword"}
+    )
+    
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    audit_writer.flush()
+    db_session.expire_all()
+    assert db_session.query(AuditLog).filter(AuditLog.action == "LOGIN_FAILED").count() == 1
+
+
+def test_forced_login_revokes_previous_session(client, admin_user):
+    """Test a forced login ends the earlier session on its very next request"""
+    credentials = {"username": "testadmin", "password": "Admin@123"}
+    first = client.post("/api/v1/auth/login", json=credentials).json()["access_token"]
+    old_headers = {"Authorization": f"Bearer {first}"}
+    assert client.get("/api/v1/auth/me", headers=old_headers).status_code == status.HTTP_200_OK
+    ticket = client.post("/api/v1/auth/session-events/ticket", headers=old_headers).json()["ticket"]
+    
+    response = client.post("/api/v1/auth/login", json=credentials)
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json()["session_conflict"] is True
+    
+    second = client.post("/api/v1/auth/login", json={**credentials, "force_login": True}).json()["access_token"]
+    
+    assert client.get("/api/v1/auth/me", headers=old_headers).status_code == status.HTTP_401_UNAUTHORIZED
+    result = client.get("/api/v1/auth/validate-session", headers=old_headers).json()
+    assert result == {
+        "valid": False,
+        "reason": "Session invalidated",
+        "message": "Your session has been ended because you logged in from another device/tab."
+    }
+    
+    # The revoked session's event stream reports the revocation and closes
+    with client.stream("GET", "/api/v1/auth/session-events", params={"ticket": ticket}) as stream:
+        assert stream.headers["content-type"].startswith("text/event-stream")
+        body = "".join(stream.iter_text())
+    assert "event: session_revoked" in body
+    assert '"reason": "superseded"' in body
+    
+    new_headers = {"Authorization": f"Bearer {second}"}
+    assert client.get("/api/v1/auth/validate-session", headers=new_headers).json() == {"valid": True}
+    
+    # Access tokens do not open the stream, and tickets do not authenticate requests
+    response = client.get("/api/v1/auth/session-events", params={"ticket": second})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    ticket = client.post("/api/v1/auth/session-events/ticket", headers=new_headers).json()["ticket"]
+    response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {ticket}"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.post("/api/v1/auth/logout", headers=new_headers).status_code == status.HTTP_200_OK
+    assert client.get("/api/v1/auth/me", headers=new_headers).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_revocation_is_pushed_to_subscribers(db_session, admin_user):
+    """Test committed revocations reach session event subscribers"""
+    import asyncio
+    from app.core.session_registry import session_registry, create_session, revoke_user_sessions
+    
+    user_session = create_session(db_session, admin_user.id)
+    db_session.commit()
+    
+    async def wait_for_revocation():
+        queue = session_registry.subscribe(user_session.jti)
+        try:
+            revoke_user_sessions(db_session, admin_user.id, reason="logout")
+            assert queue.empty()  # Nothing is pushed before the commit
+            db_session.commit()
+            return await asyncio.wait_for(queue.get(), timeout=1)
+        finally:
+            session_registry.unsubscribe(user_session.jti, queue)
+    
+    assert asyncio.run(wait_for_revocation()) == "logout"
+    assert session_registry.check(db_session, user_session.jti).is_active is False
+
+
+def test_rbac_bitsets_match_capabilities():
+    """Test compiled permission bitsets agree with ROLE_CAPABILITIES"""
+    from app.core import rbac
+    
+    for role, capabilities in rbac.ROLE_CAPABILITIES.items():
+        mask = rbac.permission_mask([role.value])
+        for permission in rbac.PERMISSION_BITS:
+            assert rbac.mask_has_permission(mask, permission) == (permission in capabilities)
+    
+    combined = rbac.permission_mask(["Author", "Reviewer", "NotARole"])
+    assert rbac.mask_has_permission(combined, "document.submit")
+    assert rbac.mask_has_permission(combined, "document.comment")
+    assert not rbac.mask_has_permission(combined, "document.publish")
+    assert not rbac.mask_has_permission(combined, "no.such.permission")
+    assert rbac.mask_has_role(rbac.role_mask(["DMS_Admin"]), "DMS_Admin")
+    assert not rbac.mask_has_role(rbac.role_mask(["Author"]), "DMS_Admin")
+
+
+def test_token_carries_rbac_masks(client, author_user):
+    """Test login signs the role and permission masks into the token"""
+    from app.core import rbac
+    from app.core.security import decode_access_token
+    
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "testauthor", "password": "Author@123"}
+    )
+    payload = decode_access_token(response.json()["access_token"])
+    
+    assert payload["rbac"] == rbac.RBAC_VERSION
+    assert payload["perm"] == rbac.permission_mask(["Author"])
+    assert payload["rmask"] == rbac.role_mask(["Author"])
+
+
+def test_login_rehashes_outdated_password_hash(client, admin_user, db_session):
+    """Test a hash made with another cost setting is upgraded on login"""
+    from passlib.hash import pbkdf2_sha256
+    from app.core.security import pwd_context
+    
+    admin_user.hashed_password = pbkdf2_sha256.using(rounds=1000).hash("Admin@123")
+    db_session.commit()
+    
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "testadmin", "password": "Admin@123"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    db_session.refresh(admin_user)
+    assert "$1000$" not in admin_user.hashed_password
+    assert pwd_context.verify_and_update("Admin@123", admin_user.hashed_password) == (True, None)
+
+
+def test_password_pool_sheds_excess_load():
+    """Test the password pool rejects work beyond its queue instead of blocking"""
+    import threading
+    from app.core.security import PasswordHashPool, PasswordPoolBusy
+    
+    pool = PasswordHashPool(workers=1, max_queued=0)
+    started, release = threading.Event(), threading.Event()
+    worker = threading.Thread(target=pool.run, args=(lambda: started.set() or release.wait(),))
+    worker.start()
+    try:
+        assert started.wait(timeout=5)
+        with pytest.raises(PasswordPoolBusy):
+            pool.run(lambda: None)
+    finally:
+        release.set()
+        worker.join()
+    
+    assert pool.run(lambda: 42) == 42
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
@@ -0,0 +1,726 @@
+"""
+Tests for document, edit lock and comment endpoints
+"""
+import pytest
+from fastapi import status
+
+
+def _auth(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="function")
+def document(client, author_token):
+    """Create a document owned by the test author"""
+    response = client.post(
+        "/api/v1/documents",
+        headers=_auth(author_token),
+        json={"title": "Cleaning SOP", "department": "QA"}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+@pytest.fixture(scope="function")
+def draft_version(client, author_token, document):
+    """Create a draft version on the test document"""
+    response = client.post(
+        f"/api/v1/documents/{document['id']}/versions",
+        headers=_auth(author_token),
+        json={"content_html": "<p>Step 1</p>", "change_summary": "Initial draft"}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+def test_create_document(document):
+    """Test creating a document generates a number and owner info"""
+    assert document["document_number"].startswith("SOP-QA-")
+    assert document["owner_username"] == "testauthor"
+    assert document["version_count"] == 0
+
+
+def test_create_document_non_author(client, admin_user, db_session):
+    """Test that users without Author/Admin role cannot create documents"""
+    from app.models import User, Role
+    from app.core.security import get_password_hash
+    
+    reviewer_role = db_session.query(Role).filter(Role.name == "Reviewer").first()
+    reviewer = User(
+        username="testreviewer",
+        email="testreviewer@test.com",
+        hashed_password=get_password_hash("Reviewer@123"),
+        first_name="Test",
+        last_name="Reviewer",
+        is_active=True,
+    )
+    reviewer.roles.append(reviewer_role)
+    db_session.add(reviewer)
+    db_session.commit()
+    
+    token = client.post(
+        "/api/v1/auth/login",
+        json={"username": "testreviewer", "password": "Reviewer@123"}
+    ).json()["access_token"]
+    
+    response = client.post(
+        "/api/v1/documents",
+        headers=_auth(token),
+        json={"title": "Not allowed"}
+    )
+    
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_list_and_get_document(client, author_token, document, draft_version):
+    """Test listing documents and fetching details with versions"""
+    response = client.get(
+        "/api/v1/documents",
+        headers=_auth(author_token),
+        params={"show_all_statuses": True}
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] == 1
+    assert data["items"][0]["version_count"] == 1
+    
+    response = client.get(f"/api/v1/documents/{document['id']}", headers=_auth(author_token))
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert [v["id"] for v in response.json()["versions"]] == [draft_version["id"]]
+
+
+def test_update_document(client, author_token, document):
+    """Test updating document metadata"""
+    response = client.patch(
+        f"/api/v1/documents/{document['id']}",
+        headers=_auth(author_token),
+        json={"title": "Cleaning SOP (rev)"}
+    )
+    
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["title"] == "Cleaning SOP (rev)"
+
+
+def test_lock_acquire_heartbeat_release(client, author_token, document, draft_version):
+    """Test the edit lock lifecycle"""
+    base = f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/lock"
+    
+    response = client.post(base, headers=_auth(author_token), json={"timeout_minutes": 5})
+    assert response.status_code == status.HTTP_200_OK
+    lock = response.json()
+    assert lock["username"] == "testauthor"
+    
+    response = client.post(
+        f"{base}/heartbeat",
+        headers=_auth(author_token),
+        json={"lock_token": lock["lock_token"], "extend_minutes": 10}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    response = client.get(base, headers=_auth(author_token))
+    assert response.json()["is_locked"] is True
+    
+    response = client.request(
+        "DELETE", base, headers=_auth(author_token), json={"lock_token": lock["lock_token"]}
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    
+    response = client.get(base, headers=_auth(author_token))
+    assert response.json()["is_locked"] is False
+
+
+def test_comment_lifecycle(client, author_token, document, draft_version):
+    """Test creating, resolving and listing comments"""
+    base = f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/comments"
+    
+    response = client.post(base, headers=_auth(author_token), json={"comment_text": "Check step 1"})
+    assert response.status_code == status.HTTP_200_OK
+    comment = response.json()
+    assert comment["user_name"] == "testauthor"
+    assert comment["is_resolved"] is False
+    
+    response = client.patch(
+        f"{base}/{comment['id']}",
+        headers=_auth(author_token),
+        json={"is_resolved": True}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["resolved_by_name"] == "testauthor"
+    
+    response = client.get(base, headers=_auth(author_token))
+    assert response.json()["total"] == 0
+    
+    response = client.get(base, headers=_auth(author_token), params={"include_resolved": True})
+    assert response.json()["total"] == 1
+
+
+def test_version_summary_is_denormalized(client, author_token, document, draft_version, monkeypatch):
+    """Test version count and latest status come from documents, without loading versions"""
+    from app.config import settings
+    from tests.conftest import async_engine
+    from sqlalchemy import event
+    
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", False)
+    response = client.post(
+        f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/submit",
+        headers=_auth(author_token),
+        json={"password": "Author@123"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get(
+            "/api/v1/documents",
+            headers=_auth(author_token),
+            params={"status": "UNDER_REVIEW"}
+        )
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    
+    assert response.status_code == status.HTTP_200_OK
+    [item] = response.json()["items"]
+    assert item["version_count"] == 1
+    assert item["latest_version_id"] == draft_version["id"]
+    assert item["latest_version_status"] == "UNDER_REVIEW"
+    assert not any("document_versions" in statement for statement in statements)
+
+
+def test_esignature_checks_stored_password(client, author_token, author_user, document, draft_version, db_session, monkeypatch):
+    """Test a password changed by another worker stops signing while the principal is still cached"""
+    from app.config import settings
+    from app.core.principal_cache import principal_cache
+    from app.core.security import get_password_hash
+    
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", False)
+    assert client.get("/api/v1/auth/me", headers=_auth(author_token)).status_code == status.HTTP_200_OK
+    assert "hashed_password" not in principal_cache._entries[author_user.id][1].user.__dict__
+    
+    # Changed without invalidating this process's cache
+    author_user.hashed_password = get_password_hash("Changed@123")
+    db_session.commit()
+    
+    url = f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/submit"
+    response = client.post(url, headers=_auth(author_token), json={"password": "Author@123"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    response = client.post(url, headers=_auth(author_token), json={"password": "Changed@123"})
+    assert response.status_code == status.HTTP_200_OK
+    
+    response = client.get("/api/v1/documents", headers=_auth(author_token), params={"status": "DRAFT"})
+    assert response.json()["items"] == []
+
+
+def test_list_endpoints_do_not_load_version_content(client, author_token, document):
+    """Test version lists load a few hundred bytes per row, not the deferred content"""
+    from app.models import DocumentVersion
+    from sqlalchemy import event
+    
+    body = "<p>" + "x" * 200_000 + "</p>"
+    response = client.post(
+        f"/api/v1/documents/{document['id']}/versions",
+        headers=_auth(author_token),
+        json={"content_html": body, "change_summary": "Large draft"}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    version_id = response.json()["id"]
+    
+    loaded = []
+    
+    def record(target, context):
+        loaded.append(sum(len(str(value)) for key, value in target.__dict__.items() if not key.startswith("_")))
+    
+    event.listen(DocumentVersion, "load", record)
+    try:
+        for path in (
+            "/api/v1/documents",
+            f"/api/v1/documents/{document['id']}",
+            f"/api/v1/documents/{document['id']}/versions",
+            f"/api/v1/documents/{document['id']}/versions/history",
+        ):
+            loaded.clear()
+            response = client.get(path, headers=_auth(author_token))
+            assert response.status_code == status.HTTP_200_OK
+            assert sum(loaded) < 2_000, f"{path} loaded {sum(loaded)} bytes of versions"
+        
+        loaded.clear()
+        response = client.get(f"/api/v1/documents/{document['id']}/versions/{version_id}", headers=_auth(author_token))
+        assert response.json()["content_html"] == body
+        assert sum(loaded) > len(body)
+    finally:
+        event.remove(DocumentVersion, "load", record)
+
+
+def test_full_text_search(client, author_token, document, draft_version):
+    """Test ranked search over metadata and version content, with snippets and keyset paging"""
+    for title in ("Gowning procedure", "Gowning <b>room</b> layout"):
+        created = client.post(
+            "/api/v1/documents",
+            headers=_auth(author_token),
+            json={"title": title, "department": "QA", "tags": ["cleanroom"]}
+        ).json()
+        client.post(
+            f"/api/v1/documents/{created['id']}/versions",
+            headers=_auth(author_token),
+            json={"content_html": "<p>Wear sterile gloves before entering.</p>"}
+        )
+    
+    client.post(
+        f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/save",
+        headers=_auth(author_token),
+        json={"content_html": "<h1>Scope</h1><p>Sanitize the <em>isolator</em> weekly.</p>", "is_autosave": False}
+    )
+    
+    response = client.get("/api/v1/documents/search", headers=_auth(author_token), params={"q": "isolat"})
+    assert response.status_code == status.HTTP_200_OK
+    [hit] = response.json()["items"]
+    assert hit["id"] == document["id"]
+    assert "<mark>isolator</mark>" in hit["snippet"]
+    
+    response = client.get(
+        "/api/v1/documents/search", headers=_auth(author_token), params={"q": document["document_number"]}
+    )
+    assert [h["id"] for h in response.json()["items"]] == [document["id"]]
+    
+    # Titles are escaped; only the highlight markup is HTML
+    response = client.get(
+        "/api/v1/documents/search", headers=_auth(author_token), params={"q": "gowning gloves", "page_size": 1}
+    )
+    first = response.json()
+    assert len(first["items"]) == 1 and first["next_cursor"]
+    response = client.get(
+        "/api/v1/documents/search",
+        headers=_auth(author_token),
+        params={"q": "gowning gloves", "page_size": 1, "cursor": first["next_cursor"]}
+    )
+    second = response.json()
+    assert len(second["items"]) == 1 and second["next_cursor"] is None
+    assert {first["items"][0]["id"], second["items"][0]["id"]} != {document["id"]}
+    highlights = {first["items"][0]["title_highlight"], second["items"][0]["title_highlight"]}
+    assert "<mark>Gowning</mark> &lt;b&gt;room&lt;/b&gt; layout" in highlights
+    
+    response = client.get("/api/v1/documents/search", headers=_auth(author_token), params={"q": "weekly", "department": "HR"})
+    assert response.json()["items"] == []
+    response = client.get("/api/v1/documents/search", headers=_auth(author_token), params={"q": "x", "cursor": "bogus"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_draft_saves_keep_effective_search_body(client, author_token, document, draft_version, db_session, monkeypatch):
+    """Test autosaving a draft over an effective version does not rebuild the indexed body"""
+    from app.core import document_search
+    from app.models import DocumentSearchEntry, DocumentVersion, VersionStatus
+    
+    effective = db_session.get(DocumentVersion, draft_version["id"])
+    effective.status = VersionStatus.EFFECTIVE
+    db_session.commit()
+    response = client.post(
+        f"/api/v1/documents/{document['id']}/versions",
+        headers=_auth(author_token),
+        json={"content_html": "<p>Step 2</p>", "change_summary": "Next draft"}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    draft = response.json()
+    
+    rebuilds = []
+    real_strip = document_search.strip_content
+    monkeypatch.setattr(document_search, "strip_content", lambda content: rebuilds.append(content) or real_strip(content))
+    for i in range(3):
+        response = client.post(
+            f"/api/v1/documents/{document['id']}/versions/{draft['id']}/save",
+            headers=_auth(author_token),
+            json={"content_html": f"<p>Step 2 rev {i}</p>", "is_autosave": True}
+        )
+        assert response.status_code == status.HTTP_200_OK
+    
+    assert rebuilds == []
+    db_session.expire_all()
+    entry = db_session.get(DocumentSearchEntry, document["id"])
+    assert entry.version_id == draft_version["id"]
+    assert entry.body == "Step 1"
+
+def test_list_documents_keyset_pagination(client, author_token):
+    """Test cursor paging on (updated_at, id) and cached/estimated totals"""
+    created = [
+        client.post(
+            "/api/v1/documents",
+            headers=_auth(author_token),
+            json={"title": f"Batch record {i}", "department": "QA"}
+        ).json()["id"]
+        for i in range(5)
+    ]
+    params = {"show_all_statuses": True, "page_size": 2}
+    
+    first = client.get("/api/v1/documents", headers=_auth(author_token), params=params).json()
+    assert first["total"] == 5 and not first["total_is_estimate"]
+    
+    seen = [item["id"] for item in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(
+            "/api/v1/documents", headers=_auth(author_token), params={**params, "cursor": cursor}
+        ).json()
+        assert page["page"] is None and page["total_is_estimate"]
+        seen += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+    assert seen == sorted(created, reverse=True)
+    
+    # A committed document change invalidates the cached exact total
+    client.post("/api/v1/documents", headers=_auth(author_token), json={"title": "Batch record 5"})
+    response = client.get("/api/v1/documents", headers=_auth(author_token), params=params)
+    assert response.json()["total"] == 6
+    
+    response = client.get(
+        "/api/v1/documents", headers=_auth(author_token), params={**params, "include_total": False, "title": "record 1"}
+    )
+    assert response.json()["total"] == 1 and response.json()["total_is_estimate"]
+    
+    response = client.get("/api/v1/documents", headers=_auth(author_token), params={**params, "cursor": "bogus"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_document_numbers_unique_under_concurrency(db_session, author_user):
+    """Test hundreds of parallel creates get distinct, consecutive numbers from the sequence"""
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime
+    from app.core.document_utils import generate_document_number
+    from app.models import Document
+    from tests.conftest import TestingSessionLocal
+    
+    # A number issued before the sequence existed seeds it
+    prefix = f"SOP-QA-{datetime.utcnow():%Y%m%d}-"
+    db_session.add(Document(
+        document_number=f"{prefix}0007", title="Legacy", owner_id=author_user.id, created_by_id=author_user.id
+    ))
+    db_session.commit()
+    
+    def create(i):
+        db = TestingSessionLocal()
+        try:
+            number = generate_document_number(db, prefix="SOP", department="QA")
+            db.add(Document(
+                document_number=number, title=f"Parallel {i}", owner_id=author_user.id, created_by_id=author_user.id
+            ))
+            db.commit()
+            return number
+        finally:
+            db.close()
+    
+    # Stay within the test engine's pool (5 + 10 overflow), which the fixture
+    # session and the background workers also draw from
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        numbers = list(pool.map(create, range(200)))
+    
+    assert sorted(numbers) == [f"{prefix}{n:04d}" for n in range(8, 208)]
+
+
+def test_my_tasks_inbox(client, author_token, admin_token, document, draft_version, monkeypatch):
+    """Test /me/tasks computes actionable versions per role in one query, cached until a change"""
+    from app.config import settings
+    from tests.conftest import async_engine
+    from sqlalchemy import event
+    
+    response = client.get("/api/v1/me/tasks", headers=_auth(author_token))
+    assert response.status_code == status.HTTP_200_OK
+    [task] = response.json()["items"]
+    assert task["version_id"] == draft_version["id"]
+    assert task["task_type"] == "Draft - Continue Editing"
+    assert task["priority"] == "low"
+    assert response.json()["counts"] == {"all": 1, "high": 0, "medium": 0, "low": 1}
+    
+    # A cached page is served without touching the database
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/api/v1/me/tasks", headers=_auth(author_token))
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert response.json()["items"][0]["version_id"] == draft_version["id"]
+    assert not any("document_versions" in statement for statement in statements)
+    
+    # An unresolved comment invalidates the cache and raises the priority
+    client.post(
+        f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/comments",
+        headers=_auth(admin_token),
+        json={"comment_text": "Fix step 1"}
+    )
+    [task] = client.get("/api/v1/me/tasks", headers=_auth(author_token)).json()["items"]
+    assert task["task_type"] == "Draft - Address Comments"
+    assert task["priority"] == "high"
+    assert task["unresolved_comments"] == 1
+    
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", False)
+    response = client.post(
+        f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/submit",
+        headers=_auth(author_token),
+        json={"password": "Author@123"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    assert client.get("/api/v1/me/tasks", headers=_auth(author_token)).json()["items"] == []
+    response = client.get("/api/v1/me/tasks", headers=_auth(admin_token), params={"priority": "high"})
+    [task] = response.json()["items"]
+    assert task["task_type"] == "Review Required"
+    assert response.json()["next_cursor"] is None
+    
+    response = client.get("/api/v1/me/tasks", headers=_auth(admin_token), params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_stats_counters_follow_transitions(client, author_token, admin_token, document, draft_version, db_session, monkeypatch):
+    """Test /stats serves counters updated in each transaction, and reconciliation repairs drift"""
+    from app.config import settings
+    from app.core.stats import count_stats, reconcile_stats
+    from app.models import StatCounter
+    from tests.conftest import async_engine
+    from sqlalchemy import event
+    
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", False)
+    client.post(
+        f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/submit",
+        headers=_auth(author_token),
+        json={"password": "Author@123"}
+    )
+    second = client.post("/api/v1/documents", headers=_auth(author_token), json={"title": "Second SOP", "department": "QC"}).json()
+    
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/api/v1/stats", headers=_auth(admin_token))
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    
+    assert response.status_code == status.HTTP_200_OK
+    stats = response.json()
+    assert stats["documents"]["total"] == 2
+    assert stats["documents"]["by_department"] == {"QA": 1, "QC": 1}
+    assert stats["documents"]["by_version_status"] == {"UNDER_REVIEW": 1}
+    assert stats["users"] == {"total": 2, "active": 2}
+    assert not any("FROM documents" in statement for statement in statements)
+    
+    assert client.get("/api/v1/stats", headers=_auth(author_token)).json()["users"] is None
+    
+    response = client.delete(f"/api/v1/documents/{second['id']}", headers=_auth(admin_token))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    stats = client.get("/api/v1/stats", headers=_auth(admin_token)).json()
+    assert stats["documents"]["total"] == 1
+    assert stats["documents"]["by_department"] == {"QA": 1}
+    
+    db_session.expire_all()
+    counters = {(row.scope, row.key): row.value for row in db_session.query(StatCounter) if row.value}
+    assert counters == count_stats(db_session)
+    
+    db_session.query(StatCounter).filter(StatCounter.scope == "documents").update({"value": 99})
+    assert reconcile_stats(db_session) == {("documents", "total"): (99, 1)}
+    db_session.commit()
+    assert client.get("/api/v1/stats", headers=_auth(admin_token)).json()["documents"]["total"] == 1
+
+
+def test_workflow_notifications_go_through_outbox(client, author_token, document, draft_version, db_session, monkeypatch):
+    """Test a transition only queues an outbox event, delivered later per recipient with retries"""
+    import asyncio
+    from app.config import settings
+    from app.core.notification_outbox import outbox_dispatcher
+    from app.core.security import get_password_hash
+    from app.models import NotificationLog, NotificationOutbox, OutboxStatus, Role, User
+    
+    outbox_dispatcher.stop()  # Rounds are run by hand below
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", True)
+    monkeypatch.setattr(outbox_dispatcher, "retry_base", 0)
+    
+    reviewer = User(
+        username="testreviewer",
+        email="testreviewer@test.com",
+        hashed_password=get_password_hash("Reviewer@123"),
+        first_name="Test",
+        last_name="Reviewer",
+        is_active=True,
+    )
+    reviewer.roles.append(db_session.query(Role).filter(Role.name == "Reviewer").first())
+    db_session.add(reviewer)
+    db_session.commit()
+    
+    sent = []
+    
+    async def sender(to, subject, html_body):
+        if not sent:
+            sent.append(None)
+            raise ConnectionError("SMTP unavailable")
+        sent.append((to, subject))
+    
+    monkeypatch.setattr(outbox_dispatcher, "sender", sender)
+    
+    response = client.post(
+        f"/api/v1/documents/{document['id']}/versions/{draft_version['id']}/submit",
+        headers=_auth(author_token),
+        json={"password": "Author@123"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    [event] = db_session.query(NotificationOutbox).all()
+    assert (event.event_type, event.recipient_email, event.status) == ("REVIEW_ASSIGNED", None, OutboxStatus.PENDING.value)
+    
+    # Round 1 expands the event, round 2 fails the send, round 3 retries it
+    for _ in range(3):
+        asyncio.run(outbox_dispatcher.run_once())
+    
+    db_session.expire_all()
+    [event, delivery] = db_session.query(NotificationOutbox).order_by(NotificationOutbox.id).all()
+    assert event.status == OutboxStatus.FANNED_OUT.value
+    assert (delivery.event_id, delivery.recipient_email) == (event.id, "testreviewer@test.com")
+    assert (delivery.status, delivery.attempts) == (OutboxStatus.SENT.value, 2)
+    assert sent[1] == (["testreviewer@test.com"], f"New Document Pending for Review: {document['document_number']}")
+    [log] = db_session.query(NotificationLog).all()
+    assert (log.recipient_user_id, log.status.value) == (reviewer.id, "SENT")
+    assert log.body_html is None
+    assert "Dear Test Reviewer," in log.rendered_html
+
+
+def test_fan_out_renders_once_and_logs_in_bulk(client, author_user, admin_user, document, db_session, monkeypatch):
+    """Test an organization-wide event opted into BCC stores one body, goes out as BCC batches and logs every recipient"""
+    import asyncio
+    from app.config import settings
+    from app.core.email_templates import RECIPIENT_NAME
+    from app.core.notification_dispatcher import notify_document_effective
+    from app.core.notification_outbox import outbox_dispatcher
+    from app.models import Document, DocumentVersion, NotificationContent, NotificationLog, User
+    
+    outbox_dispatcher.stop()
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", True)
+    monkeypatch.setattr(outbox_dispatcher, "digest_events", set())  # Send right away
+    monkeypatch.setattr(outbox_dispatcher, "bcc_events", {"DOCUMENT_EFFECTIVE"})
+    monkeypatch.setattr(outbox_dispatcher, "bcc_batch_size", 20)
+    for i in range(30):
+        db_session.add(User(username=f"reader{i}", email=f"reader{i}@test.com", hashed_password="x", first_name="Reader", last_name=str(i), is_active=True))
+    db_session.add(User(username="inactive", email="inactive@test.com", hashed_password="x", first_name="Gone", last_name="User", is_active=False))
+    version = DocumentVersion(document_id=document["id"], version_number=1, content_html="<p>Step 1</p>", created_by_id=author_user.id)
+    db_session.add(version)
+    db_session.flush()
+    notify_document_effective(db_session, db_session.get(Document, document["id"]), version)
+    db_session.commit()
+    
+    sent = {}
+    messages = []
+    
+    async def sender(to, subject, html_body, bcc=None):
+        messages.append((to, len(bcc or [])))
+        for email in to + (bcc or []):
+            sent[email] = html_body
+    
+    monkeypatch.setattr(outbox_dispatcher, "sender", sender)
+    asyncio.run(outbox_dispatcher.run_once())  # Fan out
+    asyncio.run(outbox_dispatcher.run_once())  # Send
+    
+    db_session.expire_all()
+    [content] = db_session.query(NotificationContent).all()
+    assert content.body_html.count(RECIPIENT_NAME) == 1
+    assert len(sent) == 32  # 30 readers, author and admin
+    assert sorted(messages) == [([], 12), ([], 20)]
+    assert "Dear Colleague," in sent["reader7@test.com"]
+    assert "inactive@test.com" not in sent
+    logs = db_session.query(NotificationLog).all()
+    assert len(logs) == 32
+    assert {log.content_hash for log in logs} == {content.hash}
+    assert all(log.rendered_html == sent[log.recipient_email] for log in logs)
+    assert {log.recipient_name for log in logs} == {"Colleague"}
+
+
+def test_default_notification_config_keeps_recipient_names(client, author_user, admin_user, document, db_session, monkeypatch):
+    """Test the shipped settings send no event type by BCC and greet every digest recipient by name"""
+    import asyncio
+    from pydantic import ValidationError
+    from app.config import Settings, settings
+    from app.core.notification_dispatcher import notify_document_effective, notify_version_obsoleted
+    from app.core.notification_outbox import OutboxDispatcher, outbox_dispatcher
+    from app.models import Document, DocumentVersion
+    from tests.conftest import TestingSessionLocal
+    
+    assert Settings().NOTIFICATION_BCC_EVENTS == []
+    with pytest.raises(ValidationError):
+        Settings(NOTIFICATION_BCC_EVENTS="DOCUMENT_EFFECTIVE", NOTIFICATION_DIGEST_EVENTS="DOCUMENT_EFFECTIVE")
+    with pytest.raises(ValueError):
+        OutboxDispatcher(bcc_events={"VERSION_OBSOLETED"})
+    
+    outbox_dispatcher.stop()
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", True)
+    doc = db_session.get(Document, document["id"])
+    old = DocumentVersion(document_id=doc.id, version_number=1, content_html="<p>Old</p>", created_by_id=author_user.id)
+    new = DocumentVersion(document_id=doc.id, version_number=2, content_html="<p>New</p>", created_by_id=author_user.id)
+    db_session.add_all([old, new])
+    db_session.flush()
+    notify_document_effective(db_session, doc, new)
+    notify_version_obsoleted(db_session, doc, old, new)
+    db_session.commit()
+    
+    messages = []
+    
+    async def sender(to, subject, html_body, bcc=None):
+        messages.append((to, bcc, html_body))
+    
+    # Shipped defaults; only the digest delay is shortened
+    dispatcher = OutboxDispatcher(session_factory=TestingSessionLocal, sender=sender, digest_interval=0)
+    for _ in range(3):  # Fan out, fold and send, nothing left
+        asyncio.run(dispatcher.run_once())
+    
+    assert sorted(to for to, _, _ in messages) == [["testadmin@test.com"], ["testauthor@test.com"]]
+    assert all(not bcc for _, bcc, _ in messages)
+    bodies = {to[0]: body for to, _, body in messages}
+    assert "Dear Test Admin," in bodies["testadmin@test.com"]
+    assert "Dear Test Author," in bodies["testauthor@test.com"]
+
+
+def test_digest_events_are_sent_together(client, author_user, admin_user, document, db_session, monkeypatch):
+    """Test digest event types reach each user as one message while rejections go out immediately"""
+    import asyncio
+    from app.config import settings
+    from app.core.notification_dispatcher import notify_document_effective, notify_review_rejected, notify_version_obsoleted
+    from app.core.notification_outbox import outbox_dispatcher
+    from app.models import Document, DocumentVersion, NotificationLog, NotificationOutbox, OutboxStatus
+    
+    outbox_dispatcher.stop()
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", True)
+    monkeypatch.setattr(outbox_dispatcher, "digest_events", {"DOCUMENT_EFFECTIVE", "VERSION_OBSOLETED"})
+    monkeypatch.setattr(outbox_dispatcher, "digest_interval", 0)
+    doc = db_session.get(Document, document["id"])
+    old = DocumentVersion(document_id=doc.id, version_number=1, content_html="<p>Old</p>", created_by_id=author_user.id)
+    new = DocumentVersion(document_id=doc.id, version_number=2, content_html="<p>New</p>", created_by_id=author_user.id)
+    db_session.add_all([old, new])
+    db_session.flush()
+    notify_document_effective(db_session, doc, new)
+    notify_version_obsoleted(db_session, doc, old, new)
+    notify_review_rejected(db_session, doc, new, admin_user, rejection_reason="Typos")
+    db_session.commit()
+    
+    sent = []
+    
+    async def sender(to, subject, html_body, bcc=None):
+        sent.append((sorted(to + (bcc or [])), subject, html_body))
+    
+    monkeypatch.setattr(outbox_dispatcher, "sender", sender)
+    for _ in range(3):  # Fan out, fold and send, nothing left
+        asyncio.run(outbox_dispatcher.run_once())
+    
+    digest_subject = "Document Updates Digest: 2 update(s)"
+    assert sorted((to, subject) for to, subject, _ in sent) == [
+        (["testadmin@test.com"], digest_subject),
+        (["testauthor@test.com"], f"Document Review Rejected: {doc.document_number}"),
+        (["testauthor@test.com"], digest_subject),
+    ]
+    [body, _] = [body for _, subject, body in sent if subject == digest_subject]
+    assert f"New Document Published: {doc.document_number}" in body
+    assert f"Document Version Obsoleted: {doc.document_number}" in body
+    
+    db_session.expire_all()
+    digests = db_session.query(NotificationOutbox).filter(NotificationOutbox.event_type == "DIGEST").all()
+    assert len(digests) == 2 and all(row.status == OutboxStatus.SENT.value for row in digests)
+    assert len({row.content_hash for row in digests}) == 1  # Same updates, rendered once
+    folded = db_session.query(NotificationOutbox).filter(NotificationOutbox.status == OutboxStatus.DIGESTED.value).all()
+    assert len(folded) == 4 and {row.digest_id for row in folded} == {row.id for row in digests}
+    logs = db_session.query(NotificationLog).filter(NotificationLog.subject == digest_subject).all()
+    assert sorted((log.recipient_email, log.event_type.value) for log in logs) == [
+        ("testadmin@test.com", "DOCUMENT_EFFECTIVE"), ("testadmin@test.com", "VERSION_OBSOLETED"),
+        ("testauthor@test.com", "DOCUMENT_EFFECTIVE"), ("testauthor@test.com", "VERSION_OBSOLETED"),
+    ]
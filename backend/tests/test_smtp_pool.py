@@ -0,0 +1,168 @@
+"""
+Tests for the pooled SMTP transport against a local aiosmtpd server
+"""
+import asyncio
+import socket
+from email.message import EmailMessage
+
+import aiosmtplib
+import pytest
+
+from app.core.smtp_pool import SMTPPool
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class _Recorder:
+    """aiosmtpd handler keeping every envelope and counting sessions"""
+
+    def __init__(self):
+        self.envelopes = []
+        self.sessions = 0
+        self.drop_next = False  # Hang up on the next MAIL command
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_MAIL(self, server, session, envelope, address, mail_options):
+        if self.drop_next:
+            self.drop_next = False
+            server.transport.close()
+            return "421 Closing connection"
+        envelope.mail_from = address
+        envelope.mail_options.extend(mail_options)
+        return "250 OK"
+    
+    async def handle_DATA(self, server, session, envelope):
+        self.envelopes.append((envelope.rcpt_tos, envelope.content.decode()))
+        return "250 Message accepted for delivery"
+
+
+@pytest.fixture(scope="function")
+def smtp_server():
+    """Plain SMTP server on a free local port"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    recorder = _Recorder()
+    controller = aiosmtpd_controller.Controller(recorder, hostname="127.0.0.1", port=port)
+    controller.start()
+    yield recorder, port
+    controller.stop()
+
+
+def _message(index: int) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = f"Notification {index}"
+    message["From"] = "dms@test.com"
+    message["To"] = f"user{index}@test.com"
+    message.set_content(f"<p>Body {index}</p>", subtype="html")
+    return message
+
+
+def _pool(port: int, **kwargs) -> SMTPPool:
+    return SMTPPool(
+        connection_factory=lambda: aiosmtplib.SMTP(hostname="127.0.0.1", port=port, start_tls=False, timeout=10),
+        username="",
+        **kwargs
+    )
+
+
+def test_pool_reuses_connections(smtp_server):
+    """Test many concurrent messages share at most `size` connections instead of one each"""
+    recorder, port = smtp_server
+    count = 200
+
+    async def pooled():
+        pool = _pool(port, size=4, max_messages=1000)
+        await asyncio.gather(*(pool.send(_message(i), [f"user{i}@test.com"]) for i in range(count)))
+        await pool.close()
+        return pool
+
+    async def one_connection_each():
+        for i in range(count):
+            smtp = aiosmtplib.SMTP(hostname="127.0.0.1", port=port, start_tls=False, timeout=10)
+            await smtp.connect()
+            await smtp.send_message(_message(i), recipients=[f"user{i}@test.com"])
+            await smtp.quit()
+
+    pool = asyncio.run(pooled())
+    assert len(recorder.envelopes) == count
+    assert pool.connections_opened <= 4
+    pooled_sessions = recorder.sessions
+    assert pooled_sessions <= 4
+    
+    # Wall-clock comparisons are too noisy on a local server; count handshakes
+    asyncio.run(one_connection_each())
+    assert len(recorder.envelopes) == 2 * count
+    assert recorder.sessions - pooled_sessions == count
+
+
+def test_pool_recycles_and_recovers(smtp_server):
+    """Test connections are replaced after max_messages and after they are closed locally"""
+    recorder, port = smtp_server
+
+    async def run():
+        pool = _pool(port, size=1, max_messages=3)
+        for i in range(7):
+            await pool.send(_message(i), [f"user{i}@test.com"])
+        opened = pool.connections_opened
+
+        # Drop the idle connection behind the pool's back
+        pool._idle[0].smtp.close()
+        await pool.send(_message(7), ["user7@test.com"])
+        await pool.close()
+        return opened, pool.connections_opened
+
+    opened, reopened = asyncio.run(run())
+    assert opened == 3  # 3 + 3 + 1 messages
+    assert reopened == 4
+    assert len(recorder.envelopes) == 8
+
+
+def test_bcc_sends_one_message_to_many(smtp_server, monkeypatch):
+    """Test identical content goes out once with every recipient on the envelope only"""
+    from app.config import settings
+    from app.core import email_service
+
+    recorder, port = smtp_server
+    monkeypatch.setattr(settings, "EMAIL_ENABLED", True)
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_USER", "dms@test.com")
+    monkeypatch.setattr(settings, "SMTP_PASSWORD", "unused")
+    pool = _pool(port)
+    monkeypatch.setattr(email_service, "get_smtp_pool", lambda: pool)
+
+    async def run():
+        recipients = [f"user{i}@test.com" for i in range(50)]
+        await email_service.deliver_email([], "Document Published", "<p>SOP-QA-1 is effective</p>", bcc=recipients)
+        await pool.close()
+        return recipients
+
+    recipients = asyncio.run(run())
+
+    [(rcpt_tos, content)] = recorder.envelopes
+    assert rcpt_tos == recipients
+    assert "user0@test.com" not in content
+    assert "undisclosed-recipients" in content
+
+
+def test_pool_retries_when_server_hangs_up(smtp_server):
+    """Test a reused connection the server drops mid-send is replaced and the message retried once"""
+    recorder, port = smtp_server
+    
+    async def run():
+        pool = _pool(port, size=1)
+        await pool.send(_message(0), ["user0@test.com"])
+        assert pool._idle[0].smtp.is_connected
+        
+        recorder.drop_next = True
+        await pool.send(_message(1), ["user1@test.com"])
+        await pool.close()
+        return pool.connections_opened
+    
+    assert asyncio.run(run()) == 2
+    assert recorder.sessions == 2
+    assert [rcpt_tos for rcpt_tos, _ in recorder.envelopes] == [["user0@test.com"], ["user1@test.com"]]
@@ -168,3 +168,84 @@ def test_reset_password(client, admin_token, author_user):
     assert "Password reset successfully" in data["message"]
 
 
+
+
+def test_principal_cache_invalidated_on_role_change(client, admin_token, author_token, author_user, db_session):
+    """Test cached principals are reused and dropped when an admin changes the user"""
+    from app.core.principal_cache import principal_cache
+    from app.models import Role
+    
+    author_headers = {"Authorization": f"Bearer {author_token}"}
+    principal_cache.reset_stats()
+    assert client.get("/api/v1/auth/me", headers=author_headers).status_code == status.HTTP_200_OK
+    assert client.get("/api/v1/auth/me", headers=author_headers).status_code == status.HTTP_200_OK
+    stats = principal_cache.stats()
+    assert stats["hits"] >= 1 and stats["hit_rate"] > 0
+    
+    # Author cannot list users until granted the admin role
+    assert client.get("/api/v1/users", headers=author_headers).status_code == status.HTTP_403_FORBIDDEN
+    admin_role = db_session.query(Role).filter(Role.name == "DMS_Admin").first()
+    response = client.put(
+        f"/api/v1/users/{author_user.id}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"role_ids": [admin_role.id]}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    
+    # The old token's permission mask is stale, so its session was revoked
+    assert client.get("/api/v1/users", headers=author_headers).status_code == status.HTTP_401_UNAUTHORIZED
+    token = client.post(
+        "/api/v1/auth/login",
+        json={"username": "testauthor", "password": "Author@123"}
+    ).json()["access_token"]
+    author_headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/api/v1/users", headers=author_headers).status_code == status.HTTP_200_OK
+    
+    # Deactivation takes effect on the very next request
+    response = client.patch(
+        f"/api/v1/users/{author_user.id}/deactivate",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get("/api/v1/auth/me", headers=author_headers).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_recipient_directory_invalidated_on_user_changes(client, admin_token, author_user, db_session):
+    """Test notification recipients are served from memory and follow user changes"""
+    from sqlalchemy import event
+    from app.core.recipient_directory import recipient_directory
+    from app.models import Role
+    
+    admin_headers = {"Authorization": f"Bearer {admin_token}"}
+    assert [r.email for r in recipient_directory.by_role(db_session, "Author")] == ["testauthor@test.com"]
+    
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        recipient_directory.by_role(db_session, "Author")
+        recipient_directory.active_users(db_session)
+        assert recipient_directory.get(db_session, author_user.id).name == author_user.full_name
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+    assert statements == []
+    
+    response = client.patch(f"/api/v1/users/{author_user.id}/deactivate", headers=admin_headers)
+    assert response.status_code == status.HTTP_200_OK
+    assert recipient_directory.by_role(db_session, "Author") == []
+    
+    reviewer_role = db_session.query(Role).filter(Role.name == "Reviewer").first()
+    response = client.post(
+        "/api/v1/users",
+        headers=admin_headers,
+        json={
+            "username": "newreviewer",
+            "email": "newreviewer@test.com",
+            "password": "Test@123",
+            "first_name": "New",
+            "last_name": "Reviewer",
+            "role_ids": [reviewer_role.id]
+        }
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [(r.email, r.name) for r in recipient_directory.by_role(db_session, "Reviewer")] == [("newreviewer@test.com", "New Reviewer")]
@@ -5,6 +5,8 @@ export const API_ENDPOINTS = {
   login: '/auth/login',
   logout: '/auth/logout',
   me: '/auth/me',
+  sessionEvents: '/auth/session-events',
+  sessionEventsTicket: '/auth/session-events/ticket',
   
   // Users
   users: '/users',
@@ -17,60 +17,68 @@ interface AuthContextType {
 
 const AuthContext = createContext<AuthContextType | undefined>(undefined);
 
-// Session validation interval (check every 30 seconds)
-const SESSION_CHECK_INTERVAL = 30000;
+// Safety-net session check; invalidation normally arrives on the event stream (every 5 minutes)
+const SESSION_CHECK_INTERVAL = 300000;
 
 export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children }) => {
   const [user, setUser] = useState<UserInfo | null>(null);
   const [loading, setLoading] = useState(true);
   const [sessionInvalidated, setSessionInvalidated] = useState(false);
   const sessionCheckRef = useRef<ReturnType<typeof setInterval> | null>(null);
+  const sessionEventsRef = useRef<(() => void) | null>(null);
 
-  // Start session validation polling
-  const startSessionValidation = useCallback(() => {
+  // Stop listening for session invalidation
+  const stopSessionValidation = useCallback(() => {
     if (sessionCheckRef.current) {
       clearInterval(sessionCheckRef.current);
+      sessionCheckRef.current = null;
     }
+    if (sessionEventsRef.current) {
+      sessionEventsRef.current();
+      sessionEventsRef.current = null;
+    }
+  }, []);
+
+  const handleSessionInvalidated = useCallback((reason?: string) => {
+    console.log('Session invalidated:', reason);
+    // Session was invalidated (user logged in elsewhere)
+    setSessionInvalidated(true);
+    // Clear local storage but don't redirect yet - let UI handle it
+    authService.clearSession();
+    setUser(null);
+    stopSessionValidation();
+  }, [stopSessionValidation]);
+
+  // Listen for session invalidation: the server pushes it on the event
+  // stream; polling is only a safety net for when the stream is unavailable
+  const startSessionValidation = useCallback(() => {
+    stopSessionValidation();
+
+    sessionEventsRef.current = authService.subscribeSessionEvents((reason) => {
+      if (reason !== 'logout') {
+        handleSessionInvalidated(reason);
+      }
+    });
 
     sessionCheckRef.current = setInterval(async () => {
       if (authService.isAuthenticated()) {
         const result = await authService.validateSession();
         if (!result.valid) {
-          console.log('Session invalidated:', result.reason);
-          // Session was invalidated (user logged in elsewhere)
-          setSessionInvalidated(true);
-          // Clear local storage but don't redirect yet - let UI handle it
-          authService.clearSession();
-          setUser(null);
-          if (sessionCheckRef.current) {
-            clearInterval(sessionCheckRef.current);
-          }
+          handleSessionInvalidated(result.reason);
         }
       }
     }, SESSION_CHECK_INTERVAL);
-  }, []);
-
-  // Stop session validation polling
-  const stopSessionValidation = useCallback(() => {
-    if (sessionCheckRef.current) {
-      clearInterval(sessionCheckRef.current);
-      sessionCheckRef.current = null;
-    }
-  }, []);
+  }, [stopSessionValidation, handleSessionInvalidated]);
 
   // Check session on tab focus (for faster invalidation detection)
   const checkSessionOnFocus = useCallback(async () => {
     if (authService.isAuthenticated() && !sessionInvalidated) {
       const result = await authService.validateSession();
       if (!result.valid) {
-        console.log('Session invalidated on focus:', result.reason);
-        setSessionInvalidated(true);
-        authService.clearSession();
-        setUser(null);
-        stopSessionValidation();
+        handleSessionInvalidated(result.reason);
       }
     }
-  }, [sessionInvalidated, stopSessionValidation]);
+  }, [sessionInvalidated, handleSessionInvalidated]);
 
   useEffect(() => {
     // Check if user is already logged in
@@ -17,6 +17,8 @@ const AuditLogs: React.FC = () => {
   const [usernameFilter, setUsernameFilter] = useState('');
   const [startDateFilter, setStartDateFilter] = useState('');
   const [endDateFilter, setEndDateFilter] = useState('');
+  const [includeArchived, setIncludeArchived] = useState(false);
+  const [olderHistoryArchived, setOlderHistoryArchived] = useState(false);
 
   // Available options
   const [availableActions, setAvailableActions] = useState<string[]>([]);
@@ -30,7 +32,7 @@ const AuditLogs: React.FC = () => {
 
   useEffect(() => {
     fetchLogs();
-  }, [page, actionFilter, entityFilter, usernameFilter, startDateFilter, endDateFilter]);
+  }, [page, actionFilter, entityFilter, usernameFilter, startDateFilter, endDateFilter, includeArchived]);
 
   const fetchAvailableFilters = async () => {
     try {
@@ -54,10 +56,12 @@ const AuditLogs: React.FC = () => {
       if (usernameFilter) filters.username = usernameFilter;
       if (startDateFilter) filters.start_date = startDateFilter;
       if (endDateFilter) filters.end_date = endDateFilter;
+      if (includeArchived) filters.include_archived = true;
 
       const response = await auditService.getAuditLogs(filters);
       setLogs(response.logs);
       setTotal(response.total);
+      setOlderHistoryArchived(response.older_history_archived);
     } catch (error) {
       console.error('Failed to fetch audit logs:', error);
     } finally {
@@ -71,6 +75,7 @@ const AuditLogs: React.FC = () => {
     setUsernameFilter('');
     setStartDateFilter('');
     setEndDateFilter('');
+    setIncludeArchived(false);
     setPage(1);
   };
 
@@ -197,6 +202,19 @@ const AuditLogs: React.FC = () => {
             />
           </div>
         </div>
+
+        <label className="flex items-center text-sm text-gray-600 cursor-pointer mt-4">
+          <input
+            type="checkbox"
+            checked={includeArchived}
+            onChange={(e) => {
+              setIncludeArchived(e.target.checked);
+              setPage(1);
+            }}
+            className="mr-2 rounded border-gray-300"
+          />
+          Include archived months (slower)
+        </label>
       </div>
 
       {/* Stats */}
@@ -205,6 +223,9 @@ const AuditLogs: React.FC = () => {
           <div>
             <p className="text-sm text-gray-600">Total Audit Entries</p>
             <p className="text-2xl font-bold text-primary-900">{total.toLocaleString()}</p>
+            {olderHistoryArchived && (
+              <p className="text-xs text-gray-500">Older matching entries are archived</p>
+            )}
           </div>
           <div className="text-right">
             <p className="text-sm text-gray-600">Current Page</p>
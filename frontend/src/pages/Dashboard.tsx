@@ -19,8 +19,8 @@ import {
 import type { LucideIcon } from 'lucide-react';
 import { useAuth } from '@/context/AuthContext';
 import documentService from '@/services/document.service';
-import { userService } from '@/services/user.service';
 import { auditService } from '@/services/audit.service';
+import { statsService } from '@/services/stats.service';
 import type { Document } from '@/types/document';
 import type { AuditLog } from '@/types';
 import { formatIST } from '@/utils/dateUtils';
@@ -420,26 +420,24 @@ const Dashboard: React.FC = () => {
 
   const roleTheme = ROLE_THEMES[primaryRole] ?? ROLE_THEMES.GENERAL;
 
-  type AdminResults = [
-    Awaited<ReturnType<typeof userService.getUsers>>,
-    Awaited<ReturnType<typeof userService.getUsers>>,
-    Awaited<ReturnType<typeof auditService.getAuditLogs>>
-  ];
-
   const loadDashboard = useCallback(async () => {
     setLoading(true);
     setError(null);
 
     try {
+      // Counts come from the precomputed /stats counters; the per-stage list
+      // calls only fetch the preview documents and skip the exact count
+      const statsPromise = statsService.get();
       const stagePromise = Promise.all(
-        STAGE_PIPELINE.map(async (stage): Promise<{ key: StageKey; data: StageStat }> => {
+        STAGE_PIPELINE.map(async (stage): Promise<{ key: StageKey; documents: Document[] }> => {
           try {
             // For EFFECTIVE status, we don't need show_all_statuses (it's the default)
             // For other statuses, we need show_all_statuses=true to see non-effective documents
             const params: any = { 
               status: stage.status, 
               page: 1,
-              page_size: STAGE_DOC_LIMIT 
+              page_size: STAGE_DOC_LIMIT,
+              include_total: false,
             };
             
             // Only add show_all_statuses for non-EFFECTIVE statuses
@@ -448,69 +446,48 @@ const Dashboard: React.FC = () => {
             }
             
             const response = await documentService.list(params);
-            const items = response.items ?? [];
-            return {
-              key: stage.key,
-              data: {
-                total: response.total ?? items.length,
-                documents: items,
-              },
-            };
+            return { key: stage.key, documents: response.items ?? [] };
           } catch (stageError) {
-            console.error(`Failed to load ${stage.status} stats`, stageError);
-            return {
-              key: stage.key,
-              data: {
-                total: 0,
-                documents: [],
-              },
-            };
+            console.error(`Failed to load ${stage.status} documents`, stageError);
+            return { key: stage.key, documents: [] };
           }
         })
       );
 
-      const adminPromise: Promise<AdminResults> | null = isAdmin
-        ? Promise.all([
-            userService.getUsers({ page: 1, page_size: 1 }),
-            userService.getUsers({ page: 1, page_size: 1, is_active: true }),
-            auditService.getAuditLogs({ page: 1, page_size: 5 }),
-          ])
-        : null;
+      const auditPromise = isAdmin ? auditService.getAuditLogs({ page: 1, page_size: 5 }) : null;
 
-      const stageResults = await stagePromise;
+      const [statsData, stageResults] = await Promise.all([statsPromise, stagePromise]);
+      const byStatus = statsData.documents.by_status;
       const nextStageStats = stageResults.reduce<Partial<Record<StageKey, StageStat>>>((acc, entry) => {
-        acc[entry.key] = entry.data;
+        const stage = STAGE_PIPELINE.find((item) => item.key === entry.key);
+        acc[entry.key] = {
+          total: byStatus[stage?.status ?? ''] ?? 0,
+          documents: entry.documents,
+        };
         return acc;
       }, {});
       setStageStats(nextStageStats);
 
-      let adminResults: AdminResults | null = null;
-      if (adminPromise) {
+      let auditData: Awaited<ReturnType<typeof auditService.getAuditLogs>> | null = null;
+      if (auditPromise) {
         try {
-          adminResults = await adminPromise;
+          auditData = await auditPromise;
         } catch (adminErr) {
           console.error('Failed to load admin metrics', adminErr);
           setError('Some admin metrics could not load. Please refresh.');
         }
       }
 
-      if (adminResults) {
-        const [usersData, activeUsersData, auditData] = adminResults;
-        setStats({
-          totalUsers: usersData.total,
-          activeUsers: activeUsersData.total,
-          recentAuditLogs: auditData.total,
-          publishedDocs: nextStageStats.published?.total ?? 0,
-        });
+      setStats((prev) => ({
+        totalUsers: statsData.users?.total ?? prev.totalUsers,
+        activeUsers: statsData.users?.active ?? prev.activeUsers,
+        recentAuditLogs: auditData?.total ?? prev.recentAuditLogs,
+        publishedDocs: nextStageStats.published?.total ?? 0,
+      }));
+      if (auditData) {
         setRecentActivity(auditData.logs.slice(0, 5));
-      } else {
-        setStats((prev) => ({
-          ...prev,
-          publishedDocs: nextStageStats.published?.total ?? prev.publishedDocs,
-        }));
-        if (!isAdmin) {
-          setRecentActivity([]);
-        }
+      } else if (!isAdmin) {
+        setRecentActivity([]);
       }
     } catch (err) {
       console.error('Failed to load dashboard insights', err);
@@ -20,10 +20,12 @@ export default function DocumentList() {
   const [searchQuery, setSearchQuery] = useState('');
   const [departmentFilter, setDepartmentFilter] = useState('');
   
-  // Pagination
+  // Pagination (keyset: cursors[i] fetches page i + 1)
   const [currentPage, setCurrentPage] = useState(1);
+  const [cursors, setCursors] = useState<(string | null)[]>([null]);
   const [totalPages, setTotalPages] = useState(1);
   const [totalDocs, setTotalDocs] = useState(0);
+  const [totalIsEstimate, setTotalIsEstimate] = useState(false);
   const pageSize = 10;
 
   // Load documents - ONLY Effective documents
@@ -33,16 +35,20 @@ export default function DocumentList() {
       setError(null);
       
       const response = await documentService.list({
-        skip: (currentPage - 1) * pageSize,
-        limit: pageSize,
-        search: searchQuery || undefined,
+        page_size: pageSize,
+        cursor: cursors[currentPage - 1] || undefined,
+        // Exact (cached) totals while browsing, a cheap estimate while typing
+        include_total: !searchQuery,
+        title: searchQuery || undefined,
         department: departmentFilter || undefined,
         status: 'EFFECTIVE', // Always filter by EFFECTIVE only (controlled versioning)
       });
       
       setDocuments(response.items || []);
-      setTotalPages(response.pages || 1);
+      setCursors((prev) => [...prev.slice(0, currentPage), response.next_cursor || null]);
+      setTotalPages(response.next_cursor ? Math.max(response.pages || 1, currentPage + 1) : currentPage);
       setTotalDocs(response.total || 0);
+      setTotalIsEstimate(response.total_is_estimate);
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Failed to load documents');
       console.error('Error loading documents:', err);
@@ -60,6 +66,7 @@ export default function DocumentList() {
   const handleSearchChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     setSearchQuery(e.target.value);
     setCurrentPage(1); // Reset to first page
+    setCursors([null]);
   };
 
   // Status badge color
@@ -147,6 +154,7 @@ export default function DocumentList() {
               onChange={(e) => {
                 setDepartmentFilter(e.target.value);
                 setCurrentPage(1);
+                setCursors([null]);
               }}
               className="w-full pl-10 pr-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent appearance-none"
             >
@@ -192,7 +200,7 @@ export default function DocumentList() {
       {/* Results Count */}
       {!loading && documents && (
         <div className="mb-4 text-sm text-gray-600">
-          Showing {documents.length} of {totalDocs} documents
+          Showing {documents.length} of {totalIsEstimate ? 'about ' : ''}{totalDocs} documents
         </div>
       )}
 
@@ -2,141 +2,40 @@ import { useEffect, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { FileText, Clock, User, AlertCircle, CheckCircle } from 'lucide-react';
 import { useAuth } from '../context/AuthContext';
-import documentService from '../services/document.service';
-import versionService from '../services/version.service';
-import commentService from '../services/comment.service';
-import { Document, DocumentVersion } from '../types/document';
+import taskService, { TaskItem, TaskListResponse } from '../services/task.service';
 import { formatIST } from '../utils/dateUtils';
 
-interface TaskItem {
-  document: Document;
-  version: DocumentVersion;
-  taskType: string;
-  priority: string;
-  unresolvedComments: number;
-}
+type TaskTab = 'all' | 'high' | 'medium' | 'low';
 
 export default function PendingTasks() {
   const { user } = useAuth();
   const navigate = useNavigate();
   const [tasks, setTasks] = useState<TaskItem[]>([]);
+  const [taskCounts, setTaskCounts] = useState<Record<TaskTab, number>>({ all: 0, high: 0, medium: 0, low: 0 });
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const [activeTab, setActiveTab] = useState<string>('all');
-
-  // Determine what tasks this user should see
-  const getTasksForRole = () => {
-    if (!user) return [];
+  const [activeTab, setActiveTab] = useState<TaskTab>('all');
 
-    const roles = user.roles;
-    const taskTypes: string[] = [];
-
-    // Admin and Author see Drafts
-    if (roles.includes('DMS_Admin') || roles.includes('Author')) {
-      taskTypes.push('DRAFT');
-    }
-
-    // Reviewer sees Under Review
-    if (roles.includes('Reviewer')) {
-      taskTypes.push('UNDER_REVIEW');
-    }
-
-    // Approver sees Pending Approval
-    if (roles.includes('Approver')) {
-      taskTypes.push('PENDING_APPROVAL');
-    }
-
-    // DMS Admin sees everything + Ready to Publish
-    if (roles.includes('DMS_Admin')) {
-      taskTypes.push('UNDER_REVIEW', 'PENDING_APPROVAL', 'Ready to Publish');
-    }
-
-    return taskTypes;
-  };
+  // The server works out the user's tasks (role, status, unresolved comments)
+  const fetchTasks = (cursor?: string): Promise<TaskListResponse> =>
+    taskService.list({
+      priority: activeTab === 'all' ? undefined : activeTab,
+      cursor,
+    });
 
   const loadTasks = async () => {
     try {
       setLoading(true);
       setError(null);
 
-      const taskTypes = getTasksForRole();
-      if (taskTypes.length === 0) {
-        setTasks([]);
-        setLoading(false);
-        return;
+      const response = await fetchTasks();
+      setTasks(response.items);
+      setNextCursor(response.next_cursor || null);
+      if (response.counts) {
+        setTaskCounts(response.counts);
       }
-
-      // Load all documents (including drafts, under review, etc.)
-      const docsResponse = await documentService.list({ 
-        limit: 100,
-        show_all_statuses: true  // Show all statuses, not just EFFECTIVE
-      });
-      const allDocs = docsResponse.items || [];
-
-      // For each document, get latest version and check status
-      const taskPromises = allDocs.map(async (doc) => {
-        try {
-          const versions = await versionService.listByDocument(doc.id);
-          if (versions.length === 0) return null;
-
-          // Get the latest draft/active version
-          const latestVersion = versions[0]; // Already sorted by version_number desc
-
-          // Check if this version's status matches user's role
-          const status = latestVersion.status;
-          
-          // Check for unresolved comments
-          let unresolvedComments = 0;
-          try {
-            const commentsResponse = await commentService.list(doc.id, latestVersion.id, false);
-            unresolvedComments = commentsResponse.comments.filter((c: any) => !c.is_resolved).length;
-          } catch (commentErr) {
-            // Ignore comment errors, default to 0
-          }
-          
-          // Map status to task type
-          let taskType = '';
-          let priority = 'medium';
-
-          if (status === 'DRAFT' && taskTypes.includes('DRAFT')) {
-            taskType = 'Draft - Continue Editing';
-            // Set HIGH priority if document has unresolved comments (returned from reviewer)
-            priority = unresolvedComments > 0 ? 'high' : 'low';
-            if (unresolvedComments > 0) {
-              taskType = 'Draft - Address Comments';
-            }
-          } else if (status === 'UNDER_REVIEW' && taskTypes.includes('UNDER_REVIEW')) {
-            taskType = 'Review Required';
-            priority = 'high';
-          } else if (status === 'PENDING_APPROVAL' && taskTypes.includes('PENDING_APPROVAL')) {
-            taskType = 'Approval Required';
-            priority = 'high';
-          } else if (status === 'APPROVED' && taskTypes.includes('Ready to Publish')) {
-            taskType = 'Ready to Publish';
-            priority = 'medium';
-          }
-
-          if (taskType) {
-            return {
-              document: doc,
-              version: latestVersion,
-              taskType,
-              priority,
-              unresolvedComments,
-            };
-          }
-
-          return null;
-        } catch (err) {
-          console.error(`Error loading versions for document ${doc.id}:`, err);
-          return null;
-        }
-      });
-
-      const allTasks = await Promise.all(taskPromises);
-      const validTasks = allTasks.filter((t): t is TaskItem => t !== null);
-
-      setTasks(validTasks);
     } catch (err: any) {
       console.error('Error loading tasks:', err);
       setError(err.response?.data?.detail || 'Failed to load pending tasks');
@@ -145,9 +44,26 @@ export default function PendingTasks() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const response = await fetchTasks(nextCursor);
+      setTasks((previous) => [...previous, ...response.items]);
+      setNextCursor(response.next_cursor || null);
+    } catch (err: any) {
+      console.error('Error loading tasks:', err);
+      setError(err.response?.data?.detail || 'Failed to load pending tasks');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
-    loadTasks();
-  }, [user]);
+    if (user) {
+      loadTasks();
+    }
+  }, [user, activeTab]);
 
   const getPriorityColor = (priority: string) => {
     switch (priority) {
@@ -170,17 +86,6 @@ export default function PendingTasks() {
     return <FileText className="text-gray-600" size={20} />;
   };
 
-  const filteredTasks = activeTab === 'all' 
-    ? tasks 
-    : tasks.filter(t => t.priority === activeTab);
-
-  const taskCounts = {
-    all: tasks.length,
-    high: tasks.filter(t => t.priority === 'high').length,
-    medium: tasks.filter(t => t.priority === 'medium').length,
-    low: tasks.filter(t => t.priority === 'low').length,
-  };
-
   if (loading) {
     return (
       <div className="flex flex-col items-center justify-center py-16">
@@ -258,7 +163,7 @@ export default function PendingTasks() {
       </div>
 
       {/* Empty State */}
-      {filteredTasks.length === 0 && (
+      {tasks.length === 0 && (
         <div className="text-center py-12 bg-white rounded-lg shadow-sm">
           <CheckCircle size={48} className="mx-auto text-green-500 mb-4" />
           <h3 className="text-lg font-semibold text-gray-900 mb-2">All Caught Up!</h3>
@@ -267,18 +172,18 @@ export default function PendingTasks() {
       )}
 
       {/* Task List */}
-      {filteredTasks.length > 0 && (
+      {tasks.length > 0 && (
         <div className="space-y-4">
-          {filteredTasks.map((task) => (
+          {tasks.map((task) => (
             <div
-              key={`${task.document.id}-${task.version.id}`}
+              key={`${task.document_id}-${task.version_id}`}
               className="bg-white rounded-lg shadow-sm border border-gray-200 p-4 hover:shadow-md transition-shadow cursor-pointer"
-              onClick={() => navigate(`/documents/${task.document.id}`)}
+              onClick={() => navigate(`/documents/${task.document_id}`)}
             >
               <div className="flex items-start gap-4">
                 {/* Icon */}
                 <div className="flex-shrink-0 mt-1">
-                  {getTaskIcon(task.taskType)}
+                  {getTaskIcon(task.task_type)}
                 </div>
 
                 {/* Content */}
@@ -286,10 +191,10 @@ export default function PendingTasks() {
                   <div className="flex items-start justify-between">
                     <div>
                       <h3 className="text-lg font-semibold text-gray-900 mb-1">
-                        {task.document.title}
+                        {task.title}
                       </h3>
                       <p className="text-sm text-gray-600 mb-2">
-                        {task.document.document_number} • {task.document.department}
+                        {task.document_number} • {task.department}
                       </p>
                     </div>
                     <span
@@ -304,12 +209,12 @@ export default function PendingTasks() {
                   <div className="flex items-center gap-4 text-sm text-gray-500 mb-3">
                     <div className="flex items-center gap-1">
                       <Clock size={14} />
-                      <span>Version {task.version.version_number}</span>
+                      <span>Version {task.version_number}</span>
                     </div>
                     <div className="flex items-center gap-1">
                       <User size={14} />
                       <span>
-                        Updated {formatIST(task.version.updated_at)} IST
+                        Updated {formatIST(task.updated_at)} IST
                       </span>
                     </div>
                   </div>
@@ -317,39 +222,50 @@ export default function PendingTasks() {
                   <div className="flex items-center justify-between">
                     <div className="flex items-center gap-2">
                       <div className={`px-3 py-1 rounded text-sm font-medium ${
-                        task.unresolvedComments > 0 && task.taskType.includes('Draft')
+                        task.unresolved_comments > 0 && task.task_type.includes('Draft')
                           ? 'bg-orange-100 text-orange-700'
                           : 'bg-blue-50 text-blue-700'
                       }`}>
-                        {task.taskType}
+                        {task.task_type}
                       </div>
-                      {task.unresolvedComments > 0 && (
+                      {task.unresolved_comments > 0 && (
                         <div className="flex items-center gap-1 bg-red-100 text-red-700 px-2 py-1 rounded text-xs font-medium">
                           <svg className="w-3 h-3" fill="none" viewBox="0 0 24 24" stroke="currentColor">
                             <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M8 12h.01M12 12h.01M16 12h.01M21 12c0 4.418-4.03 8-9 8a9.863 9.863 0 01-4.255-.949L3 20l1.395-3.72C3.512 15.042 3 13.574 3 12c0-4.418 4.03-8 9-8s9 3.582 9 8z" />
                           </svg>
-                          {task.unresolvedComments} comment{task.unresolvedComments > 1 ? 's' : ''}
+                          {task.unresolved_comments} comment{task.unresolved_comments > 1 ? 's' : ''}
                         </div>
                       )}
                     </div>
                     <button
                       onClick={(e) => {
                         e.stopPropagation();
-                        if (task.taskType.includes('Draft')) {
-                          navigate(`/documents/${task.document.id}/edit`);
+                        if (task.task_type.includes('Draft')) {
+                          navigate(`/documents/${task.document_id}/edit`);
                         } else {
-                          navigate(`/documents/${task.document.id}`);
+                          navigate(`/documents/${task.document_id}`);
                         }
                       }}
                       className="text-blue-600 hover:text-blue-800 text-sm font-medium"
                     >
-                      {task.taskType.includes('Draft') ? 'Continue Editing →' : 'Take Action →'}
+                      {task.task_type.includes('Draft') ? 'Continue Editing →' : 'Take Action →'}
                     </button>
                   </div>
                 </div>
               </div>
             </div>
           ))}
+          {nextCursor && (
+            <div className="text-center">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="text-blue-600 hover:text-blue-800 text-sm font-medium disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more tasks'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
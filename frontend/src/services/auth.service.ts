@@ -1,7 +1,10 @@
 import api from './api';
-import { API_ENDPOINTS } from '@/config/api';
+import { API_BASE_URL, API_ENDPOINTS } from '@/config/api';
 import { LoginCredentials, LoginResponse, UserInfo } from '@/types';
 
+// Delay before reopening a session event stream the server refused
+const SESSION_EVENTS_RETRY_MS = 5000;
+
 // Session conflict response type
 export interface SessionConflictResponse {
   session_conflict: boolean;
@@ -84,6 +87,55 @@ export const authService = {
     }
   },
 
+  // Subscribe to the server's session event stream; onRevoked fires once
+  // when this session is revoked (logout, forced login elsewhere) or expires.
+  // The stream is opened with a short-lived ticket so the access token never
+  // appears in a URL; a stream the server refuses is reopened with a new one.
+  // Returns a function that closes the stream.
+  subscribeSessionEvents(onRevoked: (reason: string) => void): () => void {
+    let source: EventSource | null = null;
+    let retry: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
+    const open = async () => {
+      if (closed || !this.getToken()) {
+        return;
+      }
+      let ticket: string;
+      try {
+        const response = await api.post<{ ticket: string }>(API_ENDPOINTS.sessionEventsTicket);
+        ticket = response.data.ticket;
+      } catch (error) {
+        return; // Session polling reports the failure
+      }
+      if (closed) {
+        return;
+      }
+      source = new EventSource(
+        `${API_BASE_URL}${API_ENDPOINTS.sessionEvents}?ticket=${encodeURIComponent(ticket)}`
+      );
+      source.addEventListener('session_revoked', (event) => {
+        closed = true;
+        source?.close();
+        onRevoked(JSON.parse((event as MessageEvent).data).reason);
+      });
+      source.onerror = () => {
+        if (source?.readyState === EventSource.CLOSED && !closed) {
+          retry = setTimeout(open, SESSION_EVENTS_RETRY_MS);
+        }
+      };
+    };
+
+    open();
+    return () => {
+      closed = true;
+      if (retry) {
+        clearTimeout(retry);
+      }
+      source?.close();
+    };
+  },
+
   // Get stored user info
   getStoredUser(): UserInfo | null {
     const userStr = localStorage.getItem('user');
@@ -8,15 +8,46 @@ import { Document, CreateDocumentRequest, UpdateDocumentRequest } from '../types
 export interface DocumentListResponse {
   items: Document[];
   total: number;
-  page: number;
+  page: number | null; // null in cursor mode
   size: number;
   pages: number;
+  total_is_estimate: boolean;
+  next_cursor?: string | null;
+}
+
+export interface DocumentSearchHit {
+  id: number;
+  document_number: string;
+  title: string;
+  department?: string;
+  status: string;
+  latest_version_status?: string;
+  updated_at: string;
+  score: number;
+  title_highlight: string; // HTML-escaped, matches wrapped in <mark>
+  snippet?: string; // HTML-escaped content excerpt, matches wrapped in <mark>
+}
+
+export interface DocumentSearchResponse {
+  items: DocumentSearchHit[];
+  page_size: number;
+  next_cursor?: string | null;
+}
+
+export interface FullTextSearchParams {
+  department?: string;
+  status?: string;
+  cursor?: string;
+  page_size?: number;
 }
 
 export interface DocumentSearchParams {
-  skip?: number;
-  limit?: number;
-  search?: string;
+  page?: number;
+  page_size?: number;
+  cursor?: string; // next_cursor of the previous page; replaces page
+  include_total?: boolean; // false: cheap estimated total
+  title?: string;
+  document_number?: string;
   department?: string;
   status?: string;
   show_all_statuses?: boolean;
@@ -63,11 +94,14 @@ const documentService = {
   },
 
   /**
-   * Search documents (client-side for now, can be backend later)
+   * Ranked full-text search over number, title, department, tags and content.
+   * Pass the previous response's next_cursor as `cursor` for the next page.
    */
-  async search(query: string): Promise<Document[]> {
-    const response = await this.list({ search: query });
-    return response.items;
+  async search(query: string, params?: FullTextSearchParams): Promise<DocumentSearchResponse> {
+    const response = await api.get<DocumentSearchResponse>('/documents/search', {
+      params: { q: query, ...params },
+    });
+    return response.data;
   },
 
   /**
@@ -0,0 +1,34 @@
+import api from './api';
+
+/**
+ * Stats Service - Dashboard counters
+ */
+
+export interface DocumentStats {
+  total: number;
+  by_status: Record<string, number>; // document status, upper-cased
+  by_department: Record<string, number>;
+  by_version_status: Record<string, number>; // workflow state of each latest version
+}
+
+export interface UserStats {
+  total: number;
+  active: number;
+}
+
+export interface StatsResponse {
+  documents: DocumentStats;
+  users?: UserStats | null; // admins only
+}
+
+export const statsService = {
+  /**
+   * Document and user counts for the dashboard in a single call
+   */
+  async get(): Promise<StatsResponse> {
+    const response = await api.get<StatsResponse>('/stats');
+    return response.data;
+  },
+};
+
+export default statsService;
@@ -0,0 +1,47 @@
+import api from './api';
+
+/**
+ * Task Service - The current user's pending workflow tasks
+ */
+
+export type TaskPriority = 'high' | 'medium' | 'low';
+
+export interface TaskItem {
+  document_id: number;
+  document_number: string;
+  title: string;
+  department?: string | null;
+  version_id: number;
+  version_number: number;
+  version_string?: string | null;
+  status: string;
+  task_type: string;
+  priority: TaskPriority;
+  unresolved_comments: number;
+  updated_at: string;
+}
+
+export interface TaskListResponse {
+  items: TaskItem[];
+  counts?: Record<'all' | TaskPriority, number> | null; // first page only
+  page_size: number;
+  next_cursor?: string | null;
+}
+
+export interface TaskListParams {
+  priority?: TaskPriority;
+  cursor?: string; // next_cursor of the previous page
+  page_size?: number;
+}
+
+export const taskService = {
+  /**
+   * Documents waiting for the current user's action, most recently updated first
+   */
+  async list(params?: TaskListParams): Promise<TaskListResponse> {
+    const response = await api.get<TaskListResponse>('/me/tasks', { params });
+    return response.data;
+  },
+};
+
+export default taskService;
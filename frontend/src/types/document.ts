@@ -19,6 +19,8 @@ export interface Document {
   owner_username?: string;
   owner_full_name?: string;
   version_count?: number;
+  latest_version_id?: number | null;
+  latest_version_status?: string | null;
 }
 
 export interface DocumentVersion {
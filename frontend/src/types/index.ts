@@ -98,8 +98,11 @@ export interface UserListResponse {
 export interface AuditLogListResponse {
   logs: AuditLog[];
   total: number;
-  page: number;
+  page: number | null;
   page_size: number;
+  total_is_estimate: boolean;
+  next_cursor: string | null;
+  older_history_archived: boolean;
 }
 
 // Password reset
@@ -120,6 +123,9 @@ export interface UserFilters {
 export interface AuditLogFilters {
   page?: number;
   page_size?: number;
+  cursor?: string;
+  include_total?: boolean;
+  include_archived?: boolean;
   action?: string;
   entity_type?: string;
   user_id?: number;